@@ -0,0 +1,187 @@
+# batch.py - Non-interactive batch mode: JSONL scenarios in, JSONL results out
+#
+#   python main.py batch --method auto < scenarios.jsonl > results.jsonl
+#
+# Scenarios are read and processed as a stream: at most a few per worker are
+# in flight at any time, so memory stays bounded no matter how big the input
+# is. Results come out in input order, one JSON object per line (see
+# scenario.py for the format). Throughput is reported on stderr at the end.
+#
+#   python main.py batch --input in.jsonl --output out.jsonl --checkpoint out.ckpt
+#
+# With a checkpoint, a long run can be stopped (or killed) and started again
+# with the same command: it carries on after the last saved scenario, and
+# reports progress with an ETA on stderr while it runs.
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from scenario import METHODS, predict_scenario_line
+
+# Scenarios in flight per worker process
+IN_FLIGHT_PER_WORKER = 4
+
+def _scenario_id(line):
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    return data.get('id') if isinstance(data, dict) else None
+
+def process_line(line, method):
+    """
+    Worker task: returns (result JSON line, whether it is an error)
+
+    Whatever an engine raises becomes that line's error, so one bad
+    scenario never ends the stream.
+    """
+    try:
+        result = predict_scenario_line(line, method)
+        return json.dumps(result), 'error' in result
+    except Exception as e:
+        return json.dumps({'id': _scenario_id(line), 'error': f"{type(e).__name__}: {e}"}), True
+
+def stream_results(lines, method, workers):
+    """Yield (result line, is_error) per non-blank input line, in input order"""
+    lines = (line for line in lines if line.strip())
+
+    if workers <= 1:
+        for line in lines:
+            yield process_line(line, method)
+        return
+
+    # Only multi-worker runs need the process pool machinery
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for line in lines:
+            pending.append(pool.submit(process_line, line, method))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run_batch(input_stream, output_stream, method="auto", workers=None):
+    """Process a whole stream, returns (scenarios, errors, elapsed seconds)"""
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    errors = 0
+    start = time.perf_counter()
+
+    for result_line, is_error in stream_results(input_stream, method, workers):
+        output_stream.write(result_line + "\n")
+        output_stream.flush()
+        count += 1
+        errors += is_error
+
+    return count, errors, time.perf_counter() - start
+
+def run_batch_checkpointed(input_path, output_path, checkpoint_path, method="auto", workers=None, limit=None,
+                           checkpoint_sec=None, progress=sys.stderr):
+    """
+    run_batch between files, resumable from checkpoint_path
+
+    The checkpoint records how many scenarios are done and the output's
+    length at that point. A rerun cuts the output back to that length
+    (dropping lines written after the last save) and skips those
+    scenarios, so the output ends up the same as one uninterrupted run.
+    limit: stop after this many more scenarios (resume later).
+
+    Returns (scenarios done in total, errors in total, elapsed seconds this run)
+    """
+    from checkpoint import CHECKPOINT_SEC, Progress, load_checkpoint, save_checkpoint
+
+    workers = workers or os.cpu_count() or 1
+    checkpoint_sec = CHECKPOINT_SEC if checkpoint_sec is None else checkpoint_sec
+    with open(input_path) as f:
+        total = sum(1 for line in f if line.strip())
+
+    state = load_checkpoint(checkpoint_path)
+    if state is None:
+        state = {'input': os.path.abspath(input_path), 'done': 0, 'errors': 0, 'output_bytes': 0}
+    elif state.get('input') != os.path.abspath(input_path):
+        raise ValueError(f"{checkpoint_path} is a checkpoint for {state.get('input')}, not {input_path}.")
+    elif not os.path.exists(output_path) or os.path.getsize(output_path) < state['output_bytes']:
+        raise ValueError(f"{output_path} is shorter than {checkpoint_path} records; cannot resume.")
+    if os.path.exists(output_path):
+        os.truncate(output_path, state['output_bytes'])
+    done, errors = state['done'], state['errors']
+    meter = Progress(total, total, "scenarios", done, done, progress)
+    start = time.perf_counter()
+
+    with open(input_path) as input_stream, open(output_path, "ab") as output_stream:
+        def save():
+            output_stream.flush()
+            os.fsync(output_stream.fileno())
+            save_checkpoint(checkpoint_path, {**state, 'done': done, 'errors': errors,
+                                              'output_bytes': output_stream.tell()})
+
+        lines = itertools.islice((line for line in input_stream if line.strip()), done,
+                                 None if limit is None else done + limit)
+        last_save = time.monotonic()
+        try:
+            for result_line, is_error in stream_results(lines, method, workers):
+                output_stream.write(result_line.encode() + b"\n")
+                done += 1
+                errors += is_error
+                meter.advance()
+                if time.monotonic() - last_save >= checkpoint_sec:
+                    save()
+                    last_save = time.monotonic()
+        finally:
+            save()
+
+    return done, errors, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Predict JSONL scenarios from stdin, write JSONL results to stdout")
+    parser.add_argument("--method", choices=METHODS, default="auto",
+                        help="default method for scenarios that do not set one")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--input", default=None, help="read scenarios from this file instead of stdin")
+    parser.add_argument("--output", default=None, help="write results to this file instead of stdout")
+    parser.add_argument("--checkpoint", default=None,
+                        help="save progress to this file and resume from it (needs --input and --output)")
+    parser.add_argument("--limit", type=int, default=None, help="with --checkpoint: stop after this many scenarios")
+    args = parser.parse_args(argv)
+
+    if args.checkpoint:
+        if not (args.input and args.output):
+            parser.error("--checkpoint needs --input and --output")
+        try:
+            done, errors, elapsed = run_batch_checkpointed(args.input, args.output, args.checkpoint, args.method,
+                                                           args.workers, args.limit)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            print(f"Stopped; progress saved to {args.checkpoint}, run again to resume", file=sys.stderr)
+            return 1
+        print(f"{done:,} scenarios done in total ({elapsed:.2f}s this run), {errors:,} errors", file=sys.stderr)
+        return 1 if errors else 0
+
+    input_stream = open(args.input) if args.input else sys.stdin
+    output_stream = open(args.output, "w") if args.output else sys.stdout
+    try:
+        count, errors, elapsed = run_batch(input_stream, output_stream, args.method, args.workers)
+    finally:
+        if args.input:
+            input_stream.close()
+        if args.output:
+            output_stream.close()
+
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"Processed {count:,} scenarios in {elapsed:.2f}s ({rate:,.1f} scenarios/s), {errors:,} errors",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# benchmark.py - Benchmark suite for the prediction engines
+#
+# Runs every engine over a fixed corpus of scenarios, records latency
+# percentiles, evaluations per second and peak memory, writes JSON results
+# and fails (exit code 1) when a run regresses past the stored baseline.
+#
+#   python benchmark.py                       # run and compare with baseline
+#   python benchmark.py --update-baseline     # store this run as the baseline
+#   python benchmark.py --engines exhaustive --repeats 10
+#
+# Baseline timings are machine specific: refresh them with --update-baseline
+# when moving to new hardware.
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from card import parse_card
+from evaluator import evaluate_hand
+from monte_carlo import predict_hands_monte_carlo
+from predictor import predict_hands, predict_hands_vectorized, predict_hands_with_current
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+# Monte Carlo sample count used for benchmarking (small so the suite stays quick)
+BENCH_MC_SIMULATIONS = 2000
+
+# Skip exhaustive engines when a scenario has more runouts than this (pre-flop)
+MAX_EXHAUSTIVE_RUNOUTS = 50000
+
+# Fixed scenario corpus: (name, community cards, pocket hands)
+SCENARIOS = [
+    # --- PRE-FLOP ---
+    ("preflop_pairs", "", ["AS AH", "KS KH", "QS QH", "JS JH", "10S 10H", "7D 2C"]),
+    ("preflop_suited", "", ["AH KH", "QD JD", "9C 8C", "7S 6S", "AC 2D", "5H 5D"]),
+
+    # --- FLOP ---
+    ("flop_dry", "AC 5H 9D", ["AS AH", "KS KH", "QS QH", "JS JH", "10S 10H", "7D 2C"]),
+    ("flop_monotone", "AH 8H 3H", ["KH QC", "JH 10H", "AS AD", "8S 8D", "2H 2C", "9C 7C"]),
+    ("flop_wheel_draw", "AC 2D 3S", ["4H 5H", "4C 6C", "AS KD", "2S 2H", "QH JH", "5S 10D"]),
+    ("flop_flush_heavy", "KD 9D 4D", ["AD 2C", "QD JD", "KS KH", "10D 9C", "5D 5S", "AH 4S"]),
+    ("flop_drawing_dead", "AH KH QH", ["JH 10H", "AS AD", "KS KD", "3C 3D", "9H 8H", "7C 7D"]),
+
+    # --- TURN ---
+    ("turn_wheel", "AC 2D 3S 4H", ["5C 9D", "5S KH", "6H 7H", "AS AD", "QC QD", "JS 10S"]),
+    ("turn_multiway_tie", "10C JD QS KH", ["2C 3D", "2S 3S", "4C 5D", "4H 6S", "7C 8D", "7H 8S"]),
+    ("turn_flush_heavy", "AH 8H 3H 9H", ["KH QC", "JH 10H", "AS AD", "8S 8D", "2H 2C", "9C 7C"]),
+    ("turn_royal_lock", "AH KH QH JH", ["10H 2C", "AS AD", "KS KD", "3C 3D", "4C 4D", "5S 6S"]),
+
+    # --- RIVER ---
+    ("river_board_straight", "10C JD QS KH AC", ["2C 3D", "2S 3S", "4C 5D", "4H 6S", "7C 8D", "7H 8S"]),
+    ("river_flush_board", "2H 7H 9H JH KH", ["AH 3C", "QH QS", "3H 4H", "AS AD", "8C 8D", "10H 10D"]),
+]
+
+def load_scenario(board_string, pocket_strings):
+    """Parse a corpus entry into Card lists"""
+    community = [parse_card(c) for c in board_string.split()]
+    pockets = [[parse_card(c) for c in pocket.split()] for pocket in pocket_strings]
+    return community, pockets
+
+def count_runouts(community, pockets):
+    """Number of possible boards an exhaustive engine has to test"""
+    remaining = 52 - len(community) - 2 * len(pockets)
+    return math.comb(remaining, 5 - len(community))
+
+def run_exhaustive(community, pockets):
+    return predict_hands_with_current(community, pockets)
+
+def run_win_only(community, pockets):
+    return predict_hands(community, pockets)
+
+def run_exhaustive_full(community, pockets):
+    return predict_hands_with_current(community, pockets, compress=False)
+
+def run_monte_carlo(community, pockets):
+    return predict_hands_monte_carlo(community, pockets, BENCH_MC_SIMULATIONS)
+
+def run_vectorized(community, pockets):
+    return predict_hands_vectorized(community, pockets)
+
+# Engine name -> (run function, exact?)
+ENGINES = {
+    "exhaustive": (run_exhaustive, True),
+    "exhaustive_full": (run_exhaustive_full, True),
+    "win_only": (run_win_only, True),
+    "monte_carlo": (run_monte_carlo, False),
+}
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    pass  # numpy not installed
+else:
+    ENGINES["vectorized"] = (run_vectorized, True)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def benchmark_engine(engine_name, scenario, repeats):
+    """Time one engine on one scenario, returns a result dict (or None if skipped)"""
+    name, board_string, pocket_strings = scenario
+    run, exact = ENGINES[engine_name]
+    community, pockets = load_scenario(board_string, pocket_strings)
+
+    if exact and count_runouts(community, pockets) > MAX_EXHAUSTIVE_RUNOUTS:
+        return None
+
+    latencies = []
+    results = None
+    for repeat in range(repeats):
+        # Start every run from the same state: cold cache, same random stream
+        evaluate_hand.cache_clear()
+        random.seed(repeat)
+        start = time.perf_counter()
+        results = run(community, pockets)
+        latencies.append(time.perf_counter() - start)
+
+    # Peak memory from a separate run - tracemalloc slows things down too much to time
+    evaluate_hand.cache_clear()
+    random.seed(0)
+    tracemalloc.start()
+    run(community, pockets)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    boards = results[0]['simulations']
+    evaluations = boards * len(pockets)  # One 7-card evaluation per player per board
+    p50 = percentile(latencies, 50)
+
+    return {
+        'engine': engine_name,
+        'scenario': name,
+        'boards': boards,
+        'evaluations': evaluations,
+        'latency_p50': p50,
+        'latency_p90': percentile(latencies, 90),
+        'latency_p99': percentile(latencies, 99),
+        'latency_min': latencies[0],
+        'evaluations_per_second': evaluations / p50 if p50 > 0 else 0,
+        'peak_memory_bytes': peak_memory,
+        # Exact engines must keep giving exactly the same answer
+        'win_probabilities': ({str(r['player']): round(r['win_probability'], 6) for r in results}
+                              if exact else None),
+    }
+
+def run_benchmarks(engine_names, repeats, scenario_filter=None):
+    """Run every selected engine over the corpus"""
+    entries = []
+    for scenario in SCENARIOS:
+        if scenario_filter and scenario_filter not in scenario[0]:
+            continue
+        for engine_name in engine_names:
+            entry = benchmark_engine(engine_name, scenario, repeats)
+            if entry is None:
+                print(f"  {engine_name:<14} {scenario[0]:<24} skipped (too many runouts)")
+                continue
+            entries.append(entry)
+            print(f"  {engine_name:<14} {scenario[0]:<24} "
+                  f"p50 {entry['latency_p50']*1000:>9.2f} ms  "
+                  f"p90 {entry['latency_p90']*1000:>9.2f} ms  "
+                  f"{entry['evaluations_per_second']:>11,.0f} evals/s  "
+                  f"{entry['peak_memory_bytes']/1024:>8.0f} KiB")
+    return entries
+
+def compare_with_baseline(entries, baseline, latency_threshold, memory_threshold):
+    """Return a list of human-readable regression messages (empty = all good)"""
+    baseline_entries = {(e['engine'], e['scenario']): e for e in baseline['entries']}
+    regressions = []
+
+    for entry in entries:
+        key = (entry['engine'], entry['scenario'])
+        base = baseline_entries.get(key)
+        if base is None:
+            continue  # New engine or scenario - nothing to compare against
+
+        label = f"{entry['engine']} / {entry['scenario']}"
+
+        if entry['latency_p50'] > base['latency_p50'] * (1 + latency_threshold):
+            regressions.append(
+                f"{label}: p50 latency {entry['latency_p50']*1000:.2f} ms vs "
+                f"baseline {base['latency_p50']*1000:.2f} ms")
+
+        if entry['peak_memory_bytes'] > base['peak_memory_bytes'] * (1 + memory_threshold):
+            regressions.append(
+                f"{label}: peak memory {entry['peak_memory_bytes']:,} B vs "
+                f"baseline {base['peak_memory_bytes']:,} B")
+
+        if entry['win_probabilities'] is not None and base.get('win_probabilities') is not None:
+            if entry['win_probabilities'] != base['win_probabilities']:
+                regressions.append(f"{label}: win probabilities changed from baseline")
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the poker prediction engines")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="comma separated engine names (default: all)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per engine and scenario")
+    parser.add_argument("--scenario", default=None, help="only run scenarios whose name contains this")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--latency-threshold", type=float, default=0.25,
+                        help="allowed p50 slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="allowed peak memory growth before failing")
+    args = parser.parse_args(argv)
+
+    engine_names = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = [e for e in engine_names if e not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(unknown)} (choose from {', '.join(ENGINES)})")
+
+    print("=" * 70)
+    print("PREDICTION ENGINE BENCHMARK")
+    print("=" * 70)
+    entries = run_benchmarks(engine_names, args.repeats, args.scenario)
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeats': args.repeats,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'entries': entries,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline} - run with --update-baseline to create one")
+        return 0
+
+    regressions = compare_with_baseline(entries, baseline, args.latency_threshold, args.memory_threshold)
+    if regressions:
+        print("\n✗ REGRESSIONS DETECTED:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+
+    print("\n✓ No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
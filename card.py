@@ -1,5 +1,10 @@
 # card.py - Card representation and parsing
 
+SUITS = ['H', 'D', 'C', 'S']
+
+# Largest table the engines and entry points support (heads-up is the smallest)
+MAX_PLAYERS = 10
+
 class Card:
     """Represents a single playing card"""
     
@@ -54,4 +59,12 @@ def parse_card(card_string):
 
 def create_deck():
     """Create a full 52-card deck"""
-    return [Card(v, s) for v in range(2, 15) for s in ['H', 'D', 'C', 'S']]
+    return [Card(v, s) for v in range(2, 15) for s in SUITS]
+
+def card_id(card):
+    """Integer id 0-51 of a card, in create_deck() order (2H=0, 2D=1, ..., AS=51)"""
+    return (card.value - 2) * 4 + SUITS.index(card.suit)
+
+def card_from_id(card_id):
+    """Card for an id from card_id()"""
+    return Card(card_id // 4 + 2, SUITS[card_id % 4])
@@ -0,0 +1,122 @@
+# checkpoint.py - Resumable progress for long jobs: atomic checkpoints, chunk ledgers, ETA
+#
+#   save_checkpoint(path, state)       write a JSON state atomically (temp file, fsync, rename)
+#   load_checkpoint(path)              the last saved state, or None
+#   ChunkLedger                        completed chunks of an exhaustive job and their counters
+#   Progress                           done / total, measured throughput and ETA on stderr
+#
+# A checkpoint is either the old file or the new one, never half of each, so
+# a job killed at any moment resumes from its last save. The ChunkLedger
+# merges chunk counters into per-scenario equity.EquityCounts strictly in
+# chunk order (chunks finished early wait their turn), so a job that was
+# stopped and resumed any number of times ends with exactly the counts of an
+# uninterrupted run.
+
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+
+from equity import EquityCounts
+
+# Seconds between checkpoint saves, and between progress lines
+CHECKPOINT_SEC = 30
+PROGRESS_SEC = 10
+
+def save_checkpoint(path, state):
+    temp = f"{path}.tmp"
+    with open(temp, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+class ChunkLedger:
+    """Which chunks of a job are done, with their counters merged per scenario in chunk order"""
+
+    def __init__(self, job_id, chunks, players):
+        """chunks: (scenario index, ...) per chunk; players: player count per scenario"""
+        self.job_id = job_id
+        self.chunks = chunks
+        self.counts = [EquityCounts(n) for n in players]
+        self.merged = 0     # chunks before this one are merged into counts
+        self.waiting = {}   # chunk -> EquityCounts, finished ahead of the merged ones
+
+    def __contains__(self, chunk):
+        return chunk < self.merged or chunk in self.waiting
+
+    def __len__(self):
+        return self.merged + len(self.waiting)
+
+    @property
+    def complete(self):
+        return self.merged == len(self.chunks)
+
+    def add(self, chunk, counts):
+        self.waiting[chunk] = counts
+        while self.merged in self.waiting:
+            self.counts[self.chunks[self.merged][0]].add(self.waiting.pop(self.merged))
+            self.merged += 1
+
+    def to_json(self):
+        return {'job_id': self.job_id, 'merged': self.merged,
+                'counts': [counts.to_json() for counts in self.counts],
+                'waiting': {str(chunk): counts.to_json() for chunk, counts in self.waiting.items()}}
+
+    def restore(self, state):
+        """Continue from a to_json() state saved for the same job"""
+        if state.get('job_id') != self.job_id:
+            raise ValueError(f"Checkpoint is for job {state.get('job_id')}, not {self.job_id}.")
+        self.merged = state['merged']
+        self.counts = [EquityCounts.from_json(counts) for counts in state['counts']]
+        self.waiting = {int(chunk): EquityCounts.from_json(counts) for chunk, counts in state['waiting'].items()}
+
+class Progress:
+    """
+    Progress lines with throughput and ETA, measured on the work done since start
+
+    Work is counted in units (runouts, scenarios) so the ETA holds when
+    items differ in size; items are reported alongside.
+    """
+
+    def __init__(self, total_items, total_units, unit, items_done=0, units_done=0, stream=sys.stderr,
+                 interval=PROGRESS_SEC):
+        self.total_items, self.total_units, self.unit = total_items, total_units, unit
+        self.items_done, self.units_done = items_done, units_done
+        self.resumed_units = units_done
+        self.stream = stream
+        self.interval = interval
+        self.started = self.last_report = time.monotonic()
+
+    def rate(self):
+        """Units per second since start (resumed work not counted)"""
+        elapsed = time.monotonic() - self.started
+        return (self.units_done - self.resumed_units) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """Seconds left at the measured rate, None before anything was measured"""
+        rate = self.rate()
+        return (self.total_units - self.units_done) / rate if rate else None
+
+    def advance(self, items=1, units=1):
+        self.items_done += items
+        self.units_done += units
+        if time.monotonic() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self):
+        self.last_report = time.monotonic()
+        if self.stream is None:
+            return
+        percent = self.units_done / self.total_units * 100 if self.total_units else 100.0
+        eta = self.eta()
+        eta = str(timedelta(seconds=round(eta))) if eta is not None else "?"
+        print(f"{self.items_done:,}/{self.total_items:,} done ({percent:.1f}%), "
+              f"{self.rate():,.0f} {self.unit}/s, ETA {eta}", file=self.stream, flush=True)
@@ -0,0 +1,154 @@
+# convergence_report.py - Monte Carlo accuracy-vs-time convergence report
+#
+# Deals a reproducible corpus of random 6-player flop situations, computes
+# the exact equities with the exhaustive engine, then runs every Monte Carlo
+# variant at increasing sample counts and records wall time against RMSE and
+# maximum absolute error (in percentage points of win probability).
+#
+#   python convergence_report.py --situations 50 --csv convergence.csv
+#
+# Use the table to pick num_simulations defaults: the smallest count whose
+# RMSE meets --target-rmse is printed for each variant.
+
+import argparse
+import csv
+import math
+import random
+import sys
+import time
+
+from card import create_deck
+from monte_carlo import predict_hands_monte_carlo
+from predictor import predict_hands_with_current
+
+DEFAULT_SAMPLE_COUNTS = [250, 500, 1000, 2500, 5000, 10000]
+
+# Variant name -> function(community_cards, pocket_hands, num_simulations)
+MC_VARIANTS = {
+    "monte_carlo": predict_hands_monte_carlo,
+}
+
+CSV_FIELDS = ['variant', 'simulations', 'situations', 'mean_time_sec', 'rmse', 'max_abs_error']
+
+def deal_flop_corpus(num_situations, num_players=6, seed=0):
+    """Deal reproducible random flop situations: list of (community_cards, pocket_hands)"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(num_situations):
+        deck = create_deck()
+        rng.shuffle(deck)
+        pockets = [deck[2 * i:2 * i + 2] for i in range(num_players)]
+        community = deck[2 * num_players:2 * num_players + 3]
+        corpus.append((community, pockets))
+    return corpus
+
+def win_probabilities_by_player(results):
+    """Map player number -> win probability (engines return results sorted by equity)"""
+    return {r['player']: r['win_probability'] for r in results}
+
+def measure_variant(variant_name, corpus, exact_equities, num_simulations, seed=0):
+    """Run one variant at one sample count over the whole corpus"""
+    engine = MC_VARIANTS[variant_name]
+    random.seed(seed)
+
+    squared_error_sum = 0.0
+    error_count = 0
+    max_abs_error = 0.0
+    total_time = 0.0
+
+    for (community, pockets), exact in zip(corpus, exact_equities):
+        start = time.perf_counter()
+        results = engine(community, pockets, num_simulations)
+        total_time += time.perf_counter() - start
+
+        estimates = win_probabilities_by_player(results)
+        for player, exact_pct in exact.items():
+            error = estimates[player] - exact_pct
+            squared_error_sum += error * error
+            error_count += 1
+            max_abs_error = max(max_abs_error, abs(error))
+
+    return {
+        'variant': variant_name,
+        'simulations': num_simulations,
+        'situations': len(corpus),
+        'mean_time_sec': total_time / len(corpus),
+        'rmse': math.sqrt(squared_error_sum / error_count),
+        'max_abs_error': max_abs_error,
+    }
+
+def run_convergence(num_situations, sample_counts, variants, seed=0):
+    """Build the corpus, compute exact equities and measure every variant/count pair"""
+    corpus = deal_flop_corpus(num_situations, seed=seed)
+
+    print(f"Computing exact equities for {num_situations} flop situations...")
+    start = time.perf_counter()
+    exact_equities = [win_probabilities_by_player(predict_hands_with_current(community, pockets))
+                      for community, pockets in corpus]
+    exact_time = (time.perf_counter() - start) / num_situations
+    print(f"Exhaustive: {exact_time:.3f} s per situation\n")
+
+    rows = []
+    print(f"{'Variant':<14} {'Sims':>8} {'Time (s)':>10} {'RMSE (pp)':>10} {'Max err (pp)':>13}")
+    print("-" * 60)
+    for variant_name in variants:
+        for num_simulations in sample_counts:
+            row = measure_variant(variant_name, corpus, exact_equities, num_simulations, seed)
+            rows.append(row)
+            print(f"{variant_name:<14} {num_simulations:>8,} {row['mean_time_sec']:>10.3f} "
+                  f"{row['rmse']:>10.3f} {row['max_abs_error']:>13.3f}")
+    return rows, exact_time
+
+def recommend_simulations(rows, target_rmse):
+    """Smallest sample count per variant whose RMSE meets the target (None if none do)"""
+    recommendations = {}
+    for row in sorted(rows, key=lambda r: r['simulations']):
+        if row['variant'] not in recommendations:
+            recommendations[row['variant']] = None
+        if recommendations[row['variant']] is None and row['rmse'] <= target_rmse:
+            recommendations[row['variant']] = row['simulations']
+    return recommendations
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo accuracy-vs-time convergence report")
+    parser.add_argument("--situations", type=int, default=20, help="random flop situations in the corpus")
+    parser.add_argument("--counts", default=",".join(str(c) for c in DEFAULT_SAMPLE_COUNTS),
+                        help="comma separated num_simulations values to test")
+    parser.add_argument("--variants", default=",".join(MC_VARIANTS), help="comma separated MC variants")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the corpus and the samplers")
+    parser.add_argument("--target-rmse", type=float, default=0.5,
+                        help="RMSE (percentage points) a recommended default must reach")
+    parser.add_argument("--csv", default=None, help="also write the table to this CSV file")
+    args = parser.parse_args(argv)
+
+    sample_counts = sorted(int(c) for c in args.counts.split(",") if c.strip())
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in variants if v not in MC_VARIANTS]
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(unknown)} (choose from {', '.join(MC_VARIANTS)})")
+
+    print("=" * 60)
+    print("MONTE CARLO CONVERGENCE REPORT")
+    print("=" * 60)
+    rows, _ = run_convergence(args.situations, sample_counts, variants, args.seed)
+
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"\nTable written to {args.csv}")
+
+    print(f"\nRecommended num_simulations (RMSE <= {args.target_rmse} pp):")
+    for variant_name, count in recommend_simulations(rows, args.target_rmse).items():
+        if count is None:
+            print(f"  {variant_name}: none of the tested counts - try larger values")
+        else:
+            print(f"  {variant_name}: {count:,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+# distributed.py - Exhaustive jobs split across machines through a TCP work queue
+#
+#   python main.py coordinator scenarios.jsonl --host 0.0.0.0 > results.jsonl
+#   python main.py coordinator sweep.jsonl --local-workers 8 --checkpoint sweep.ckpt   # resumable, one box
+#   python main.py worker --host 10.0.0.5 --processes 4      # on every worker machine
+#
+#   counts = run_local(scenarios, workers=4)   # the same, all on localhost
+#
+# The coordinator turns a job - a list of (board, pockets) scenarios with
+# every pocket known - into deterministic chunks: the runouts of each
+# scenario are split by their first cards (job_chunks), so a chunk is one
+# contiguous block of itertools.combinations order. Coordinator and workers
+# derive the same chunk list from the job spec, so only chunk numbers and
+# counters travel. Workers pull chunks, count them with equity.count_exhaustive
+# and send back the integer tallies. Merging the chunks of a scenario in
+# chunk order gives exactly the counts of one count_exhaustive over all its
+# runouts, whichever worker counted what and in whatever order.
+#
+# Chunks are leased. A worker that disconnects has its chunks queued again
+# at once; a worker that stays connected but silent loses them when the
+# lease times out. A chunk's first result wins and late duplicates are
+# ignored. A job fails after a chunk has been handed out MAX_ATTEMPTS times.
+# With --checkpoint the finished chunks and their counters are saved to
+# disk (checkpoint.py), and a restarted coordinator resumes from them with
+# the same final counts; progress lines report throughput and the ETA.
+#
+# Protocol: one JSON object per line over TCP, worker asks, coordinator answers
+#   {"op": "job"}                          -> {"job_id": ..., "job": spec}
+#   {"op": "lease"}                        -> {"chunk": n} | {"wait": sec} | {"done": true}
+#   {"op": "result", "job_id", "chunk", "counts"} -> {"ok": true}
+#   {"op": "failed", "job_id", "chunk", "error"}  -> {"ok": true}
+# The queue is not authenticated: only expose it on a trusted network.
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from collections import deque
+
+from checkpoint import CHECKPOINT_SEC, ChunkLedger, Progress, load_checkpoint, save_checkpoint
+from equity import EquityCounts, cards_to_ids, count_exhaustive
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8790
+# Largest number of runouts in one chunk (heads-up pre-flop: 990 chunks of up to 15,180)
+CHUNK_RUNOUTS = 20_000
+LEASE_TIMEOUT_SEC = 120
+MAX_ATTEMPTS = 5
+POLL_SEC = 0.5
+# After the job is done the coordinator keeps answering "done" this long, so polling workers hear it
+DONE_LINGER_SEC = 2 * POLL_SEC
+CONNECT_RETRIES = 10
+RETRY_SEC = 1.0
+
+class DistributedJobError(Exception):
+    """A chunk kept failing, or the job is not valid"""
+
+def job_spec(scenarios, chunk_runouts=CHUNK_RUNOUTS):
+    """JSON job description of (community_cards, pocket_hands) scenarios"""
+    spec = {'chunk_runouts': chunk_runouts, 'scenarios': []}
+    for n, (community_cards, pocket_hands) in enumerate(scenarios):
+        if None in pocket_hands:
+            raise DistributedJobError(f"Scenario {n + 1}: distributed jobs need every pocket known.")
+        spec['scenarios'].append({'board': cards_to_ids(community_cards),
+                                  'pockets': [cards_to_ids(p) for p in pocket_hands]})
+    return spec
+
+def job_id(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+def _deck(scenario):
+    used = set(scenario['board']).union(*scenario['pockets'])
+    return [c for c in range(52) if c not in used]
+
+def job_chunks(spec):
+    """
+    Deterministic chunks of a job: (scenario index, deck positions of the first runout cards)
+
+    Each scenario's runouts are split on as few leading cards as keep every
+    chunk within spec['chunk_runouts']. The chunks with a given prefix are
+    the runouts starting with those cards, so in order they cover
+    itertools.combinations(deck, cards_needed) once, front to back.
+    """
+    chunks = []
+    for index, scenario in enumerate(spec['scenarios']):
+        deck_size, needed = len(_deck(scenario)), 5 - len(scenario['board'])
+        split = 0
+        while split < needed and math.comb(deck_size - split, needed - split) > spec['chunk_runouts']:
+            split += 1
+        # Every card after the prefix still has to fit: prefix positions stop needed - split short of the end
+        positions = range(deck_size - needed + split)
+        chunks.extend((index, prefix) for prefix in itertools.combinations(positions, split))
+    return chunks
+
+def count_chunk(spec, chunk):
+    """EquityCounts of one chunk's runouts"""
+    index, prefix = chunk
+    scenario = spec['scenarios'][index]
+    deck = _deck(scenario)
+    board = scenario['board'] + [deck[p] for p in prefix]
+    rest = deck[prefix[-1] + 1:] if prefix else deck
+    return count_exhaustive(scenario['pockets'], board, rest)
+
+def runouts_in_chunk(spec, chunk):
+    """Number of runouts in a chunk"""
+    index, prefix = chunk
+    scenario = spec['scenarios'][index]
+    deck_size, needed = len(_deck(scenario)), 5 - len(scenario['board'])
+    if not prefix:
+        return math.comb(deck_size, needed)
+    return math.comb(deck_size - prefix[-1] - 1, needed - len(prefix))
+
+class Coordinator:
+    """
+    Hands out a job's chunks to workers over TCP and merges what they send back
+
+    With a checkpoint path, finished chunks and their counters are saved
+    there every checkpoint_sec and when the coordinator stops; a
+    coordinator started with the same job and path carries on from them.
+    progress: stream for progress lines with the ETA (None = quiet).
+    """
+
+    def __init__(self, scenarios, chunk_runouts=CHUNK_RUNOUTS, lease_timeout=LEASE_TIMEOUT_SEC,
+                 max_attempts=MAX_ATTEMPTS, checkpoint=None, checkpoint_sec=CHECKPOINT_SEC, progress=None):
+        self.spec = job_spec(scenarios, chunk_runouts)
+        self.job_id = job_id(self.spec)
+        self.chunks = job_chunks(self.spec)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.ledger = ChunkLedger(self.job_id, self.chunks, [len(s['pockets']) for s in self.spec['scenarios']])
+        self.checkpoint = checkpoint
+        self.checkpoint_sec = checkpoint_sec
+        state = load_checkpoint(checkpoint)
+        if state:
+            self.ledger.restore(state)
+        self.last_checkpoint = time.monotonic()
+        self.pending = deque(chunk for chunk in range(len(self.chunks)) if chunk not in self.ledger)
+        self.leases = {}      # chunk -> (connection number, lease deadline)
+        self.attempts = [0] * len(self.chunks)
+        self.runouts = [runouts_in_chunk(self.spec, chunk) for chunk in self.chunks]
+        done = [chunk for chunk in range(len(self.chunks)) if chunk in self.ledger]
+        self.progress = Progress(len(self.chunks), sum(self.runouts), "runouts", len(done),
+                                 sum(self.runouts[chunk] for chunk in done), progress)
+        self.error = None
+        self.finished = None  # asyncio.Event, set when every chunk is in or the job failed
+        self.server = None
+        self.connections = 0
+        self.stats = {'workers': 0, 'leased': 0, 'completed': 0, 'requeued': 0, 'duplicates': 0, 'failed': 0}
+
+    def _requeue(self, chunks):
+        # To the front, so the queue stays roughly in chunk order
+        for chunk in sorted(chunks, reverse=True):
+            del self.leases[chunk]
+            self.pending.appendleft(chunk)
+            self.stats['requeued'] += 1
+
+    def lease(self, connection):
+        """Answer to a lease request"""
+        if self.error or self.ledger.complete:
+            return {'done': True}
+        now = time.monotonic()
+        self._requeue([chunk for chunk, (_, deadline) in self.leases.items() if deadline < now])
+        if not self.pending:
+            return {'wait': POLL_SEC}
+        chunk = self.pending.popleft()
+        self.attempts[chunk] += 1
+        if self.attempts[chunk] > self.max_attempts:
+            self._fail(f"Chunk {chunk} was handed out {self.max_attempts} times without a result.")
+            return {'done': True}
+        self.leases[chunk] = (connection, now + self.lease_timeout)
+        self.stats['leased'] += 1
+        return {'chunk': chunk}
+
+    def _current(self, message):
+        """Whether a worker's message is about a chunk of this job"""
+        chunk = message.get('chunk')
+        return message.get('job_id') == self.job_id and isinstance(chunk, int) and 0 <= chunk < len(self.chunks)
+
+    def complete(self, message):
+        chunk = message['chunk']
+        if not self._current(message) or chunk in self.ledger:
+            self.stats['duplicates'] += 1
+            return
+        self.ledger.add(chunk, EquityCounts.from_json(message['counts']))
+        self.leases.pop(chunk, None)
+        if chunk in self.pending:  # its lease had expired, but the result came in after all
+            self.pending.remove(chunk)
+        self.stats['completed'] += 1
+        self.progress.advance(1, self.runouts[chunk])
+        if self.checkpoint and time.monotonic() - self.last_checkpoint >= self.checkpoint_sec:
+            self.save()
+        if self.ledger.complete:
+            self.finished.set()
+
+    def save(self):
+        """Write the checkpoint now"""
+        save_checkpoint(self.checkpoint, self.ledger.to_json())
+        self.last_checkpoint = time.monotonic()
+
+    def chunk_failed(self, message):
+        self.stats['failed'] += 1
+        print(f"Chunk {message['chunk']} failed on a worker: {message.get('error')}", file=sys.stderr)
+        if self._current(message) and message['chunk'] in self.leases:
+            self._requeue([message['chunk']])
+
+    def _fail(self, error):
+        self.error = error
+        self.finished.set()
+
+    def disconnected(self, connection):
+        self._requeue([chunk for chunk, (owner, _) in self.leases.items() if owner == connection])
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        connection = self.connections
+        self.stats['workers'] += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                op = message.get('op')
+                if op == "job":
+                    reply = {'job_id': self.job_id, 'job': self.spec}
+                elif op == "lease":
+                    reply = self.lease(connection)
+                elif op == "result":
+                    self.complete(message)
+                    reply = {'ok': True}
+                elif op == "failed":
+                    self.chunk_failed(message)
+                    reply = {'ok': True}
+                else:
+                    reply = {'error': f"Unknown op {op!r}"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError, TypeError, asyncio.CancelledError):
+            pass  # Worker went away or sent garbage: its leases go back in the queue
+        finally:
+            self.disconnected(connection)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start serving, returns the bound port"""
+        self.finished = asyncio.Event()
+        if self.ledger.complete:
+            self.finished.set()
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def wait(self, linger=DONE_LINGER_SEC):
+        """Wait for every chunk, stop serving, returns the counts per scenario (chunks merged in order)"""
+        try:
+            await self.finished.wait()
+            await asyncio.sleep(linger)
+        finally:
+            self.server.close()
+            await self.server.wait_closed()
+            if self.checkpoint:
+                self.save()
+        if self.error:
+            raise DistributedJobError(self.error)
+        self.progress.report()
+        return self.ledger.counts
+
+class _Connection:
+    """A worker's line-oriented JSON connection to the coordinator"""
+
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port), timeout=LEASE_TIMEOUT_SEC)
+        self.stream = self.sock.makefile("rwb")
+
+    def call(self, message):
+        self.stream.write(json.dumps(message).encode() + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+def _work(connection):
+    """Count leased chunks until the coordinator says done, returns chunks counted"""
+    reply = connection.call({'op': "job"})
+    spec, current_job = reply['job'], reply['job_id']
+    chunks = job_chunks(spec)
+    counted = 0
+    while True:
+        reply = connection.call({'op': "lease"})
+        if reply.get('done'):
+            return counted
+        if 'wait' in reply:
+            time.sleep(reply['wait'])
+            continue
+        chunk = reply['chunk']
+        try:
+            counts = count_chunk(spec, chunks[chunk])
+        except Exception as e:
+            connection.call({'op': "failed", 'job_id': current_job, 'chunk': chunk,
+                             'error': f"{type(e).__name__}: {e}"})
+            continue
+        connection.call({'op': "result", 'job_id': current_job, 'chunk': chunk, 'counts': counts.to_json()})
+        counted += 1
+
+def run_worker(host=DEFAULT_HOST, port=DEFAULT_PORT, retries=CONNECT_RETRIES):
+    """
+    Pull and count chunks from a coordinator until its job is done
+
+    Reconnects (up to retries times in a row, RETRY_SEC apart) when the
+    coordinator cannot be reached, so workers may start first. Returns the
+    number of chunks this worker counted.
+    """
+    counted = 0
+    failures = 0
+    while True:
+        try:
+            connection = _Connection(host, port)
+        except OSError as e:
+            failures += 1
+            if failures > retries:
+                print(f"Worker giving up on {host}:{port}: {e}", file=sys.stderr)
+                return counted
+            time.sleep(RETRY_SEC)
+            continue
+        failures = 0
+        try:
+            counted += _work(connection)
+            return counted
+        except (OSError, ValueError) as e:
+            print(f"Worker lost {host}:{port} ({e}), reconnecting", file=sys.stderr)
+            time.sleep(RETRY_SEC)
+        finally:
+            connection.close()
+
+async def _stop_workers(processes, coordinator):
+    """Wait for local worker processes to hear "done" - or stop them if the job was interrupted"""
+    loop = asyncio.get_running_loop()
+    for process in processes:
+        if not coordinator.finished.is_set():
+            process.terminate()
+        await loop.run_in_executor(None, process.join)
+
+def run_local(scenarios, workers=None, host=DEFAULT_HOST, **options):
+    """Run a job with a coordinator and worker processes on this machine, returns counts per scenario"""
+    workers = workers or os.cpu_count() or 1
+    coordinator = Coordinator(scenarios, **options)
+
+    async def run():
+        port = await coordinator.start(host, 0)
+        processes = [multiprocessing.Process(target=run_worker, args=(host, port)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        try:
+            return await coordinator.wait()
+        finally:
+            await _stop_workers(processes, coordinator)
+
+    return asyncio.run(run())
+
+def coordinator_main(argv=None):
+    from predictor import results_from_counts
+    from scenario import parse_scenario, results_to_json
+
+    parser = argparse.ArgumentParser(prog="main.py coordinator",
+                                     description="Serve an exhaustive JSONL scenario job to distributed workers")
+    parser.add_argument("scenarios", help="JSONL scenarios file (see scenario.py); every pocket known")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (0.0.0.0 for remote workers)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--chunk-runouts", type=int, default=CHUNK_RUNOUTS, help="largest chunk, in runouts")
+    parser.add_argument("--lease-timeout", type=float, default=LEASE_TIMEOUT_SEC,
+                        help="seconds before a silent worker's chunk is handed to another")
+    parser.add_argument("--local-workers", type=int, default=0, help="also start this many workers here")
+    parser.add_argument("--checkpoint", default=None,
+                        help="save progress to this file and resume from it when it exists")
+    parser.add_argument("--checkpoint-sec", type=float, default=CHECKPOINT_SEC, help="seconds between saves")
+    args = parser.parse_args(argv)
+
+    # Invalid lines are reported in the output, as in batch mode, and left out of the job
+    outputs, job = [], []
+    with open(args.scenarios) as f:
+        for line in (line for line in f if line.strip()):
+            try:
+                data = json.loads(line)
+                scenario_id = data.get('id') if isinstance(data, dict) else None
+                community, pockets = parse_scenario(data)
+                if None in pockets:
+                    raise ValueError("Distributed jobs need every pocket known.")
+            except json.JSONDecodeError as e:
+                outputs.append({'id': None, 'error': f"Invalid JSON: {e}"})
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                outputs.append({'id': scenario_id, 'error': str(e)})
+            else:
+                outputs.append(scenario_id)
+                job.append((community, pockets))
+
+    try:
+        coordinator = Coordinator(job, args.chunk_runouts, args.lease_timeout, checkpoint=args.checkpoint,
+                                  checkpoint_sec=args.checkpoint_sec, progress=sys.stderr)
+    except (ValueError, KeyError) as e:
+        print(f"❌ Cannot resume from {args.checkpoint}: {e}", file=sys.stderr)
+        return 1
+
+    async def run():
+        port = await coordinator.start(args.host, args.port)
+        resumed = f", {len(coordinator.ledger):,} already done" if len(coordinator.ledger) else ""
+        print(f"Coordinator on {args.host}:{port}: {len(job)} scenarios in {len(coordinator.chunks):,} chunks"
+              f"{resumed} (job {coordinator.job_id})", file=sys.stderr)
+        processes = [multiprocessing.Process(target=run_worker, args=(DEFAULT_HOST, port))
+                     for _ in range(args.local_workers)]
+        for process in processes:
+            process.start()
+        try:
+            return await coordinator.wait()
+        finally:
+            await _stop_workers(processes, coordinator)
+
+    start = time.perf_counter()
+    try:
+        counts = iter(asyncio.run(run()))
+    except DistributedJobError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        if args.checkpoint:
+            print(f"Stopped; progress saved to {args.checkpoint}, run again to resume", file=sys.stderr)
+        return 1
+    scenarios = iter(job)
+    for output in outputs:
+        if not isinstance(output, dict):
+            community, pockets = next(scenarios)
+            results = results_from_counts(community, pockets, next(counts))
+            output = {'id': output, **results_to_json(results, community, "Exhaustive")}
+        print(json.dumps(output))
+    stats = ", ".join(f"{name} {value}" for name, value in coordinator.stats.items())
+    print(f"Done in {time.perf_counter() - start:.1f}s: {stats}", file=sys.stderr)
+    return 0
+
+def worker_main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py worker", description="Count chunks for a distributed job")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="coordinator address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--processes", type=int, default=1, help="worker processes on this machine")
+    args = parser.parse_args(argv)
+
+    processes = [multiprocessing.Process(target=run_worker, args=(args.host, args.port))
+                 for _ in range(args.processes - 1)]
+    for process in processes:
+        process.start()
+    try:
+        counted = run_worker(args.host, args.port)
+    except KeyboardInterrupt:
+        return 1
+    for process in processes:
+        process.join()
+    print(f"Worker done: {counted} chunks counted in this process", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("coordinator", "worker"):
+        main = coordinator_main if sys.argv[1] == "coordinator" else worker_main
+        sys.exit(main(sys.argv[2:]))
+    print("Usage: python distributed.py coordinator|worker [options]", file=sys.stderr)
+    sys.exit(2)
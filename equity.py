@@ -0,0 +1,575 @@
+# equity.py - Shared showdown counting for the enumeration engines
+#
+# The exhaustive and Monte Carlo engines differ only in which runouts (cards
+# completing the board) they visit: count_exhaustive deals all of them,
+# count_runouts takes any iterable (e.g. random_runouts). Every player is
+# evaluated once per runout and the counts are integer tallies:
+#   shares      - pot shares won, in units of 1/SHARE_UNIT of a pot
+#   wins / ties - runouts won outright / split
+#   categories  - how often each player made each hand category
+# Each player's pocket and known board are folded into an evaluator.HandState
+# once; a runout only adds its cards to the states, so the per-board loop
+# touches the new cards alone and creates no objects besides ints.
+
+import itertools
+import math
+import random
+from collections import Counter
+
+from card import MAX_PLAYERS, card_id
+from evaluator import HAND_NAMES, begin
+
+# Divisible by every tie size from 1 to MAX_PLAYERS, so split pots stay exact integers
+SHARE_UNIT = 2520
+SPLIT_SHARES = tuple(SHARE_UNIT // k if k else 0 for k in range(MAX_PLAYERS + 1))
+
+class EquityCounts:
+    """Integer tallies over runouts for each player; partial counts are merged with add()"""
+
+    def __init__(self, num_players):
+        self.boards = 0
+        self.shares = [0] * num_players
+        self.wins = [0] * num_players
+        self.ties = [0] * num_players
+        self.categories = [[0] * len(HAND_NAMES) for _ in range(num_players)]
+        # Categories in the order each player first made them (keeps equal counts in a stable order)
+        self.category_order = [[] for _ in range(num_players)]
+
+    def add(self, other):
+        self.boards += other.boards
+        for i in range(len(self.shares)):
+            self.shares[i] += other.shares[i]
+            self.wins[i] += other.wins[i]
+            self.ties[i] += other.ties[i]
+            for category in other.category_order[i]:
+                if not self.categories[i][category]:
+                    self.category_order[i].append(category)
+                self.categories[i][category] += other.categories[i][category]
+
+    def to_json(self):
+        """The tallies as a JSON-friendly dict (for work queues and checkpoints)"""
+        return {'boards': self.boards, 'shares': self.shares, 'wins': self.wins, 'ties': self.ties,
+                'categories': self.categories, 'category_order': self.category_order}
+
+    @classmethod
+    def from_json(cls, data):
+        counts = cls(len(data['shares']))
+        counts.boards, counts.shares, counts.wins, counts.ties = (data['boards'], data['shares'], data['wins'],
+                                                                  data['ties'])
+        counts.categories, counts.category_order = data['categories'], data['category_order']
+        return counts
+
+    def win_probability(self, player):
+        """Pot share won by a player (index), in percent"""
+        return self.shares[player] / (SHARE_UNIT * self.boards) * 100
+
+    def hand_type_counts(self, player):
+        """{hand name: runouts} for a player, in first-seen order"""
+        return {HAND_NAMES[c]: self.categories[player][c] for c in self.category_order[player]}
+
+def cards_to_ids(cards):
+    return [card_id(c) for c in cards]
+
+def remaining_ids(community_cards, pocket_hands):
+    """Ids of the cards not on the board or in any pocket, in deck order"""
+    used = set(cards_to_ids(community_cards))
+    for pocket in pocket_hands:
+        used.update(cards_to_ids(pocket))
+    return [c for c in range(52) if c not in used]
+
+def random_runouts(deck, cards_needed, num_samples, rng=random):
+    """
+    Yield num_samples random runouts of cards_needed ids from deck
+
+    A partial Fisher-Yates shuffle of a private copy of the deck; the same
+    list is refilled and yielded every time, so consume it before advancing.
+    """
+    deck = list(deck)
+    size = len(deck)
+    runout = [0] * cards_needed
+    randrange = rng.randrange
+    for _ in range(num_samples):
+        for k in range(cards_needed):
+            j = randrange(k, size)
+            card = deck[j]
+            deck[j] = deck[k]
+            deck[k] = card
+            runout[k] = card
+        yield runout
+
+def _showdown_counter(states, counts):
+    """
+    showdown(card, weight=1): rank every player's state plus card and credit
+    the winners, counting the board weight times
+
+    The state for each player holds the pocket and all board cards but the
+    last, so every board is ranked with one rank_with call per player.
+    """
+    shares, wins, ties = counts.shares, counts.wins, counts.ties
+    categories, category_order = counts.categories, counts.category_order
+    rankers = [state.rank_with for state in states]
+    ranks = [0] * len(states)
+    players = range(len(states))
+
+    def showdown(card, weight=1):
+        best = -1
+        winners = 0
+        for i in players:
+            rank = rankers[i](card)
+            ranks[i] = rank
+            if rank > best:
+                best = rank
+                winners = 1
+            elif rank == best:
+                winners += 1
+            player_categories = categories[i]
+            category = rank >> 20
+            if not player_categories[category]:
+                category_order[i].append(category)
+            player_categories[category] += weight
+
+        share = SPLIT_SHARES[winners] * weight
+        if winners == 1:
+            for i in players:
+                if ranks[i] == best:
+                    wins[i] += weight
+                    shares[i] += share
+                    break
+        else:
+            for i in players:
+                if ranks[i] == best:
+                    ties[i] += weight
+                    shares[i] += share
+        counts.boards += weight
+
+    return showdown
+
+def _begin_states(pocket_ids, board_ids):
+    return [begin(list(pocket) + list(board_ids)) for pocket in pocket_ids]
+
+def count_runouts(pocket_ids, board_ids, runouts, counts=None, weights=None):
+    """
+    Showdown every player on every runout, returns EquityCounts
+
+    Args:
+        pocket_ids: list of [id, id] per player
+        board_ids: ids of the known community cards
+        runouts: iterable of id sequences completing the board to 5 cards
+        counts: EquityCounts to add to (a new one by default)
+        weights: how many boards each runout stands for (1 each by default)
+    """
+    if counts is None:
+        counts = EquityCounts(len(pocket_ids))
+    if len(board_ids) == 5:
+        # Complete board: hold back the river so it can be ranked with rank_with
+        board_ids, runouts, weights = board_ids[:4], [board_ids[4:]], None
+    states = _begin_states(pocket_ids, board_ids)
+    showdown = _showdown_counter(states, counts)
+    held = range(4 - len(board_ids))
+
+    for runout, weight in zip(runouts, weights or itertools.repeat(1)):
+        for k in held:
+            for state in states:
+                state.add(runout[k])
+        showdown(runout[-1], weight)
+        for k in held:
+            for state in states:
+                state.remove(runout[k])
+    return counts
+
+def count_exhaustive(pocket_ids, board_ids, deck, counts=None):
+    """
+    Showdown every player on every runout from deck, returns EquityCounts
+
+    Runouts are dealt in itertools.combinations order. Each earlier card is
+    added to the players' states once and shared by every runout that
+    follows it (on the flop, a turn card is folded in once for all its
+    rivers), so a board costs one rank_with per player.
+    """
+    if counts is None:
+        counts = EquityCounts(len(pocket_ids))
+    if len(board_ids) == 5:
+        return count_runouts(pocket_ids, board_ids, (), counts)
+    states = _begin_states(pocket_ids, board_ids)
+    _deal(states, deck, 0, 5 - len(board_ids), _showdown_counter(states, counts))
+    return counts
+
+def _deal(states, deck, start, cards_needed, showdown):
+    if cards_needed == 1:
+        for j in range(start, len(deck)):
+            showdown(deck[j])
+        return
+    for j in range(start, len(deck) - cards_needed + 1):
+        card = deck[j]
+        for state in states:
+            state.add(card)
+        _deal(states, deck, j + 1, cards_needed - 1, showdown)
+        for state in states:
+            state.remove(card)
+
+def hidden_deals(deck, num_hidden, cards_needed):
+    """
+    Yield every deal of num_hidden pockets and cards_needed board cards from deck
+
+    A deal is a tuple: two ids per hidden seat in seat order, then the board
+    cards in combinations order (see count_deals).
+    """
+    if not num_hidden:
+        yield from itertools.combinations(deck, cards_needed)
+        return
+    for pocket in itertools.combinations(deck, 2):
+        rest = [c for c in deck if c not in pocket]
+        for deal in hidden_deals(rest, num_hidden - 1, cards_needed):
+            yield pocket + deal
+
+def num_hidden_deals(deck_size, num_hidden, cards_needed):
+    """Number of deals hidden_deals yields"""
+    total = math.comb(deck_size - 2 * num_hidden, cards_needed)
+    for k in range(num_hidden):
+        total *= math.comb(deck_size - 2 * k, 2)
+    return total
+
+def count_deals(pocket_ids, board_ids, deals, counts=None):
+    """
+    Showdown on deals that also fill hidden seats, returns EquityCounts
+
+    pocket_ids has None for every hidden seat. Each deal holds two ids per
+    hidden seat followed by the cards completing the board - from
+    hidden_deals, or random_runouts(deck, 2 * hidden + cards_needed, n) to
+    sample hole cards and board together.
+    """
+    if counts is None:
+        counts = EquityCounts(len(pocket_ids))
+    board_ids = list(board_ids)
+    # Complete board: hold back the river so it can be ranked with rank_with
+    river = board_ids[4:]
+    states = [begin(list(pocket or ()) + board_ids[:4]) for pocket in pocket_ids]
+    hidden = [state for state, pocket in zip(states, pocket_ids) if pocket is None]
+    showdown = _showdown_counter(states, counts)
+    first = 2 * len(hidden)
+    held = range(first, first + 4 - min(len(board_ids), 4))
+
+    for deal in deals:
+        for k, state in enumerate(hidden):
+            state.add(deal[2 * k])
+            state.add(deal[2 * k + 1])
+        for k in held:
+            for state in states:
+                state.add(deal[k])
+        showdown(river[0] if river else deal[-1])
+        for k in held:
+            for state in states:
+                state.remove(deal[k])
+        for k, state in enumerate(hidden):
+            state.remove(deal[2 * k])
+            state.remove(deal[2 * k + 1])
+    return counts
+
+class RunoutRanks:
+    """
+    Ranks of any pocket on every runout of one board, shared between tables
+
+        runouts = RunoutRanks(board_ids, deck)
+        ranks = runouts.ranks(pocket)    # per runout, -1 where it deals a pocket card
+
+    Runouts are the itertools.combinations of deck, so the ranks of
+    different pockets line up runout by runout (count_ranked). A 7-card rank
+    only depends on the cards' values and, for suits that can still make a
+    flush, their suits - the multiset of (value, suit or "dead") codes, as
+    in runout_classes. Each distinct multiset is ranked once and the rank
+    reused for every pocket and runout with it; pass one `known` dict to
+    several boards to share it between them too.
+    """
+
+    def __init__(self, board_ids, deck, known=None):
+        self.board_ids = list(board_ids)
+        self.cards_needed = 5 - len(self.board_ids)
+        self.runouts = list(itertools.combinations(deck, self.cards_needed))
+        self.known = {} if known is None else known
+        self._keys = {}      # live suits -> (code bits per card, board + runout key per runout)
+        self._holding = {}   # card -> indices of the runouts dealing it
+
+    def ranks(self, pocket):
+        held = list(pocket) + self.board_ids
+        live = tuple(sum(1 for c in held if c & 3 == suit) + self.cards_needed >= 5 for suit in range(4))
+        code_bits, runout_keys = self._runout_keys(live)
+        pocket_key = sum(code_bits[c] for c in pocket)
+        keys = [pocket_key + key for key in runout_keys]
+        ranks = list(map(self.known.get, keys))
+        for card in pocket:
+            for n in self._runouts_holding(card):
+                ranks[n] = -1
+        for n, rank in enumerate(ranks):
+            if rank is None:
+                rank = self.known.get(keys[n])
+                if rank is None:
+                    cards = held + list(self.runouts[n])
+                    rank = self.known[keys[n]] = begin(cards[:-1]).rank_with(cards[-1])
+                ranks[n] = rank
+        return ranks
+
+    def _runout_keys(self, live):
+        if live not in self._keys:
+            dead = 4
+            code_bits = [1 << 3 * ((c >> 2) * 5 + ((c & 3) if live[c & 3] else dead)) for c in range(52)]
+            board_key = sum(code_bits[c] for c in self.board_ids)
+            self._keys[live] = (code_bits, [board_key + sum(code_bits[c] for c in runout)
+                                            for runout in self.runouts])
+        return self._keys[live]
+
+    def _runouts_holding(self, card):
+        if card not in self._holding:
+            self._holding[card] = [n for n, runout in enumerate(self.runouts) if card in runout]
+        return self._holding[card]
+
+def count_ranked(ranked, counts=None):
+    """
+    Showdown tallies from precomputed ranks, returns EquityCounts
+
+    ranked holds each player's RunoutRanks.ranks on one board. Runouts
+    where any player ranks -1 deal a card that player holds and are
+    skipped, so the tallies equal count_exhaustive over the deck without
+    every player's cards. Runouts giving every player the same rank end the
+    same way, so the rank vectors are grouped in one pass (Counter over the
+    zipped columns) and each distinct one is decided once, weighted by how
+    many runouts share it.
+    """
+    if counts is None:
+        counts = EquityCounts(len(ranked))
+    shares, wins, ties = counts.shares, counts.wins, counts.ties
+    categories, category_order = counts.categories, counts.category_order
+    players = range(len(ranked))
+
+    for ranks, weight in Counter(zip(*ranked)).items():
+        if -1 in ranks:
+            continue
+        best = max(ranks)
+        winners = ranks.count(best)
+        share = SPLIT_SHARES[winners] * weight
+        for i in players:
+            rank = ranks[i]
+            if rank == best:
+                if winners == 1:
+                    wins[i] += weight
+                else:
+                    ties[i] += weight
+                shares[i] += share
+            player_categories = categories[i]
+            category = rank >> 20
+            if not player_categories[category]:
+                category_order[i].append(category)
+            player_categories[category] += weight
+        counts.boards += weight
+    return counts
+
+def runout_classes(pocket_ids, board_ids, deck):
+    """
+    Group every runout from deck into classes with the same showdown, returns
+    (representatives, weights) in order of each class's first runout
+
+    Two reductions, both exact:
+      - a suit is live only if some player could still complete a flush in
+        it; cards of other suits are told apart by rank alone
+      - live suits holding exactly the same known cards (same ranks, same
+        owners - usually suits nobody holds) are interchangeable, so runouts
+        that differ by swapping them fall into one class
+    """
+    cards_needed = 5 - len(board_ids)
+    known = [list(board_ids)] + [list(pocket) for pocket in pocket_ids]
+    live = [any(sum(1 for c in pocket + list(board_ids) if c & 3 == suit) + cards_needed >= 5
+                for pocket in known[1:])
+            for suit in range(4)]
+    signatures = [tuple(sorted((c >> 2, owner) for owner, cards in enumerate(known) for c in cards if c & 3 == suit))
+                  for suit in range(4)]
+    suit_maps = _interchangeable_suit_maps([s for s in range(4) if live[s]], signatures)
+
+    # A runout's key is the multiset of its cards' (rank, suit or "dead") codes,
+    # one 3-bit counter per code, minimised over the interchangeable suit maps
+    dead = 4
+    code_bits = [[1 << 3 * ((c >> 2) * 5 + (suit_map[c & 3] if live[c & 3] else dead)) for c in range(52)]
+                 for suit_map in suit_maps]
+
+    sums = [map(sum, itertools.combinations([bits[c] for c in deck], cards_needed)) for bits in code_bits]
+    keys = sums[0] if len(sums) == 1 else map(min, *sums)
+
+    classes = {}
+    for runout, key in zip(itertools.combinations(deck, cards_needed), keys):
+        entry = classes.get(key)
+        if entry is None:
+            classes[key] = [runout, 1]
+        else:
+            entry[1] += 1
+    return [runout for runout, _ in classes.values()], [weight for _, weight in classes.values()]
+
+def _interchangeable_suit_maps(live_suits, signatures):
+    """Every suit permutation (as a 4-tuple) that only swaps live suits with equal signatures"""
+    groups = {}
+    for suit in live_suits:
+        groups.setdefault(signatures[suit], []).append(suit)
+    suit_maps = [tuple(range(4))]
+    for group in groups.values():
+        extended = []
+        for suit_map in suit_maps:
+            for order in itertools.permutations(group):
+                permuted = list(suit_map)
+                for source, target in zip(group, order):
+                    permuted[source] = target
+                extended.append(tuple(permuted))
+        suit_maps = extended
+    return suit_maps
+
+def count_exhaustive_compressed(pocket_ids, board_ids, deck, counts=None):
+    """
+    Same EquityCounts as count_exhaustive, evaluating one runout per runout_classes class
+
+    Only the flop and turn are compressed: on the river there is one board,
+    and before the flop grouping 1.7M runouts costs more than it saves.
+    """
+    if not 3 <= len(board_ids) <= 4:
+        return count_exhaustive(pocket_ids, board_ids, deck, counts)
+    runouts, weights = runout_classes(pocket_ids, board_ids, deck)
+    return count_runouts(pocket_ids, board_ids, runouts, counts, weights)
+
+def count_exhaustive_pruned(pocket_ids, board_ids, deck, counts=None, count=count_exhaustive_compressed,
+                            hand_types=True):
+    """
+    Same EquityCounts as count_exhaustive, skipping players who cannot win
+
+    Pre-pass on the flop and turn: every player's current hand is a floor on
+    what they will hold at showdown (cards are only added). A player whose
+    best reachable hand stays below the best floor among the others is
+    drawing dead - they never win or tie, so the showdown loop (count, e.g.
+    count_exhaustive_compressed) runs over the live players only. When a
+    single contender is left no showdown is needed at all: they win every
+    board. Hand-type counts of players left out of the showdown loop are
+    tallied on their own, or skipped with hand_types=False.
+    """
+    if not 3 <= len(board_ids) <= 4:
+        return count(pocket_ids, board_ids, deck, counts)
+    num_players = len(pocket_ids)
+    floors = [begin(list(pocket) + list(board_ids)).rank() for pocket in pocket_ids]
+    live = [i for i in range(num_players)
+            if _can_reach(list(pocket_ids[i]) + list(board_ids), deck,
+                          max(floors[k] for k in range(num_players) if k != i))]
+    if len(live) == num_players:
+        return count(pocket_ids, board_ids, deck, counts)
+
+    result = EquityCounts(num_players)
+    if len(live) > 1:
+        showdown = count([pocket_ids[i] for i in live], board_ids, deck)
+        for j, i in enumerate(live):
+            _copy_player(result, i, showdown, j)
+        result.boards = showdown.boards
+    else:
+        result.boards = math.comb(len(deck), 5 - len(board_ids))
+        result.wins[live[0]] = result.boards
+        result.shares[live[0]] = result.boards * SHARE_UNIT
+    if hand_types:
+        for i in range(num_players):
+            if i not in live or len(live) == 1:
+                _count_hand_types(list(pocket_ids[i]) + list(board_ids), deck, result, i)
+
+    if counts is None:
+        return result
+    counts.add(result)
+    return counts
+
+def _count_hand_types(held, deck, counts, player):
+    """Tally one player's hand categories over every runout, in combinations order"""
+    state = begin(held)
+    categories, order = counts.categories[player], counts.category_order[player]
+
+    def tally(rivers):
+        for river in rivers:
+            category = state.rank_with(river) >> 20
+            if not categories[category]:
+                order.append(category)
+            categories[category] += 1
+
+    if len(held) == 6:
+        tally(deck)
+        return
+    for j, turn in enumerate(deck):
+        state.add(turn)
+        tally(deck[j + 1:])
+        state.remove(turn)
+
+def _can_reach(held, deck, target):
+    """
+    Whether some runout from deck gives the held cards a rank of at least target
+
+    Decided by hand category where possible (see _reaches_category); only
+    when the best reachable category is the target's own are runouts ranked.
+    """
+    cards_needed = 7 - len(held)
+    category = target >> 20
+    held_stats, deck_stats = _card_stats(held), _card_stats(deck)
+    if category < 9 and _reaches_category(held_stats, deck_stats, cards_needed, category + 1):
+        return True
+    if not _reaches_category(held_stats, deck_stats, cards_needed, category):
+        return False
+    state = begin(held)
+    if cards_needed == 1:
+        return any(state.rank_with(c) >= target for c in deck)
+    for j, turn in enumerate(deck):
+        state.add(turn)
+        reached = any(state.rank_with(c) >= target for c in deck[j + 1:])
+        state.remove(turn)
+        if reached:
+            return True
+    return False
+
+# 13-bit rank masks (bit r = value r + 2) of every straight, ace-high first, the wheel last
+STRAIGHT_MASKS = tuple(0b11111 << (high - 4) for high in range(12, 3, -1)) + (0b1000000001111,)
+UNREACHABLE = 99
+
+def _card_stats(card_ids):
+    """(cards per rank, rank mask per suit) of some card ids"""
+    rank_counts = [0] * 13
+    suit_masks = [0] * 4
+    for c in card_ids:
+        rank_counts[c >> 2] += 1
+        suit_masks[c & 3] |= 1 << (c >> 2)
+    return rank_counts, suit_masks
+
+def _reaches_category(held_stats, deck_stats, cards_needed, category):
+    """Whether the held cards plus cards_needed cards from the deck can make category or better"""
+    held_ranks, held_suits = held_stats
+    deck_ranks, deck_suits = deck_stats
+
+    def need(rank, copies):
+        """Cards to draw for copies of rank, UNREACHABLE if the deck lacks them"""
+        missing = max(copies - held_ranks[rank], 0)
+        return missing if deck_ranks[rank] >= missing else UNREACHABLE
+
+    def completes(window, held_mask, deck_mask):
+        missing = window & ~held_mask
+        return not missing & ~deck_mask and bin(missing).count("1") <= cards_needed
+
+    held_any = held_suits[0] | held_suits[1] | held_suits[2] | held_suits[3]
+    deck_any = deck_suits[0] | deck_suits[1] | deck_suits[2] | deck_suits[3]
+    checks = (
+        lambda: True,                                                                    # High Card
+        lambda: any(need(r, 2) <= cards_needed for r in range(13)),                      # Pair
+        lambda: any(need(a, 2) + need(b, 2) <= cards_needed
+                    for a in range(13) for b in range(a)),                               # Two Pair
+        lambda: any(need(r, 3) <= cards_needed for r in range(13)),                      # Three of a Kind
+        lambda: any(completes(w, held_any, deck_any) for w in STRAIGHT_MASKS),           # Straight
+        lambda: any(bin(held_suits[s]).count("1") + min(bin(deck_suits[s]).count("1"), cards_needed) >= 5
+                    for s in range(4)),                                                  # Flush
+        lambda: any(need(a, 3) + need(b, 2) <= cards_needed
+                    for a in range(13) for b in range(13) if a != b),                    # Full House
+        lambda: any(need(r, 4) <= cards_needed for r in range(13)),                      # Four of a Kind
+        lambda: any(completes(w, held_suits[s], deck_suits[s])
+                    for s in range(4) for w in STRAIGHT_MASKS[1:]),                      # Straight Flush
+        lambda: any(completes(STRAIGHT_MASKS[0], held_suits[s], deck_suits[s]) for s in range(4)),  # Royal
+    )
+    return any(check() for check in checks[category:])
+
+def _copy_player(counts, i, other, j):
+    """Player j's tallies in other become player i's in counts"""
+    counts.shares[i] = other.shares[j]
+    counts.wins[i] = other.wins[j]
+    counts.ties[i] = other.ties[j]
+    counts.categories[i] = list(other.categories[j])
+    counts.category_order[i] = list(other.category_order[j])
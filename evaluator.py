@@ -46,7 +46,7 @@ def rank_hand(five_cards):
         count_groups[count].sort(reverse=True)
     
     # Royal Flush: A-high straight flush
-    if is_flush and is_straight and values[0] == [14, 13, 12, 11, 10]:
+    if is_flush and is_straight and values == [14, 13, 12, 11, 10]:
         return (9, [14], [])
     
     # Straight Flush: any straight + flush
@@ -109,19 +109,195 @@ def check_straight(values):
         return True
     return False
 
+HAND_NAMES = ("High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+              "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush")
+
 def get_hand_name(rank_tuple):
     """Convert rank number to readable hand name"""
-    rank = rank_tuple[0]
-    hand_names = {
-        9: "Royal Flush",
-        8: "Straight Flush",
-        7: "Four of a Kind",
-        6: "Full House",
-        5: "Flush",
-        4: "Straight",
-        3: "Three of a Kind",
-        2: "Two Pair",
-        1: "Pair",
-        0: "High Card"
-    }
-    return hand_names[rank]
+    return HAND_NAMES[rank_tuple[0]]
+
+# Packed ranks: one int per hand, category << 20 followed by the primary values
+# and kickers as 4-bit nibbles (most significant first, zero padded). Comparing
+# packed ints orders hands exactly like comparing the rank tuples above.
+# RANK_LAYOUT[category] = (number of primary values, number of kickers)
+RANK_LAYOUT = ((0, 5), (1, 3), (2, 1), (1, 2), (1, 0), (0, 5), (2, 0), (1, 1), (1, 0), (1, 0))
+
+def pack_rank(rank_tuple):
+    """Packed int for a (rank, primary_values, kickers) tuple"""
+    category, primary, kickers = rank_tuple
+    values = list(primary) + list(kickers)
+    packed = category
+    for value in values:
+        packed = (packed << 4) | value
+    return packed << 4 * (5 - len(values))
+
+def unpack_rank(packed):
+    """Rank tuple for a packed rank - the inverse of pack_rank"""
+    category = packed >> 20
+    num_primary, num_kickers = RANK_LAYOUT[category]
+    values = [(packed >> (16 - 4 * i)) & 15 for i in range(num_primary + num_kickers)]
+    return (category, values[:num_primary], values[num_primary:])
+
+def _build_rank_tables():
+    """Lookup tables over 13-bit rank masks (bit r = card value r + 2 present)"""
+    wheel = (1 << 12) | 0b1111
+    top5 = [0] * 8192
+    straight_high = [0] * 8192
+    for mask in range(8192):
+        values = [r + 2 for r in range(12, -1, -1) if mask >> r & 1][:5]
+        packed = 0
+        for value in values:
+            packed = (packed << 4) | value
+        top5[mask] = packed << 4 * (5 - len(values))
+
+        for high in range(12, 3, -1):
+            window = 0b11111 << (high - 4)
+            if mask & window == window:
+                straight_high[mask] = high + 2
+                break
+        else:
+            if mask & wheel == wheel:
+                straight_high[mask] = 5
+    return top5, straight_high
+
+_rank_tables = None
+
+def rank_tables():
+    """
+    (TOP5, STRAIGHT_HIGH), built on first use
+
+    TOP5[mask]: the (up to) five highest values in mask as nibbles, highest first
+    STRAIGHT_HIGH[mask]: high card of the best straight in mask, 0 if none
+    """
+    global _rank_tables
+    if _rank_tables is None:
+        _rank_tables = _build_rank_tables()
+    return _rank_tables
+
+def __getattr__(name):
+    # `from evaluator import TOP5` builds the tables then, not when evaluator is imported
+    if name in ("TOP5", "STRAIGHT_HIGH"):
+        return rank_tables()[name == "STRAIGHT_HIGH"]
+    raise AttributeError(f"module 'evaluator' has no attribute '{name}'")
+
+def rank_ids(card_ids):
+    """
+    Packed rank of the best hand in 5-7 card ids (card.card_id)
+
+    Same result as pack_rank(evaluate_hand(cards)), computed with bit masks
+    instead of trying every 5-card combination.
+    """
+    return begin(card_ids).rank()
+
+def begin(card_ids):
+    """HandState holding card_ids (e.g. a pocket plus the known board)"""
+    state = HandState()
+    for c in card_ids:
+        state.add(c)
+    return state
+
+class HandState:
+    """
+    Cards folded into rank and suit bit masks, ranked without re-reading them
+
+        state = begin(pocket + board)
+        state.add(turn)                # O(1)
+        state.rank_with(river)         # packed rank of the 7 cards, state unchanged
+        state.remove(turn)             # back to the flop, ready for the next turn card
+
+    Masks: rank bits (bit r = value r + 2) for values held at least once,
+    twice, three and four times; per-suit rank masks in 16-bit lanes of
+    `suited`; suit counts in 4-bit lanes of `suit_counts`.
+    """
+
+    __slots__ = ('seen', 'pairs', 'trips', 'quads', 'suited', 'suit_counts')
+
+    def __init__(self):
+        self.seen = self.pairs = self.trips = self.quads = self.suited = self.suit_counts = 0
+
+    def add(self, c):
+        bit = 1 << (c >> 2)
+        self.suited |= bit << ((c & 3) << 4)
+        self.suit_counts += 1 << ((c & 3) << 2)
+        if self.seen & bit:
+            if self.pairs & bit:
+                if self.trips & bit:
+                    self.quads |= bit
+                else:
+                    self.trips |= bit
+            else:
+                self.pairs |= bit
+        else:
+            self.seen |= bit
+
+    def remove(self, c):
+        """Undo add(c)"""
+        bit = 1 << (c >> 2)
+        self.suited &= ~(bit << ((c & 3) << 4))
+        self.suit_counts -= 1 << ((c & 3) << 2)
+        if self.quads & bit:
+            self.quads ^= bit
+        elif self.trips & bit:
+            self.trips ^= bit
+        elif self.pairs & bit:
+            self.pairs ^= bit
+        else:
+            self.seen ^= bit
+
+    def rank(self):
+        """Packed rank (see pack_rank) of the best hand in the 5-7 cards held"""
+        return _packed_rank(self.seen, self.pairs, self.trips, self.quads, self.suited, self.suit_counts)
+
+    def rank_with(self, c):
+        """Packed rank with one more card, leaving the state unchanged"""
+        seen, pairs, trips, quads = self.seen, self.pairs, self.trips, self.quads
+        bit = 1 << (c >> 2)
+        if seen & bit:
+            if pairs & bit:
+                if trips & bit:
+                    quads |= bit
+                else:
+                    trips |= bit
+            else:
+                pairs |= bit
+        else:
+            seen |= bit
+        return _packed_rank(seen, pairs, trips, quads,
+                            self.suited | (bit << ((c & 3) << 4)),
+                            self.suit_counts + (1 << ((c & 3) << 2)))
+
+def _packed_rank(seen, pairs, trips, quads, suited, suit_counts):
+    top5, straight_high = _rank_tables or rank_tables()
+
+    # A suit lane holding 5+ cards: with 7 cards a flush rules out quads and full houses
+    flush = (suit_counts + 0x3333) & 0x8888
+    if flush:
+        flush_mask = (suited >> ((flush.bit_length() - 4) << 2)) & 0x1FFF
+        high = straight_high[flush_mask]
+        if high == 14:
+            return (9 << 20) | (14 << 16)
+        if high:
+            return (8 << 20) | (high << 16)
+        return (5 << 20) | top5[flush_mask]
+    if quads:
+        quad = quads.bit_length() - 1
+        return (7 << 20) | ((quad + 2) << 16) | ((top5[seen & ~(1 << quad)] >> 16) << 12)
+    if trips:
+        trip = trips.bit_length() - 1
+        rest = pairs & ~(1 << trip)
+        if rest:
+            return (6 << 20) | ((trip + 2) << 16) | ((rest.bit_length() + 1) << 12)
+    high = straight_high[seen]
+    if high:
+        return (4 << 20) | (high << 16)
+    if trips:
+        return (3 << 20) | ((trip + 2) << 16) | ((top5[seen & ~(1 << trip)] >> 12) << 8)
+    if pairs:
+        pair = pairs.bit_length() - 1
+        rest = pairs & ~(1 << pair)
+        if rest:
+            second = rest.bit_length() - 1
+            kicker = top5[seen & ~(1 << pair) & ~(1 << second)] >> 16
+            return (2 << 20) | ((pair + 2) << 16) | ((second + 2) << 12) | (kicker << 8)
+        return (1 << 20) | ((pair + 2) << 16) | ((top5[seen & ~(1 << pair)] >> 8) << 4)
+    return top5[seen]
@@ -0,0 +1,237 @@
+# fuzz_evaluator.py - Differential fuzz harness for the hand evaluator backends
+#
+# Every evaluator backend must agree exactly with evaluator.evaluate_hand:
+# same hand category for every hand, and the same ordering between hands.
+#
+#   python fuzz_evaluator.py --exhaustive          # all 2,598,960 five-card hands
+#   python fuzz_evaluator.py --hands 2000000       # random 5-, 6- and 7-card hands
+#   python fuzz_evaluator.py --sizes 7 --workers 8 --hands 5000000
+#
+# Work is split into chunks that run in parallel across all cores. The
+# exhaustive sweep also checks the known five-card category frequencies.
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from card import card_id, create_deck
+from evaluator import evaluate_hand, get_hand_name, rank_ids
+from predictor import evaluate_best_partial_hand
+
+# The reference every backend is compared against: cards -> rank tuple
+def reference_rank(cards):
+    return evaluate_hand(tuple(cards))
+
+# Backend name -> function(cards) returning (category, sort key).
+# Sort keys only need to order hands the same way the reference does.
+BACKENDS = {
+    "evaluate_best_partial_hand": lambda cards: _legacy_key(evaluate_best_partial_hand(cards)),
+    "rank_ids": lambda cards: _packed_key(rank_ids([card_id(c) for c in cards])),
+}
+
+try:
+    from vector_evaluator import evaluate_ids
+except ImportError:
+    pass  # numpy not installed
+else:
+    def _vector_key(cards):
+        return _packed_key(int(evaluate_ids([card_id(c) for c in cards])))
+    BACKENDS["vector_evaluator"] = _vector_key
+
+# Known category frequencies over all 2,598,960 five-card hands
+FIVE_CARD_CATEGORY_COUNTS = {
+    9: 4,         # Royal Flush
+    8: 36,        # Straight Flush
+    7: 624,       # Four of a Kind
+    6: 3744,      # Full House
+    5: 5108,      # Flush
+    4: 10200,     # Straight
+    3: 54912,     # Three of a Kind
+    2: 123552,    # Two Pair
+    1: 1098240,   # Pair
+    0: 1302540,   # High Card
+}
+FIVE_CARD_DISTINCT_RANKS = 7462
+
+MAX_REPORTED_MISMATCHES = 20
+RANDOM_CHUNK_SIZE = 20000
+
+def _legacy_key(rank_tuple):
+    return rank_tuple[0], rank_tuple
+
+def _packed_key(packed):
+    return packed >> 20, packed
+
+def check_hands(hands, backend_names):
+    """
+    Compare every backend against the reference on one chunk of hands
+
+    Returns a dict with hand count, category counts, up to MAX_REPORTED_MISMATCHES
+    mismatch descriptions, and for each backend a map reference rank -> backend key
+    (one per distinct rank) so orderings can be checked across chunks.
+    """
+    backends = [(name, BACKENDS[name]) for name in backend_names]
+    category_counts = Counter()
+    mismatches = []
+    rank_keys = {name: {} for name in backend_names}
+    hand_count = 0
+
+    for cards in hands:
+        hand_count += 1
+        reference = reference_rank(cards)
+        category_counts[reference[0]] += 1
+
+        for name, backend in backends:
+            category, key = backend(cards)
+            seen_keys = rank_keys[name]
+            previous = seen_keys.setdefault(_freeze(reference), key)
+
+            if category != reference[0] or previous != key:
+                if len(mismatches) < MAX_REPORTED_MISMATCHES:
+                    mismatches.append(
+                        f"{name}: {' '.join(str(c) for c in cards)} -> category {category} key {key!r}, "
+                        f"reference {get_hand_name(reference)} {reference}")
+
+    return {
+        'hands': hand_count,
+        'category_counts': dict(category_counts),
+        'mismatches': mismatches,
+        'rank_keys': rank_keys,
+    }
+
+def _freeze(rank_tuple):
+    """Legacy rank tuples hold lists - make them hashable"""
+    return (rank_tuple[0], tuple(rank_tuple[1]), tuple(rank_tuple[2]))
+
+def _exhaustive_chunk(args):
+    """All five-card hands whose lowest deck index is first_index"""
+    first_index, backend_names = args
+    deck = create_deck()
+    first_card = deck[first_index]
+    hands = ([first_card] + list(rest) for rest in itertools.combinations(deck[first_index + 1:], 4))
+    return check_hands(hands, backend_names)
+
+def _random_chunk(args):
+    """count random hands of hand_size cards from a seeded generator"""
+    seed, count, hand_size, backend_names = args
+    rng = random.Random(seed)
+    deck = create_deck()
+    hands = (rng.sample(deck, hand_size) for _ in range(count))
+    return check_hands(hands, backend_names)
+
+def check_orderings(merged_rank_keys):
+    """Backend keys must sort distinct reference ranks in exactly the same order"""
+    problems = []
+    for name, rank_keys in merged_rank_keys.items():
+        ordered = sorted(rank_keys.items())  # by reference rank
+        for (ref_low, key_low), (ref_high, key_high) in zip(ordered, ordered[1:]):
+            if not key_low < key_high:
+                problems.append(f"{name}: reference {ref_low} < {ref_high} "
+                                f"but backend keys {key_low!r} vs {key_high!r}")
+                if len(problems) >= MAX_REPORTED_MISMATCHES:
+                    return problems
+    return problems
+
+def run_fuzz(tasks, worker, backend_names, workers):
+    """Run chunks in parallel and merge their reports"""
+    total_hands = 0
+    category_counts = Counter()
+    mismatches = []
+    merged_rank_keys = {name: {} for name in backend_names}
+
+    with Pool(processes=workers) as pool:
+        for report in pool.imap_unordered(worker, tasks):
+            total_hands += report['hands']
+            category_counts.update(report['category_counts'])
+            mismatches.extend(report['mismatches'][:MAX_REPORTED_MISMATCHES - len(mismatches)])
+
+            for name, rank_keys in report['rank_keys'].items():
+                merged = merged_rank_keys[name]
+                for reference, key in rank_keys.items():
+                    previous = merged.setdefault(reference, key)
+                    if previous != key and len(mismatches) < MAX_REPORTED_MISMATCHES:
+                        mismatches.append(f"{name}: reference rank {reference} maps to both "
+                                          f"{previous!r} and {key!r}")
+
+    return total_hands, category_counts, mismatches, merged_rank_keys
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differential fuzzing of hand evaluator backends")
+    parser.add_argument("--exhaustive", action="store_true", help="sweep all 2,598,960 five-card hands")
+    parser.add_argument("--hands", type=int, default=1000000, help="random hands per hand size")
+    parser.add_argument("--sizes", default="5,6,7", help="comma separated random hand sizes")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma separated backend names")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for random hands")
+    args = parser.parse_args(argv)
+
+    backend_names = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = [b for b in backend_names if b not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(unknown)} (choose from {', '.join(BACKENDS)})")
+
+    print("=" * 80)
+    print("EVALUATOR DIFFERENTIAL FUZZ HARNESS")
+    print(f"Backends: {', '.join(backend_names)} (reference: evaluate_hand) | Workers: {args.workers}")
+    print("=" * 80)
+
+    failed = False
+    start = time.perf_counter()
+
+    if args.exhaustive:
+        print("\nSweeping all five-card hands...")
+        tasks = [(i, backend_names) for i in range(48)]
+        runs = [("5-card exhaustive", tasks, _exhaustive_chunk)]
+    else:
+        runs = []
+        for size in (int(s) for s in args.sizes.split(",")):
+            tasks = []
+            remaining = args.hands
+            chunk_number = 0
+            while remaining > 0:
+                count = min(RANDOM_CHUNK_SIZE, remaining)
+                seed = (args.seed * 1000003 + size) * 1000003 + chunk_number
+                tasks.append((seed, count, size, backend_names))
+                remaining -= count
+                chunk_number += 1
+            runs.append((f"{size}-card random", tasks, _random_chunk))
+
+    for label, tasks, worker in runs:
+        run_start = time.perf_counter()
+        total_hands, category_counts, mismatches, rank_keys = run_fuzz(tasks, worker, backend_names, args.workers)
+        elapsed = time.perf_counter() - run_start
+        mismatches.extend(check_orderings(rank_keys))
+
+        print(f"\n--- {label}: {total_hands:,} hands in {elapsed:.1f}s "
+              f"({total_hands / elapsed:,.0f} hands/s) ---")
+        for category in sorted(category_counts, reverse=True):
+            print(f"  {get_hand_name((category,)):<16} {category_counts[category]:>10,}")
+
+        if args.exhaustive:
+            if dict(category_counts) != FIVE_CARD_CATEGORY_COUNTS:
+                mismatches.append(f"reference category counts {dict(category_counts)} "
+                                  f"differ from the known {FIVE_CARD_CATEGORY_COUNTS}")
+            for name, keys in rank_keys.items():
+                if len(keys) != FIVE_CARD_DISTINCT_RANKS:
+                    mismatches.append(f"{name}: {len(keys)} distinct ranks, expected {FIVE_CARD_DISTINCT_RANKS}")
+
+        if mismatches:
+            failed = True
+            print(f"  ✗ FAIL - first mismatches:")
+            for message in mismatches[:MAX_REPORTED_MISMATCHES]:
+                print(f"    {message}")
+        else:
+            print(f"  ✓ PASS - all backends agree on categories and orderings")
+
+    print("\n" + "=" * 80)
+    print(f"Total time: {time.perf_counter() - start:.1f}s - {'FAILED' if failed else 'ALL BACKENDS AGREE'}")
+    print("=" * 80)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
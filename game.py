@@ -1,6 +1,6 @@
 # game.py - Game flow and user interaction
 
-from card import parse_card
+from card import MAX_PLAYERS, parse_card
 from predictor import predict_hands, predict_hands_with_method
 from utils import display_results, display_results_with_current_hand, display_enhanced_results, print_header, print_section
 
@@ -22,6 +22,8 @@ def run_game():
     
     enhanced_display = display_choice == "2"
 
+    num_players = get_player_count()
+
     if method_choice == "1":
         method = "exhaustive"
     elif method_choice == "2":
@@ -33,9 +35,6 @@ def run_game():
 
     
     while True:
-        # Always 6 players
-        num_players = 6
-        
         # Step 1: Get all pocket cards (returns used_cards set)
         pocket_hands, used_cards = get_pocket_cards(num_players)
         
@@ -148,17 +147,35 @@ def run_game():
             print("\nGoodbye!")
             break
 
+def get_player_count(default=6):
+    """Ask how many players are at the table (2 to MAX_PLAYERS)"""
+    while True:
+        print(f"\nNumber of players (2-{MAX_PLAYERS}, Enter for {default}):")
+        answer = input("> ").strip()
+        if not answer:
+            return default
+        if answer.isdigit() and 2 <= int(answer) <= MAX_PLAYERS:
+            return int(answer)
+        print(f"Error: Please enter a number from 2 to {MAX_PLAYERS}.")
+
 def get_pocket_cards(num_players):
-    """Get pocket cards from all players with uniqueness check"""
+    """Get pocket cards from all players with uniqueness check ('?' = hidden seat, stored as None)"""
     pocket_hands = []
     used_cards = set()  # Track all cards already dealt
     
-    print(f"\nEnter pocket cards for {num_players} players:")
+    print(f"\nEnter pocket cards for {num_players} players (? if a player's cards are hidden):")
     
     for i in range(num_players):
         while True:
             print(f"Player {i+1} (e.g., AS KC):")
             pocket_input = input("> ").strip().split()
+
+            if pocket_input == ["?"]:
+                if i == num_players - 1 and pocket_hands.count(None) == i:
+                    print("Error: At least one player's cards must be known.")
+                    continue
+                pocket_hands.append(None)  # dealt at random by the engines
+                break
             
             # Validate input
             if len(pocket_input) != 2:
@@ -0,0 +1,207 @@
+# hand_history.py - Compact append-only binary hand-history log
+#
+# A file is a small header followed by fixed-size little-endian records, one
+# per hand (83 bytes). Cards are stored as card ids (see card.card_id), with
+# 255 for a card that was not seen:
+#
+#   timestamp      float64   when the hand started (unix seconds)
+#   num_players    uint8
+#   method         uint8     engine behind the logged predictions (METHOD_LABELS)
+#   pockets        20 x u8   two cards per seat, up to MAX_SEATS seats
+#   board          5 x u8
+#   flop_equity    10 x u16  logged win probability per seat in 1/100 % (65535 = none)
+#   turn_equity    10 x u16
+#   flop_at        float32   seconds after timestamp when the flop prediction was made
+#   turn_at        float32   same for the turn
+#
+# Records are only ever appended. A torn final record (e.g. after a crash) is
+# ignored when reading and cut off before the next append. Reading uses mmap,
+# so files with millions of hands can be streamed without loading them.
+
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+from card import card_id, parse_card
+
+MAGIC = b"PKHH"
+FORMAT_VERSION = 1
+MAX_SEATS = 10
+NO_CARD = 255
+NO_EQUITY = 0xFFFF
+METHOD_LABELS = ("", "Exhaustive", "Monte Carlo")
+
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct(f"<dBB{MAX_SEATS * 2}s5s{MAX_SEATS}H{MAX_SEATS}Hff")
+
+HandRecord = namedtuple("HandRecord", [
+    "timestamp", "pockets", "board", "method",
+    "flop_equities", "turn_equities", "flop_at", "turn_at",
+])
+HandRecord.__doc__ = """One logged hand: pockets is a tuple of (id, id) per seat, equities are in % or None"""
+
+def _card_ids(cards):
+    ids = []
+    for card in cards:
+        if card is None or (isinstance(card, str) and not card):
+            ids.append(NO_CARD)
+        elif isinstance(card, int):
+            ids.append(card)
+        else:
+            ids.append(card_id(parse_card(card) if isinstance(card, str) else card))
+    return ids
+
+def _pack_equities(equities, num_players):
+    if equities is None:
+        return [NO_EQUITY] * MAX_SEATS
+    values = [round(e * 100) for e in equities[:num_players]]
+    return values + [NO_EQUITY] * (MAX_SEATS - len(values))
+
+def _unpack_equities(values, num_players):
+    if values[0] == NO_EQUITY:
+        return None
+    return tuple(v / 100 for v in values[:num_players])
+
+def pack_record(pockets, board, timestamp=None, method="", flop_equities=None, turn_equities=None,
+                flop_at=0.0, turn_at=0.0):
+    """
+    Encode one hand as bytes
+
+    Args:
+        pockets: per seat two cards (Card objects, strings like "AS", card ids, or "" when hidden)
+        board: up to 5 community cards, in dealing order
+        method: label of the engine behind the equities ("Exhaustive" or "Monte Carlo")
+        flop_equities / turn_equities: win probabilities in % per seat, or None
+    """
+    num_players = len(pockets)
+    if not 2 <= num_players <= MAX_SEATS:
+        raise ValueError(f"Hand history supports 2-{MAX_SEATS} players, got {num_players}.")
+    if len(board) > 5:
+        raise ValueError("A board has at most 5 cards.")
+
+    pocket_ids = [i for pocket in pockets for i in _card_ids(pocket)]
+    pocket_ids += [NO_CARD] * (MAX_SEATS * 2 - len(pocket_ids))
+    board_ids = _card_ids(board) + [NO_CARD] * (5 - len(board))
+
+    return RECORD.pack(
+        time.time() if timestamp is None else timestamp,
+        num_players,
+        METHOD_LABELS.index(method or ""),
+        bytes(pocket_ids),
+        bytes(board_ids),
+        *_pack_equities(flop_equities, num_players),
+        *_pack_equities(turn_equities, num_players),
+        flop_at,
+        turn_at,
+    )
+
+def unpack_record(fields):
+    """HandRecord from one RECORD.unpack / iter_unpack tuple"""
+    timestamp, num_players, method, pockets, board = fields[:5]
+    flop = fields[5:5 + MAX_SEATS]
+    turn = fields[5 + MAX_SEATS:5 + 2 * MAX_SEATS]
+    flop_at, turn_at = fields[-2:]
+    return HandRecord(
+        timestamp,
+        tuple((pockets[2 * i], pockets[2 * i + 1]) for i in range(num_players)),
+        tuple(c for c in board if c != NO_CARD),
+        METHOD_LABELS[method],
+        _unpack_equities(flop, num_players),
+        _unpack_equities(turn, num_players),
+        flop_at,
+        turn_at,
+    )
+
+def _check_header(data, path):
+    magic, version, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a hand-history file.")
+    if version != FORMAT_VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} uses hand-history format {version} ({record_size}-byte records), "
+                         f"expected {FORMAT_VERSION} ({RECORD.size}-byte records).")
+
+class HandHistoryWriter:
+    """Appends hands to a hand-history file, creating it if needed"""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "r+b") as f:
+                _check_header(f.read(HEADER.size), path)
+                # Drop a torn record left by an interrupted write
+                complete = (os.path.getsize(path) - HEADER.size) // RECORD.size
+                f.truncate(HEADER.size + complete * RECORD.size)
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size))
+            self.file.flush()
+
+    def append(self, pockets, board, **fields):
+        """Append one hand (see pack_record for the arguments); written through immediately"""
+        self.file.write(pack_record(pockets, board, **fields))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class HandHistory:
+    """
+    Memory-mapped read access to a hand-history file
+
+        with HandHistory("hands.phh") as history:
+            for record in history:
+                ...
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f"{path} is not a hand-history file.")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self.map, path)
+        self.count = (size - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def records_buffer(self, start=0, stop=None):
+        """Raw bytes of records [start, stop) as a zero-copy memoryview"""
+        stop = self.count if stop is None else min(stop, self.count)
+        return memoryview(self.map)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+
+    def iter_fields(self, start=0, stop=None):
+        """Raw unpacked tuples, the fastest way to stream records"""
+        return RECORD.iter_unpack(self.records_buffer(start, stop))
+
+    def __iter__(self):
+        return (unpack_record(fields) for fields in self.iter_fields())
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("hand index out of range")
+        index %= self.count
+        return unpack_record(RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size))
+
+    def close(self):
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # A record iterator is still alive; the map closes once it is released
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,372 @@
+# hand_store.py - Columnar, indexed hand store for fast analytical queries (needs numpy)
+#
+#   python hand_store.py build hands.phh hands.store
+#   python hand_store.py query hands.store --texture flop:monotone --leader-lost flop
+#   python hand_store.py query hands.store --leader-equity turn:80:100 --winning Flush --show 5
+#
+# A store is a directory with one .npy file per column plus meta.json. Columns
+# are memory-mapped when the store is opened, so only the pages a query
+# touches are read. Building converts a hand-history log (hand_history.py)
+# in chunks and precomputes per-hand features with whole-array operations:
+#   - board texture flags for the flop, turn and river
+#   - the leader (highest logged equity) on the flop and turn, and that equity
+#   - every seat's final packed rank and hand category, the winning category
+#     and a bitmask of the seats that won
+# Secondary indexes are built over the features:
+#   - bitmap indexes (packed bits) for each texture flag and winning category
+#   - a sorted index over each leader equity column, used for range queries
+# Every query returns a boolean row mask, so filters combine with & | ~.
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from card import card_from_id
+from evaluator import get_hand_name
+from hand_history import HEADER, MAX_SEATS, NO_CARD, NO_EQUITY, RECORD, HandHistory
+from vector_evaluator import evaluate_ids
+
+STORE_FORMAT = 1
+BUILD_CHUNK = 200_000
+NO_SEAT = -1
+NO_CATEGORY = 255
+
+# Exactly one hand_history record
+RAW_DTYPE = np.dtype([
+    ('timestamp', '<f8'), ('num_players', 'u1'), ('method', 'u1'),
+    ('pockets', 'u1', (MAX_SEATS * 2,)), ('board', 'u1', (5,)),
+    ('flop_equity', '<u2', (MAX_SEATS,)), ('turn_equity', '<u2', (MAX_SEATS,)),
+    ('flop_at', '<f4'), ('turn_at', '<f4'),
+])
+assert RAW_DTYPE.itemsize == RECORD.size
+
+STAGE_CARDS = {'flop': 3, 'turn': 4, 'river': 5}
+EQUITY_STAGES = ('flop', 'turn')
+
+TEXTURE_FLAGS = {
+    'monotone': 1,            # every board card has the same suit
+    'two_tone': 2,            # exactly two suits on the board
+    'rainbow': 4,             # no two board cards share a suit
+    'paired': 8,              # at least two board cards share a rank
+    'trips': 16,              # three board cards share a rank
+    'flush_possible': 32,     # three or more board cards of one suit
+    'straight_possible': 64,  # three distinct ranks fit in one straight
+}
+
+HAND_CATEGORIES = {get_hand_name((category,)): category for category in range(10)}
+
+# Column name -> (dtype, per-row shape)
+COLUMNS = {
+    'timestamp': ('<f8', ()),
+    'num_players': ('u1', ()),
+    'pockets': ('u1', (MAX_SEATS * 2,)),
+    'board': ('u1', (5,)),
+    'flop_equity': ('<u2', (MAX_SEATS,)),
+    'turn_equity': ('<u2', (MAX_SEATS,)),
+    'complete': ('?', ()),
+    'flop_texture': ('u1', ()),
+    'turn_texture': ('u1', ()),
+    'river_texture': ('u1', ()),
+    'flop_leader': ('i1', ()),
+    'flop_leader_equity': ('<u2', ()),
+    'turn_leader': ('i1', ()),
+    'turn_leader_equity': ('<u2', ()),
+    'final_rank': ('<i4', (MAX_SEATS,)),
+    'final_category': ('u1', (MAX_SEATS,)),
+    'winning_category': ('u1', ()),
+    'winners': ('<u2', ()),
+}
+
+def _straight_possible_table():
+    windows = [(1 << 12) | 0b1111] + [0b11111 << low for low in range(9)]
+    return np.array([any(bin(mask & w).count("1") >= 3 for w in windows) for mask in range(8192)])
+
+STRAIGHT_POSSIBLE = _straight_possible_table()
+
+def board_texture(board):
+    """Texture flags for boards given as an (n, k) array of card ids"""
+    n, k = board.shape
+    ranks, suits = board >> 2, board & 3
+    rows = np.arange(n)[:, None]
+    suit_counts = np.bincount((rows * 4 + suits).ravel(), minlength=n * 4).reshape(n, 4)
+    rank_counts = np.bincount((rows * 13 + ranks).ravel(), minlength=n * 13).reshape(n, 13)
+    suits_used = (suit_counts > 0).sum(axis=1)
+    rank_mask = (rank_counts > 0) @ (1 << np.arange(13))
+
+    flags = np.zeros(n, dtype=np.uint8)
+    flags |= np.where(suits_used == 1, TEXTURE_FLAGS['monotone'], 0).astype(np.uint8)
+    flags |= np.where(suits_used == 2, TEXTURE_FLAGS['two_tone'], 0).astype(np.uint8)
+    flags |= np.where(suits_used == k, TEXTURE_FLAGS['rainbow'], 0).astype(np.uint8)
+    flags |= np.where(rank_counts.max(axis=1) >= 2, TEXTURE_FLAGS['paired'], 0).astype(np.uint8)
+    flags |= np.where(rank_counts.max(axis=1) >= 3, TEXTURE_FLAGS['trips'], 0).astype(np.uint8)
+    flags |= np.where(suit_counts.max(axis=1) >= 3, TEXTURE_FLAGS['flush_possible'], 0).astype(np.uint8)
+    flags |= np.where(STRAIGHT_POSSIBLE[rank_mask], TEXTURE_FLAGS['straight_possible'], 0).astype(np.uint8)
+    return flags
+
+def _leader(equity):
+    """(seat, equity) of the highest logged equity per row; NO_SEAT / NO_EQUITY when not logged"""
+    logged = equity[:, 0] != NO_EQUITY
+    masked = np.where(equity == NO_EQUITY, -1, equity.astype(np.int32))
+    seat = masked.argmax(axis=1)
+    best = masked[np.arange(len(equity)), seat]
+    return (np.where(logged, seat, NO_SEAT).astype(np.int8),
+            np.where(logged, best, NO_EQUITY).astype(np.uint16))
+
+def compute_features(raw):
+    """Feature columns for a chunk of raw records (structured RAW_DTYPE array)"""
+    n = len(raw)
+    board = raw['board'].astype(np.int64)
+    pockets = raw['pockets'].astype(np.int64).reshape(n, MAX_SEATS, 2)
+    seat_used = np.arange(MAX_SEATS)[None, :] < raw['num_players'][:, None]
+    seat_known = seat_used & (pockets != NO_CARD).all(axis=2)
+
+    features = {}
+    for stage, k in STAGE_CARDS.items():
+        dealt = (board[:, :k] != NO_CARD).all(axis=1)
+        texture = np.zeros(n, dtype=np.uint8)
+        if dealt.any():
+            texture[dealt] = board_texture(board[dealt, :k])
+        features[f'{stage}_texture'] = texture
+
+    for stage in EQUITY_STAGES:
+        features[f'{stage}_leader'], features[f'{stage}_leader_equity'] = _leader(raw[f'{stage}_equity'])
+
+    board_full = (board != NO_CARD).all(axis=1)
+    complete = board_full & (seat_known == seat_used).all(axis=1)
+    features['complete'] = complete
+
+    # Evaluate every known seat on a full board, all in one vectorised call.
+    # Winners are only meaningful when every seat is known.
+    evaluate = seat_known & board_full[:, None]
+    final_rank = np.zeros((n, MAX_SEATS), dtype=np.int32)
+    if evaluate.any():
+        hands = np.concatenate([pockets, np.broadcast_to(board[:, None, :], (n, MAX_SEATS, 5))], axis=2)
+        final_rank[evaluate] = evaluate_ids(hands[evaluate])
+    best = final_rank.max(axis=1)
+    winners_bits = ((final_rank == best[:, None]) & evaluate) * (1 << np.arange(MAX_SEATS))
+
+    features['final_rank'] = final_rank
+    features['final_category'] = np.where(evaluate, final_rank >> 20, NO_CATEGORY).astype(np.uint8)
+    features['winning_category'] = np.where(complete, best >> 20, NO_CATEGORY).astype(np.uint8)
+    features['winners'] = np.where(complete, winners_bits.sum(axis=1), 0).astype(np.uint16)
+    return features
+
+def _write_json(path, data):
+    temp = path + ".tmp"
+    with open(temp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp, path)
+
+def build_store(history_path, store_dir, chunk_size=BUILD_CHUNK):
+    """Convert a hand-history log into a columnar store, returns the number of hands"""
+    os.makedirs(os.path.join(store_dir, "index"), exist_ok=True)
+
+    with HandHistory(history_path) as history:
+        rows = len(history)
+        raw_all = np.frombuffer(history.records_buffer(), dtype=RAW_DTYPE)
+
+        columns = {}
+        for name, (dtype, shape) in COLUMNS.items():
+            columns[name] = np.lib.format.open_memmap(
+                os.path.join(store_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=(rows,) + shape)
+
+        for start in range(0, rows, chunk_size):
+            raw = raw_all[start:start + chunk_size]
+            stop = start + len(raw)
+            for name in ('timestamp', 'num_players', 'pockets', 'board', 'flop_equity', 'turn_equity'):
+                columns[name][start:stop] = raw[name]
+            for name, values in compute_features(raw).items():
+                columns[name][start:stop] = values
+            del raw
+        del raw_all
+
+    for column in columns.values():
+        column.flush()
+    build_indexes(store_dir, columns)
+    del columns
+
+    _write_json(os.path.join(store_dir, "meta.json"), {
+        'format': STORE_FORMAT,
+        'rows': rows,
+        'source': os.path.abspath(history_path),
+        'source_bytes': HEADER.size + rows * RECORD.size,
+        'columns': sorted(COLUMNS),
+    })
+    return rows
+
+def build_indexes(store_dir, columns):
+    """Bitmap indexes over texture flags and winning categories, sorted indexes over leader equity"""
+    index_dir = os.path.join(store_dir, "index")
+    for stage in STAGE_CARDS:
+        texture = columns[f'{stage}_texture']
+        for flag_name, bit in TEXTURE_FLAGS.items():
+            np.save(os.path.join(index_dir, f"{stage}_{flag_name}.npy"), np.packbits((texture & bit) != 0))
+    for category in range(10):
+        np.save(os.path.join(index_dir, f"winning_{category}.npy"),
+                np.packbits(columns['winning_category'] == category))
+    for stage in EQUITY_STAGES:
+        equity = columns[f'{stage}_leader_equity']
+        order = np.argsort(equity, kind="stable").astype(np.int64)
+        np.save(os.path.join(index_dir, f"{stage}_leader_equity_order.npy"), order)
+        np.save(os.path.join(index_dir, f"{stage}_leader_equity_sorted.npy"), equity[order])
+
+class HandStore:
+    """
+    Read-only, memory-mapped access to a built store
+
+        store = HandStore("hands.store")
+        mask = store.texture('flop', 'monotone') & store.leader_lost('flop')
+        print(mask.sum(), store.rows(mask)[:10])
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta['format'] != STORE_FORMAT:
+            raise ValueError(f"{store_dir} uses store format {self.meta['format']}, expected {STORE_FORMAT}.")
+        self.size = self.meta['rows']
+        self._columns = {}
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name):
+        """One column as a read-only memory-mapped array"""
+        if name not in self._columns:
+            if name not in COLUMNS:
+                raise KeyError(f"Unknown column '{name}'. Columns: {', '.join(sorted(COLUMNS))}")
+            self._columns[name] = self._load(f"{name}.npy")
+        return self._columns[name]
+
+    def _load(self, filename):
+        return np.load(os.path.join(self.store_dir, filename), mmap_mode="r")
+
+    def _bitmap(self, name):
+        return np.unpackbits(self._load(os.path.join("index", f"{name}.npy")), count=self.size).astype(bool)
+
+    # --- queries, each returns a boolean mask over all hands ---
+
+    def all(self):
+        return np.ones(self.size, dtype=bool)
+
+    def complete(self):
+        """Hands with every pocket and the full board known"""
+        return np.asarray(self.column('complete'))
+
+    def texture(self, stage, flag):
+        """Hands whose flop / turn / river board has a texture flag (see TEXTURE_FLAGS)"""
+        if stage not in STAGE_CARDS:
+            raise ValueError(f"Stage must be one of: {', '.join(STAGE_CARDS)}.")
+        if flag not in TEXTURE_FLAGS:
+            raise ValueError(f"Unknown texture '{flag}'. Use one of: {', '.join(TEXTURE_FLAGS)}.")
+        return self._bitmap(f"{stage}_{flag}")
+
+    def winning_category(self, hand):
+        """Hands won with a given category (name like 'Flush' or number 0-9)"""
+        category = HAND_CATEGORIES[hand] if isinstance(hand, str) else int(hand)
+        return self._bitmap(f"winning_{category}")
+
+    def leader_equity(self, stage, low, high):
+        """Hands whose logged flop / turn leader had low <= equity % <= high"""
+        if stage not in EQUITY_STAGES:
+            raise ValueError("Leader equity is logged for the flop and turn only.")
+        order = self._load(os.path.join("index", f"{stage}_leader_equity_order.npy"))
+        values = self._load(os.path.join("index", f"{stage}_leader_equity_sorted.npy"))
+        # NO_EQUITY sorts last, and 100% is only 10000, so it never falls in range
+        start = np.searchsorted(values, round(low * 100), side="left")
+        stop = np.searchsorted(values, round(high * 100), side="right")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def leader_lost(self, stage):
+        """Complete hands where the logged flop / turn leader did not win (or only split) the pot"""
+        leader = np.asarray(self.column(f'{stage}_leader')).astype(np.int64)
+        winners = np.asarray(self.column('winners')).astype(np.int64)
+        sole_winner = winners == (1 << np.maximum(leader, 0))
+        return self.complete() & (leader != NO_SEAT) & ~sole_winner
+
+    # --- reading rows ---
+
+    @staticmethod
+    def rows(mask):
+        return np.flatnonzero(mask)
+
+    def hand(self, row):
+        """One hand as a readable dict"""
+        num_players = int(self.column('num_players')[row])
+        pockets = self.column('pockets')[row]
+        board = [c for c in self.column('board')[row] if c != NO_CARD]
+        categories = self.column('final_category')[row]
+        winners = int(self.column('winners')[row])
+        return {
+            'row': int(row),
+            'timestamp': float(self.column('timestamp')[row]),
+            'pockets': [" ".join(str(card_from_id(c)) if c != NO_CARD else "??" for c in pockets[2 * i:2 * i + 2])
+                        for i in range(num_players)],
+            'board': " ".join(str(card_from_id(c)) for c in board),
+            'final_hands': [get_hand_name((int(c),)) if c != NO_CATEGORY else None for c in categories[:num_players]],
+            'winners': [seat + 1 for seat in range(num_players) if winners >> seat & 1],
+            'flop_leader': int(self.column('flop_leader')[row]) + 1 or None,
+            'turn_leader': int(self.column('turn_leader')[row]) + 1 or None,
+        }
+
+def parse_query(store, args):
+    """Combine the CLI filters into one mask"""
+    mask = store.all()
+    for spec in args.texture or []:
+        stage, flag = spec.split(":")
+        mask &= store.texture(stage, flag)
+    for stage in args.leader_lost or []:
+        mask &= store.leader_lost(stage)
+    for spec in args.leader_equity or []:
+        stage, low, high = spec.split(":")
+        mask &= store.leader_equity(stage, float(low), float(high))
+    if args.winning:
+        mask &= store.winning_category(args.winning)
+    return mask
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar hand store: build from a hand history, then query")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a store from a hand-history file")
+    build.add_argument("history")
+    build.add_argument("store")
+    build.add_argument("--chunk-size", type=int, default=BUILD_CHUNK)
+
+    query = commands.add_parser("query", help="count (and show) hands matching all filters")
+    query.add_argument("store")
+    query.add_argument("--texture", action="append", metavar="STAGE:FLAG",
+                       help=f"board texture, FLAG one of {', '.join(TEXTURE_FLAGS)}")
+    query.add_argument("--leader-lost", action="append", choices=EQUITY_STAGES, metavar="STAGE",
+                       help="the logged flop/turn leader did not win outright")
+    query.add_argument("--leader-equity", action="append", metavar="STAGE:LOW:HIGH",
+                       help="leader equity range in %%, e.g. flop:80:100")
+    query.add_argument("--winning", choices=list(HAND_CATEGORIES), help="winning hand category")
+    query.add_argument("--show", type=int, default=0, help="print the first N matching hands")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        rows = build_store(args.history, args.store, args.chunk_size)
+        print(f"Built {args.store} with {rows:,} hands")
+        return 0
+
+    store = HandStore(args.store)
+    try:
+        mask = parse_query(store, args)
+    except (ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return 2
+    rows = store.rows(mask)
+    print(f"{len(rows):,} of {len(store):,} hands match")
+    for row in rows[:args.show]:
+        print(json.dumps(store.hand(row)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# live_games.py - Live equity channels for the prediction server
+#
+# Each table/game id has one channel. Posting a new game state to a channel
+# starts exactly one computation for it; every update is pushed to all
+# subscribers of that game:
+#   - flop / pre-flop: interim Monte Carlo estimates every LIVE_MC_CHUNK
+#     simulations, then (flop only) the exact exhaustive result
+#   - turn / river: the exact result straight away
+# A newer state (e.g. the turn card arrives) cancels the older computation.
+# Channels with no subscribers, no running computation and no update for
+# CHANNEL_TTL_SEC are dropped, so abandoned game ids do not pile up.
+
+import asyncio
+import math
+import time
+
+from scenario import parse_scenario, results_to_json
+
+LIVE_MC_CHUNK = 2000
+LIVE_MC_TARGET = 24000
+SUBSCRIBER_QUEUE_SIZE = 16
+# Idle channels live this long; sweeps for them run at most every EVICT_SWEEP_SEC
+CHANNEL_TTL_SEC = 600
+EVICT_SWEEP_SEC = 60
+
+def state_key(community, pockets):
+    return (tuple(str(c) for c in community), tuple(tuple(str(c) for c in p or ()) for p in pockets))
+
+class GameChannel:
+    """One game's latest state, its running computation and its subscribers"""
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.version = 0
+        self.key = None
+        self.latest = None        # Last published event, replayed to new subscribers
+        self.subscribers = set()
+        self.task = None
+        self.last_active = time.monotonic()
+
+    @property
+    def active(self):
+        """Someone is subscribed or a computation is running"""
+        return bool(self.subscribers) or (self.task is not None and not self.task.done())
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        self.last_active = time.monotonic()
+
+    def publish(self, event):
+        """Fan one event out to every subscriber; slow subscribers lose their oldest events"""
+        self.latest = event
+        self.last_active = time.monotonic()
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+class LiveGames:
+    """All game channels of one server, sharing its worker pool"""
+
+    def __init__(self, get_executor, parallel_chunks=1, channel_ttl=CHANNEL_TTL_SEC):
+        self.get_executor = get_executor
+        self.parallel_chunks = parallel_chunks
+        self.channel_ttl = channel_ttl
+        self.channels = {}
+        self.computations = 0
+        self.evicted = 0
+        self.last_sweep = time.monotonic()
+
+    def evict_idle(self):
+        """Drop channels idle for channel_ttl seconds, sweeping at most every EVICT_SWEEP_SEC"""
+        now = time.monotonic()
+        if now - self.last_sweep < min(self.channel_ttl, EVICT_SWEEP_SEC):
+            return
+        self.last_sweep = now
+        idle = [game_id for game_id, channel in self.channels.items()
+                if not channel.active and now - channel.last_active >= self.channel_ttl]
+        for game_id in idle:
+            del self.channels[game_id]
+        self.evicted += len(idle)
+
+    def channel(self, game_id):
+        self.evict_idle()
+        if game_id not in self.channels:
+            self.channels[game_id] = GameChannel(game_id)
+        return self.channels[game_id]
+
+    def update(self, game_id, data):
+        """Set a game's state; recomputes only when the state actually changed"""
+        community, pockets = parse_scenario(data)
+        channel = self.channel(game_id)
+        key = state_key(community, pockets)
+
+        if key == channel.key:
+            return {'game': game_id, 'version': channel.version, 'changed': False}
+
+        if channel.task is not None:
+            channel.task.cancel()
+        channel.key = key
+        channel.version += 1
+        channel.last_active = time.monotonic()
+        channel.task = asyncio.ensure_future(self._compute(channel, channel.version, community, pockets))
+        self.computations += 1
+        return {'game': game_id, 'version': channel.version, 'changed': True}
+
+    def _event(self, channel, version, community, results, method_label, final):
+        event = {'game': channel.game_id, 'version': version, 'final': final,
+                 **results_to_json(results, community, method_label)}
+        if method_label == "Monte Carlo":
+            for player in event['players']:
+                p = player['win_probability'] / 100
+                player['std_error'] = math.sqrt(p * (1 - p) / event['simulations']) * 100
+        return event
+
+    async def _compute(self, channel, version, community, pockets):
+        try:
+            await self._run_engines(channel, version, community, pockets)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            channel.publish({'game': channel.game_id, 'version': version, 'final': True,
+                             'error': f"{type(e).__name__}: {e}"})
+
+    async def _run_engines(self, channel, version, community, pockets):
+        from monte_carlo import merge_monte_carlo_results, predict_hands_monte_carlo
+        from predictor import predict_hands_with_current
+
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        cards_needed = 5 - len(community)
+        # With hidden seats the flop has no exact pass either (too many deals)
+        exact_flop = cards_needed == 2 and None not in pockets
+
+        if cards_needed <= 1:
+            results = await loop.run_in_executor(executor, predict_hands_with_current, community, pockets)
+            channel.publish(self._event(channel, version, community, results,
+                                        results[0].get('method', "Exhaustive"), True))
+            return
+
+        # Keep one Monte Carlo chunk per worker running, publish as each one lands
+        chunks_left = math.ceil(LIVE_MC_TARGET / LIVE_MC_CHUNK)
+        pending = set()
+        merged = None
+        try:
+            while chunks_left or pending:
+                while chunks_left and len(pending) < self.parallel_chunks:
+                    pending.add(loop.run_in_executor(executor, predict_hands_monte_carlo,
+                                                     community, pockets, LIVE_MC_CHUNK))
+                    chunks_left -= 1
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    batch = future.result()
+                    merged = merge_monte_carlo_results([merged, batch] if merged else [batch])
+                # Without an exact pass the last Monte Carlo estimate is final
+                final = not exact_flop and not chunks_left and not pending
+                channel.publish(self._event(channel, version, community, merged, "Monte Carlo", final))
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if exact_flop:
+            results = await loop.run_in_executor(executor, predict_hands_with_current, community, pockets)
+            channel.publish(self._event(channel, version, community, results, "Exhaustive", True))
+
+    def snapshot(self, game_id):
+        channel = self.channels.get(game_id)
+        return channel.latest if channel else None
@@ -1,6 +1,25 @@
 # main.py - Program entry point
+#
+#   python main.py                       interactive game
+#   python main.py batch [options]       JSONL scenarios on stdin -> JSONL results on stdout
+#   python main.py serve [options]       long-lived local prediction server
+#   python main.py coordinator FILE      serve an exhaustive job to distributed workers
+#   python main.py worker [options]      count chunks for a coordinator
 
-from game import run_game
+import sys
 
 if __name__ == "__main__":
-    run_game()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from prediction_server import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] in ("coordinator", "worker"):
+        from distributed import coordinator_main, worker_main
+        sys.exit((coordinator_main if sys.argv[1] == "coordinator" else worker_main)(sys.argv[2:]))
+
+    from game import run_game
+    run_game()
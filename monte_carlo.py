@@ -1,123 +1,73 @@
 # monte_carlo.py - Monte Carlo simulation for poker hand prediction
 
-import random
-from collections import Counter
-from card import create_deck
-from evaluator import evaluate_hand, get_hand_name
+from equity import cards_to_ids, count_runouts, random_runouts, remaining_ids
+from evaluator import HAND_NAMES
+from profiling import profiled
+from results import PlayerResult, sort_by_win_probability
 
+@profiled("monte_carlo")
 def predict_hands_monte_carlo(community_cards, pocket_hands, num_simulations=25000):
     """
     Monte Carlo simulation - randomly samples future scenarios instead of testing all
     
     Args:
         community_cards: List of cards already on the table
-        pocket_hands: List of 6 players' pocket cards
+        pocket_hands: List of 2-10 players' pocket cards (None for a hidden seat)
         num_simulations: Number of random scenarios to test (default 10,000)
     
     Returns:
         List of prediction results sorted by win probability
     
     Performance:
-        - 10,000 sims ≈ 0.5-1 second (vs 1-2 seconds exhaustive)
-        - 50,000 sims ≈ 2-3 seconds (for higher accuracy)
+        - 10,000 sims ≈ 0.3 seconds for 6 players (each sampled board is shared by all players)
+        - 50,000 sims ≈ 1.3 seconds (for higher accuracy)
         - Accuracy: ~99.5% compared to exhaustive (within 0.5%)
     """
-    
-    # Get all used cards
-    used_cards = set(community_cards)
-    for hand in pocket_hands:
-        used_cards.update(hand)
-    
-    # Get remaining deck
-    all_cards = create_deck()
-    remaining_deck = [c for c in all_cards if c not in used_cards]
-    
-    # How many cards left to deal
-    num_community = len(community_cards)
-    cards_needed = 5 - num_community
-    
+    from predictor import predict_hands_hidden, results_from_counts
+
+    if None in pocket_hands:
+        # Hidden seats: their hole cards are sampled together with the board
+        return predict_hands_hidden(community_cards, pocket_hands, num_simulations, exact=False)
+
+    # Every sampled board is shared by all players
+    deck = remaining_ids(community_cards, pocket_hands)
+    runouts = random_runouts(deck, 5 - len(community_cards), num_simulations)
+    counts = count_runouts([cards_to_ids(p) for p in pocket_hands], cards_to_ids(community_cards), runouts)
+    return results_from_counts(community_cards, pocket_hands, counts, method='Monte Carlo')
+
+def merge_monte_carlo_results(batches):
+    """
+    Combine several Monte Carlo runs on the same game state into one result list
+
+    Each batch is a result list from predict_hands_monte_carlo. Wins and hand
+    type counts are summed, so merging k runs of n simulations gives the same
+    kind of estimate as one run of k*n simulations.
+    """
+    players = {}
+    for batch in batches:
+        for result in batch:
+            merged = players.setdefault(result.player, {
+                'first': result,
+                'wins': 0.0,
+                'simulations': 0,
+                'categories': [0] * len(HAND_NAMES),
+                'category_order': [],
+            })
+            merged['wins'] += result.win_probability / 100 * result.simulations
+            merged['simulations'] += result.simulations
+            for category in result.category_order:
+                if not merged['categories'][category]:
+                    merged['category_order'].append(category)
+                merged['categories'][category] += result.categories[category]
+
     results = []
-    
-    # Simulate for each player
-    for i, pocket in enumerate(pocket_hands):
-        wins = 0.0
-        total_simulations = 0
-        hand_type_counts = {}  # Track hand types
-        
-        # Run Monte Carlo simulations
-        for _ in range(num_simulations):
-            # Randomly sample future cards (without replacement)
-            future_cards = random.sample(remaining_deck, cards_needed)
-            full_community = community_cards + future_cards
-            
-            # Evaluate this player's hand
-            cards_tuple = tuple(pocket + full_community)
-            player_rank = evaluate_hand(cards_tuple)
-            hand_type_name = get_hand_name(player_rank)
-            
-            # Count this hand type
-            if hand_type_name not in hand_type_counts:
-                hand_type_counts[hand_type_name] = 0
-            hand_type_counts[hand_type_name] += 1
-            
-            # Evaluate all players for this scenario
-            player_ranks = []
-            for j, opp_pocket in enumerate(pocket_hands):
-                cards_tuple = tuple(opp_pocket + full_community)
-                rank = evaluate_hand(cards_tuple)
-                player_ranks.append((j, rank))
-            
-            # Find winners (handle ties)
-            best_rank = max(player_ranks, key=lambda x: x[1])[1]
-            winners = [j for j, rank in player_ranks if rank == best_rank]
-            
-            # Split pot on ties
-            if i in winners:
-                wins += 1.0 / len(winners)
-            
-            total_simulations += 1
-        
-        # Get current best hand
-        if len(community_cards) >= 5:
-            cards_tuple = tuple(pocket + community_cards)
-            current_hand_rank = evaluate_hand(cards_tuple)
-        elif len(community_cards) == 3 or len(community_cards) == 4:
-            from predictor import evaluate_best_partial_hand
-            all_cards_now = pocket + community_cards
-            current_hand_rank = evaluate_best_partial_hand(all_cards_now)
-        else:
-            current_hand_rank = None
-        
-        # Find most common hand type and build breakdown
-        most_common_hand = None
-        most_common_percentage = 0
-        hand_breakdown = {}
-        
-        if hand_type_counts:
-            sorted_hands = sorted(hand_type_counts.items(), key=lambda x: x[1], reverse=True)
-            most_common_hand = sorted_hands[0][0]
-            most_common_percentage = (sorted_hands[0][1] / total_simulations) * 100
-            
-            # Build breakdown for top 3
-            for hand_name, count in sorted_hands[:3]:
-                percentage = (count / total_simulations) * 100
-                hand_breakdown[hand_name] = percentage
-        
-        win_percentage = (wins / total_simulations) * 100
-        results.append({
-            'player': i + 1,
-            'pocket': pocket,
-            'win_probability': win_percentage,
-            'simulations': total_simulations,
-            'current_hand': current_hand_rank,
-            'most_likely_hand': most_common_hand,
-            'most_likely_percentage': most_common_percentage,
-            'hand_breakdown': hand_breakdown,
-            'all_hand_types': hand_type_counts,
-            'method': 'Monte Carlo'  # Mark as Monte Carlo result
-        })
-    
-    return sorted(results, key=lambda x: x['win_probability'], reverse=True)
+    for merged in players.values():
+        first = merged['first']
+        results.append(PlayerResult(first.player, first.pocket, first.board,
+                                    merged['wins'] / merged['simulations'] * 100, merged['simulations'],
+                                    merged['categories'], merged['category_order'], 'Monte Carlo',
+                                    current_hand=first.current_hand))
+    return sort_by_win_probability(results)
 
 def compare_monte_carlo_accuracy(community_cards, pocket_hands, num_simulations=10000):
     """
@@ -156,15 +106,21 @@ def compare_monte_carlo_accuracy(community_cards, pocket_hands, num_simulations=
     print(f"{'Player':<8} {'Exhaustive %':<15} {'Monte Carlo %':<15} {'Difference':<12}")
     print("-"*70)
     
+    # Both lists are sorted by win probability, so match players by number
+    mc_by_player = {mc['player']: mc for mc in mc_results}
     max_diff = 0
-    for ex, mc in zip(exhaustive_results, mc_results):
+    squared_diff_sum = 0
+    for ex in exhaustive_results:
+        mc = mc_by_player[ex['player']]
         diff = abs(ex['win_probability'] - mc['win_probability'])
         max_diff = max(max_diff, diff)
+        squared_diff_sum += diff * diff
         print(f"Player {ex['player']:<2} {ex['win_probability']:<15.2f} {mc['win_probability']:<15.2f} {diff:<12.2f}")
     
     print("-"*70)
     print(f"Maximum difference: {max_diff:.2f}%")
-    print(f"Accuracy: {100 - max_diff:.2f}%")
+    print(f"RMSE: {(squared_diff_sum / len(exhaustive_results)) ** 0.5:.2f}%")
+    print("(Single board - run convergence_report.py for a corpus-wide accuracy-vs-time table)")
     print("="*70)
     
     return exhaustive_results, mc_results
@@ -183,7 +139,7 @@ def auto_choose_method(community_cards, pocket_hands, speed_preference='balanced
     from card import create_deck
     used_cards = set(community_cards)
     for hand in pocket_hands:
-        used_cards.update(hand)
+        used_cards.update(hand or ())
     remaining = len(create_deck()) - len(used_cards)
     
     # Calculate combinations using factorial approximation
@@ -198,8 +154,8 @@ def auto_choose_method(community_cards, pocket_hands, speed_preference='balanced
     print(f"\nAnalyzing scenario: {cards_needed} cards to deal, ~{total_combos:,} combinations")
     
     # Decision logic
-    if cards_needed == 1:  # Turn stage
-        print("→ Using EXHAUSTIVE (Turn stage is already fast)")
+    if cards_needed <= 1:  # Turn or river stage
+        print("→ Using EXHAUSTIVE (Turn/River stage is already fast)")
         from predictor import predict_hands_with_current
         return predict_hands_with_current(community_cards, pocket_hands), 'Exhaustive'
     
@@ -4,8 +4,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
-from card import parse_card, Card
-from predictor import predict_hands_with_current
+from card import MAX_PLAYERS, parse_card, Card
 from evaluator import get_hand_name
 from utils import print_header
 
@@ -183,7 +182,7 @@ class PokerGUI:
         
         ttk.Label(player_section, text="Player Cards", style="Header.TLabel").pack(anchor=tk.W, pady=(0, 10))
         
-        # Player inputs grid - 3x2 layout with better spacing
+        # Player inputs grid - two columns, one field per seat; empty seats are skipped
         players_grid = ttk.Frame(player_section)
         players_grid.pack(fill=tk.X)
         
@@ -191,9 +190,9 @@ class PokerGUI:
         players_grid.columnconfigure(0, weight=1)
         players_grid.columnconfigure(1, weight=1)
         
-        # Create styled input fields for 6 players
+        # Create styled input fields for up to MAX_PLAYERS players
         self.player_entries = []
-        for i in range(6):
+        for i in range(MAX_PLAYERS):
             row = i // 2
             col = i % 2
             
@@ -213,9 +212,10 @@ class PokerGUI:
             entry.grid(row=0, column=1, padx=5, pady=5)
             self.player_entries.append(entry)
             
-            # Add placeholder text
-            entry.insert(0, "AS KH")
-            entry.bind("<FocusIn>", lambda e, i=i: self._clear_placeholder(e, i))
+            # Add placeholder text (heads-up seats only - any other seat may stay empty)
+            if i < 2:
+                entry.insert(0, "AS KH")
+                entry.bind("<FocusIn>", lambda e, i=i: self._clear_placeholder(e, i))
             
             # Add card icon
             card_icon = ttk.Label(player_frame, text="🃏", font=("Segoe UI", 14))
@@ -365,7 +365,7 @@ class PokerGUI:
             "precise win probabilities in Texas Hold'em poker.\n\n"
             "Features:\n"
             "• Calculates exact win probabilities using exhaustive simulation\n"
-            "• Supports up to 6 players with precise hand evaluation\n"
+            f"• Supports 2 to {MAX_PLAYERS} players with precise hand evaluation\n"
             "• Shows current best hand for each player at any stage\n"
             "• Handles split pot scenarios with fractional win percentages\n"
             "• Identifies optimal plays based on mathematical probabilities\n\n"
@@ -436,8 +436,8 @@ class PokerGUI:
                 self.status_var.set(f"Error parsing cards for Player {i+1}: {str(e)}")
                 return None, None
         
-        if not players:
-            self.status_var.set("Error: At least one player is required")
+        if len(players) < 2:
+            self.status_var.set("Error: At least two players are required")
             return None, None
         
         return players, used_cards
@@ -539,6 +539,7 @@ class PokerGUI:
                 return
             
             # Calculate odds
+            from predictor import predict_hands_with_current
             predictions = predict_hands_with_current(community_cards, pocket_hands)
             
             # Display results
@@ -691,4 +692,8 @@ class PokerGUI:
 if __name__ == "__main__":
     root = tk.Tk()
     app = PokerGUI(root)
+
+    # Load the engines while the user is still typing cards
+    from predictor import warmup
+    root.after_idle(lambda: threading.Thread(target=warmup, daemon=True).start())
     root.mainloop()
@@ -0,0 +1,140 @@
+# prediction_client.py - Small client for the local prediction server
+#
+#   client = PredictionClient()                          # http://127.0.0.1:8765
+#   client = PredictionClient(unix_socket="/tmp/poker.sock")
+#   result = client.predict(["AS AH", "KS KH"], "AC 5H 9D", method="exhaustive")
+#   for player in result['players']:
+#       print(player['player'], player['win_probability'])
+#
+# Live games: one process posts states, any number of dashboards subscribe
+#   client.update_game("table-3", pockets, "AC 5H 9D")
+#   for update in client.subscribe("table-3"):
+#       print(update['version'], update['final'], update['players'])
+
+import http.client
+import json
+import socket
+from urllib.parse import quote
+
+# Shared with prediction_server.py, kept here so clients never import asyncio
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+class PredictionServerError(Exception):
+    """The server rejected a request or could not be reached"""
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+class PredictionClient:
+    """Keeps one connection open to the prediction server and reuses it"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None, timeout=60):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+        self.connection = None
+
+    def _connect(self):
+        if self.unix_socket:
+            return _UnixHTTPConnection(self.unix_socket, self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+        headers = {'Content-Type': "application/json"} if body else {}
+
+        # Retry once on a stale keep-alive connection
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self._connect()
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = json.loads(response.read() or b"{}")
+                break
+            except (ConnectionError, http.client.HTTPException, OSError) as e:
+                self.close()
+                if attempt == 1:
+                    raise PredictionServerError(f"Prediction server unreachable: {e}")
+
+        if response.status != 200:
+            raise PredictionServerError(data.get('error', f"HTTP {response.status}"))
+        return data
+
+    @staticmethod
+    def _scenario(pockets, board):
+        return {
+            'pockets': [p if p is None or isinstance(p, str) else [str(c) for c in p] for p in pockets],
+            'board': board if isinstance(board, str) else [str(c) for c in board],
+        }
+
+    def predict(self, pockets, board=(), method=None, num_simulations=None, scenario_id=None):
+        """
+        Predict one game state
+
+        Args:
+            pockets: one entry per player, each "AS KC", ["AS", "KC"], two Card objects or None if hidden
+            board: community cards as "AH KH QH", a list of strings or Card objects
+            method: "exhaustive", "monte_carlo" or "auto" (None = server default)
+
+        Returns:
+            Result dict as produced by scenario.predict_scenario
+        """
+        scenario = {'id': scenario_id, **self._scenario(pockets, board)}
+        if method:
+            scenario['method'] = method
+        if num_simulations:
+            scenario['num_simulations'] = num_simulations
+        return self._request("POST", "/predict", scenario)
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def update_game(self, game_id, pockets, board=()):
+        """Publish a live game's new state - the server computes it once for all subscribers"""
+        return self._request("POST", f"/games/{quote(game_id, safe='')}", self._scenario(pockets, board))
+
+    def latest_update(self, game_id):
+        """Most recent pushed update for a game (raises PredictionServerError if none yet)"""
+        return self._request("GET", f"/games/{quote(game_id, safe='')}")
+
+    def subscribe(self, game_id):
+        """
+        Yield every update pushed for a game, as it arrives (blocks between updates)
+
+        Uses its own connection, streaming newline-delimited JSON.
+        """
+        connection = self._connect()
+        connection.timeout = None
+        try:
+            connection.request("GET", f"/games/{quote(game_id, safe='')}/events?format=ndjson")
+            response = connection.getresponse()
+            if response.status != 200:
+                raise PredictionServerError(f"HTTP {response.status}")
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        except (ConnectionError, http.client.HTTPException, OSError) as e:
+            raise PredictionServerError(f"Subscription to {game_id} lost: {e}")
+        finally:
+            connection.close()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,322 @@
+# prediction_server.py - Long-lived local prediction server (asyncio, JSON over HTTP)
+#
+#   python main.py serve                          # http://127.0.0.1:8765
+#   python main.py serve --unix /tmp/poker.sock   # same API on a Unix socket
+#
+# Endpoints:
+#   POST /predict                 body: one scenario (see scenario.py) -> result JSON
+#   GET  /health                  server status and cache statistics
+#   POST /games/<id>              set a live game's state (pockets + board)
+#   GET  /games/<id>              latest pushed update for a game
+#   GET  /games/<id>/events       server-sent events stream of updates for a game
+#                                 (?format=ndjson for newline-delimited JSON instead)
+#
+# Engines run in a pool of worker processes that stay alive, so their
+# evaluator caches stay warm between requests. Finished results are kept in
+# an LRU cache, and identical requests that arrive together share a single
+# computation. Live games are computed once per state and fanned out to all
+# subscribers (see live_games.py). Use prediction_client.PredictionClient to
+# talk to the server.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from live_games import LiveGames
+from prediction_client import DEFAULT_HOST, DEFAULT_PORT
+from scenario import METHODS, parse_scenario, predict_scenario
+
+DEFAULT_CACHE_SIZE = 4096
+MAX_BODY_BYTES = 1024 * 1024
+STREAM_KEEPALIVE_SEC = 15
+
+GAME_PATH = re.compile(r"^/games/([^/]+)(/events)?$")
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _warm_worker():
+    """Pool initializer: import the engines and fill the caches before the first request"""
+    from predictor import warmup
+
+    # Forked workers inherit one random state - reseed so Monte Carlo chunks differ
+    random.seed()
+    warmup()
+
+def scenario_cache_key(data, default_method):
+    """Canonical key for a scenario - the same game state always maps to the same key"""
+    community, pockets = parse_scenario(data)
+    method = data.get('method', default_method)
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Use one of: {', '.join(METHODS)}.")
+    return (tuple(str(c) for c in community),
+            tuple(tuple(str(c) for c in pocket or ()) for pocket in pockets),
+            method,
+            data.get('num_simulations'))
+
+class PredictionServer:
+    """Serves predictions from a warm worker pool with a shared result cache"""
+
+    def __init__(self, workers=None, cache_size=DEFAULT_CACHE_SIZE, default_method="auto"):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.default_method = default_method
+        self.executor = None
+        self.cache = OrderedDict()   # cache key -> result dict (without id)
+        self.in_flight = {}          # cache key -> asyncio.Future shared by identical requests
+        self.stats = {'requests': 0, 'cache_hits': 0, 'computed': 0, 'errors': 0}
+        self.started = time.time()
+        self.live = LiveGames(self.start_executor, self.workers)
+
+    def start_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        return self.executor
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def predict(self, data):
+        """Predict one scenario dict, using the cache and sharing in-flight work"""
+        self.stats['requests'] += 1
+        scenario_id = data.get('id') if isinstance(data, dict) else None
+
+        try:
+            key = scenario_cache_key(data, self.default_method)
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            self.stats['errors'] += 1
+            return {'id': scenario_id, 'error': str(e)}
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return {'id': scenario_id, **self.cache[key]}
+
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, data))
+            self.in_flight[key] = future
+        else:
+            self.stats['cache_hits'] += 1
+        result = await asyncio.shield(future)
+        return {'id': scenario_id, **result}
+
+    async def _compute(self, key, data):
+        try:
+            self.start_executor()
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, predict_scenario, data, self.default_method)
+            result.pop('id', None)
+            self.stats['computed'] += 1
+            if 'error' not in result:
+                self.cache[key] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            else:
+                self.stats['errors'] += 1
+            return result
+        finally:
+            del self.in_flight[key]
+
+    def health(self):
+        return {
+            'status': "ok",
+            'workers': self.workers,
+            'uptime_sec': round(time.time() - self.started, 1),
+            'cache_entries': len(self.cache),
+            'in_flight': len(self.in_flight),
+            'live_games': len(self.live.channels),
+            'live_subscribers': sum(len(c.subscribers) for c in self.live.channels.values()),
+            'live_computations': self.live.computations,
+            'live_evicted': self.live.evicted,
+            **self.stats,
+        }
+
+    # --- HTTP handling ---
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, query, headers, body = request
+
+                events_match = GAME_PATH.match(path)
+                if method == "GET" and events_match and events_match.group(2):
+                    fmt = query.get('format', ["sse"])[0]
+                    await self.stream_events(unquote(events_match.group(1)), writer, fmt)
+                    break
+
+                try:
+                    status, payload = await self.route(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # Client went away, or the server is shutting down
+        except HTTPError as e:
+            self._write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        """Dispatch one request, returns (status, JSON payload)"""
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET /health")
+            return 200, self.health()
+
+        if path == "/predict":
+            if method != "POST":
+                raise HTTPError(405, "Use POST /predict")
+            try:
+                data = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                raise HTTPError(400, f"Invalid JSON: {e}")
+            result = await self.predict(data)
+            return (400 if 'error' in result else 200), result
+
+        game_match = GAME_PATH.match(path)
+        if game_match and not game_match.group(2):
+            game_id = unquote(game_match.group(1))
+            if method == "POST":
+                try:
+                    data = json.loads(body or b"{}")
+                    return 200, self.live.update(game_id, data)
+                except json.JSONDecodeError as e:
+                    raise HTTPError(400, f"Invalid JSON: {e}")
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    raise HTTPError(400, str(e))
+            if method == "GET":
+                snapshot = self.live.snapshot(game_id)
+                if snapshot is None:
+                    raise HTTPError(404, f"No updates for game {game_id} yet")
+                return 200, snapshot
+            raise HTTPError(405, "Use GET or POST /games/<id>")
+
+        raise HTTPError(404, f"No route for {path}")
+
+    async def stream_events(self, game_id, writer, fmt):
+        """Push every update for one game to this connection until the client leaves"""
+        content_type = "application/x-ndjson" if fmt == "ndjson" else "text/event-stream"
+        writer.write((f"HTTP/1.1 200 OK\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Cache-Control: no-cache\r\n"
+                      f"Connection: close\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        channel = self.live.channel(game_id)
+        queue = channel.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    writer.write(b"\n" if fmt == "ndjson" else b": keepalive\n\n")
+                else:
+                    data = json.dumps(event)
+                    if fmt == "ndjson":
+                        writer.write(data.encode() + b"\n")
+                    else:
+                        writer.write(f"event: equity\nid: {event['version']}\ndata: {data}\n\n".encode())
+                await writer.drain()
+        finally:
+            channel.unsubscribe(queue)
+
+    async def _read_request(self, reader):
+        """Read one request, returns (method, path, query, headers, body) or None at end of stream"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise HTTPError(400, "Malformed request line")
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(path)
+        return method.upper(), url.path, parse_qs(url.query), headers, body
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+        """Run until cancelled"""
+        self.start_executor()
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.unlink(unix_socket)
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+            where = f"unix:{unix_socket}"
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            where = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+
+        print(f"Prediction server listening on {where} ({self.workers} workers)", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+            if unix_socket and os.path.exists(unix_socket):
+                os.unlink(unix_socket)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Run the local prediction server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None, help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="engine worker processes (default: all cores)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="cached results to keep")
+    parser.add_argument("--method", choices=METHODS, default="auto", help="default prediction method")
+    args = parser.parse_args(argv)
+
+    server = PredictionServer(args.workers, args.cache_size, args.method)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,172 +1,188 @@
 # predictor.py - Win probability calculations
 
 import itertools
-from card import create_deck
-from evaluator import evaluate_hand, get_hand_name
-from monte_carlo import predict_hands_monte_carlo, auto_choose_method
+import math
+from equity import (cards_to_ids, count_deals, count_exhaustive, count_exhaustive_compressed,
+                    count_exhaustive_pruned, count_ranked, hidden_deals, num_hidden_deals, random_runouts,
+                    remaining_ids, RunoutRanks)
+from evaluator import begin, evaluate_hand, unpack_rank
+from profiling import profiled
+from results import PlayerResult, sort_by_win_probability
 
+def exhaustive_counts(community_cards, pocket_hands, compress=True, hand_types=True):
+    """
+    Showdown tallies (equity.EquityCounts) over every possible runout
+
+    With compress, runouts that must end the same way (equity.runout_classes)
+    are evaluated once and weighted; the counts are identical either way.
+    Players drawing dead are left out of the showdowns and decided spots
+    are not enumerated at all (equity.count_exhaustive_pruned); their hand
+    types are tallied on their own. Without hand_types only wins and splits
+    are needed, so that tally is skipped and hand-type counts are incomplete.
+    """
+    deck = remaining_ids(community_cards, pocket_hands)
+    pocket_ids, board_ids = [cards_to_ids(p) for p in pocket_hands], cards_to_ids(community_cards)
+    count = count_exhaustive_compressed if compress else count_exhaustive
+    return count_exhaustive_pruned(pocket_ids, board_ids, deck, count=count, hand_types=hand_types)
+
+@profiled("exhaustive")
 def predict_hands(community_cards, pocket_hands):
     """Calculate win probabilities for all players"""
-    
-    # Get all used cards
-    used_cards = set(community_cards)
-    for hand in pocket_hands:
-        used_cards.update(hand)
-    
-    # Get remaining deck
-    all_cards = create_deck()
-    remaining_deck = [c for c in all_cards if c not in used_cards]
-    
-    # How many cards left to deal
-    num_community = len(community_cards)
-    cards_needed = 5 - num_community
-    
+    if None in pocket_hands:
+        return predict_hands_hidden(community_cards, pocket_hands)
+    counts = exhaustive_counts(community_cards, pocket_hands, hand_types=False)
+
     results = []
-    
-    # Simulate for each player
     for i, pocket in enumerate(pocket_hands):
-        wins = 0.0
-        total_simulations = 0
-        
-        # Try all possible future boards
-        for future_cards in itertools.combinations(remaining_deck, cards_needed):
-            full_community = community_cards + list(future_cards)
-            
-            # Evaluate all players for this scenario
-            player_ranks = []
-            for j, opp_pocket in enumerate(pocket_hands):
-                cards_tuple = tuple(opp_pocket + full_community)
-                rank = evaluate_hand(cards_tuple)
-                player_ranks.append((j, rank))
-            
-            # Find winners (handle ties)
-            best_rank = max(player_ranks, key=lambda x: x[1])[1]
-            winners = [j for j, rank in player_ranks if rank == best_rank]
-            
-            # Split pot on ties
-            if i in winners:
-                wins += 1.0 / len(winners)
-            
-            total_simulations += 1
-        
         # Get current best hand if 5+ cards
         if len(community_cards) >= 5:
-            cards_tuple = tuple(pocket + community_cards)
-            current_hand = evaluate_hand(cards_tuple)
+            current_hand = evaluate_hand(tuple(pocket + community_cards))
         else:
             current_hand = None
-        
-        win_percentage = (wins / total_simulations) * 100
+
         results.append({
             'player': i + 1,
             'pocket': pocket,
-            'win_probability': win_percentage,
-            'simulations': total_simulations,
+            'win_probability': counts.win_probability(i),
+            'simulations': counts.boards,
             'current_hand': current_hand
         })
-    
+
     return sorted(results, key=lambda x: x['win_probability'], reverse=True)
 
-def predict_hands_with_current(community_cards, pocket_hands):
-    """Calculate win probabilities AND show current hand + most likely future hand for each player"""
-    
-    # Get all used cards
-    used_cards = set(community_cards)
-    for hand in pocket_hands:
-        used_cards.update(hand)
-    
-    # Get remaining deck
-    all_cards = create_deck()
-    remaining_deck = [c for c in all_cards if c not in used_cards]
-    
-    # How many cards left to deal
-    num_community = len(community_cards)
-    cards_needed = 5 - num_community
-    
+def current_hand_rank(community_cards, pocket):
+    """Best hand a player holds right now, None before the flop"""
+    if len(community_cards) < 3:
+        return None
+    # Packed rank of the 5-7 known cards, as a (rank, primary_values, kickers) tuple
+    return unpack_rank(begin(cards_to_ids(pocket + community_cards)).rank())
+
+def results_from_counts(community_cards, pocket_hands, counts, method=None, current_hands=None):
+    """
+    PlayerResults (sorted by win probability) from showdown tallies
+
+    current_hands: each player's current_hand_rank when already known
+    (computed on first read otherwise)
+    """
     results = []
-    
-    # Simulate for each player
     for i, pocket in enumerate(pocket_hands):
-        wins = 0.0
-        total_simulations = 0
-        hand_type_counts = {}  # Track hand types and their frequency
-        
-        # Try all possible future boards
-        for future_cards in itertools.combinations(remaining_deck, cards_needed):
-            full_community = community_cards + list(future_cards)
-            
-            # Evaluate this player's hand for this scenario
-            cards_tuple = tuple(pocket + full_community)
-            player_rank = evaluate_hand(cards_tuple)
-            hand_type_name = get_hand_name(player_rank)
-            
-            # Count this hand type
-            if hand_type_name not in hand_type_counts:
-                hand_type_counts[hand_type_name] = 0
-            hand_type_counts[hand_type_name] += 1
-            
-            # Evaluate all players for this scenario
-            player_ranks = []
-            for j, opp_pocket in enumerate(pocket_hands):
-                cards_tuple = tuple(opp_pocket + full_community)
-                rank = evaluate_hand(cards_tuple)
-                player_ranks.append((j, rank))
-            
-            # Find winners (handle ties)
-            best_rank = max(player_ranks, key=lambda x: x[1])[1]
-            winners = [j for j, rank in player_ranks if rank == best_rank]
-            
-            # Split pot on ties
-            if i in winners:
-                wins += 1.0 / len(winners)
-            
-            total_simulations += 1
-        
-        # Get CURRENT best hand with available cards
-        if len(community_cards) >= 5:
-            # If 5 cards available, evaluate best 5-card hand
-            cards_tuple = tuple(pocket + community_cards)
-            current_hand_rank = evaluate_hand(cards_tuple)
-        elif len(community_cards) == 3 or len(community_cards) == 4:
-            # If 3 or 4 community cards, show what hand they currently have
-            all_cards_now = pocket + community_cards
-            current_hand_rank = evaluate_best_partial_hand(all_cards_now)
+        if pocket is None:
+            continue  # hidden seat
+        known = {'current_hand': current_hands[i]} if current_hands else {}
+        results.append(PlayerResult(i + 1, pocket, community_cards, counts.win_probability(i), counts.boards,
+                                    counts.categories[i], counts.category_order[i], method, **known))
+    return sort_by_win_probability(results)
+
+@profiled("exhaustive")
+def predict_hands_with_current(community_cards, pocket_hands, *, compress=True):
+    """Calculate win probabilities AND show current hand + most likely future hand for each player"""
+    if None in pocket_hands:
+        return predict_hands_hidden(community_cards, pocket_hands)
+    counts = exhaustive_counts(community_cards, pocket_hands, compress)
+    return results_from_counts(community_cards, pocket_hands, counts)
+
+@profiled("vectorized")
+def predict_hands_vectorized(community_cards, pocket_hands):
+    """
+    Exhaustive prediction evaluated with NumPy (needs numpy)
+
+    Same results as predict_hands_with_current; all runouts and players are
+    evaluated as arrays instead of one board at a time.
+    """
+    from vector_evaluator import count_exhaustive_vectorized
+
+    if None in pocket_hands:
+        return predict_hands_hidden(community_cards, pocket_hands)
+    deck = remaining_ids(community_cards, pocket_hands)
+    counts = count_exhaustive_vectorized([cards_to_ids(p) for p in pocket_hands],
+                                         cards_to_ids(community_cards), deck)
+    return results_from_counts(community_cards, pocket_hands, counts)
+
+# Deals of hidden hole cards and board enumerated exactly up to this many, sampled above
+HIDDEN_EXACT_DEALS = 50_000
+
+@profiled("hidden")
+def predict_hands_hidden(community_cards, pocket_hands, num_simulations=25000, exact=None):
+    """
+    Win probabilities of the known players when some seats are hidden (None)
+
+    Hidden seats are dealt hole cards from the cards nobody has seen, in the
+    same deal as the rest of the board, so every sample is one consistent
+    table. Small cases (one hidden seat on the turn or river) are enumerated
+    exactly; otherwise num_simulations deals are sampled. Results cover the
+    known seats only, each with a 'std_error' (0 when exact).
+    """
+    known = [pocket for pocket in pocket_hands if pocket is not None]
+    if not known:
+        raise ValueError("At least one player's pocket cards must be known.")
+    deck = remaining_ids(community_cards, known)
+    num_hidden = len(pocket_hands) - len(known)
+    cards_needed = 5 - len(community_cards)
+    if exact is None:
+        exact = num_hidden_deals(len(deck), num_hidden, cards_needed) <= HIDDEN_EXACT_DEALS
+    if exact:
+        deals, method = hidden_deals(deck, num_hidden, cards_needed), 'Exhaustive'
+    else:
+        deals, method = random_runouts(deck, 2 * num_hidden + cards_needed, num_simulations), 'Monte Carlo'
+
+    pocket_ids = [cards_to_ids(p) if p is not None else None for p in pocket_hands]
+    counts = count_deals(pocket_ids, cards_to_ids(community_cards), deals)
+    results = results_from_counts(community_cards, pocket_hands, counts, method)
+    for result in results:
+        p = result['win_probability'] / 100
+        result.std_error = 0.0 if exact else math.sqrt(p * (1 - p) / counts.boards) * 100
+    return results
+
+def predict_many(scenarios):
+    """
+    Exhaustive predictions for many game states, sharing work between them
+
+    Args:
+        scenarios: (community_cards, pocket_hands) or (community_cards,
+                   pocket_hands, dead_cards) per game state; dead cards (a
+                   folded hand that was shown, ...) cannot come on the board
+
+    Returns:
+        One result list per scenario, in order, as predict_hands_with_current
+
+    Scenarios with the same board and dead cards - what-if variants of one
+    hand - share a single enumeration of the runouts, and each distinct
+    pocket is ranked on them once (equity.RunoutRanks) however many
+    scenarios hold it; 7-card ranks are cached across all of them. A
+    scenario then only compares its players' cached ranks, skipping
+    runouts that deal one of their cards, so its counts are the same as
+    predict_hands_with_current's. Pre-flop scenarios and hidden seats are
+    predicted one by one.
+    """
+    results = [None] * len(scenarios)
+    groups = {}
+    for n, scenario in enumerate(scenarios):
+        community_cards, pocket_hands, *dead_cards = scenario
+        dead_ids = frozenset(cards_to_ids(dead_cards[0])) if dead_cards else frozenset()
+        if len(community_cards) >= 3 and None not in pocket_hands:
+            groups.setdefault((frozenset(cards_to_ids(community_cards)), dead_ids), []).append(n)
+        elif dead_ids:
+            raise ValueError("Dead cards need a flop, turn or river and every pocket known.")
         else:
-            # Pre-flop or no cards
-            current_hand_rank = None
-        
-        # Find most common hand type and build breakdown
-        most_common_hand = None
-        most_common_percentage = 0
-        hand_breakdown = {}
-        
-        if hand_type_counts:
-            # Sort hand types by frequency (most common first)
-            sorted_hands = sorted(hand_type_counts.items(), key=lambda x: x[1], reverse=True)
-            
-            # Get most common
-            most_common_hand = sorted_hands[0][0]
-            most_common_percentage = (sorted_hands[0][1] / total_simulations) * 100
-            
-            # Build breakdown for top 3 most common hands
-            for hand_name, count in sorted_hands[:3]:
-                percentage = (count / total_simulations) * 100
-                hand_breakdown[hand_name] = percentage
-        
-        win_percentage = (wins / total_simulations) * 100
-        results.append({
-            'player': i + 1,
-            'pocket': pocket,
-            'win_probability': win_percentage,
-            'simulations': total_simulations,
-            'current_hand': current_hand_rank,
-            'most_likely_hand': most_common_hand,
-            'most_likely_percentage': most_common_percentage,
-            'hand_breakdown': hand_breakdown,  # Top 3 hands
-            'all_hand_types': hand_type_counts  # Keep full breakdown for reference
-        })
-    
-    return sorted(results, key=lambda x: x['win_probability'], reverse=True)
+            results[n] = predict_hands_with_current(community_cards, pocket_hands)
+
+    known = {}  # 7-card ranks, shared by every board
+    for (board, dead_ids), members in groups.items():
+        deck = [c for c in range(52) if c not in board and c not in dead_ids]
+        runouts = RunoutRanks(cards_to_ids(scenarios[members[0]][0]), deck, known)
+        ranked = {}  # sorted pocket ids -> (ranks on the runouts, current hand)
+        for n in members:
+            community_cards, pocket_hands = scenarios[n][:2]
+            players = []
+            for pocket in pocket_hands:
+                key = tuple(sorted(cards_to_ids(pocket)))
+                if key not in ranked:
+                    ranked[key] = (runouts.ranks(key), current_hand_rank(community_cards, pocket))
+                players.append(ranked[key])
+            counts = count_ranked([ranks for ranks, _ in players])
+            results[n] = results_from_counts(community_cards, pocket_hands, counts,
+                                             current_hands=[current for _, current in players])
+    return results
 
 def evaluate_best_partial_hand(cards):
     """Evaluate best possible hand from less than 5 cards"""
@@ -198,8 +214,12 @@ def evaluate_best_partial_hand(cards):
                 best_rank = rank
         return best_rank
 
+@profiled()
 def predict_hands_with_method(community_cards, pocket_hands, method="exhaustive"):
     """Unified interface for predicting hands with chosen method"""
+    # Imported here so the exhaustive-only paths never load the Monte Carlo engine
+    from monte_carlo import predict_hands_monte_carlo, auto_choose_method
+
     if method == "monte_carlo":
         # Monte Carlo (10k sims default)
         return predict_hands_monte_carlo(community_cards, pocket_hands, 25000)
@@ -207,8 +227,26 @@ def predict_hands_with_method(community_cards, pocket_hands, method="exhaustive"
         # Auto decide based on stage and speed preference
         results, _ = auto_choose_method(community_cards, pocket_hands, "balanced")
         return results
+    elif method == "vectorized":
+        return predict_hands_vectorized(community_cards, pocket_hands)
     else:
         # Default to exhaustive - use the detailed version
         return predict_hands_with_current(community_cards, pocket_hands)
 
+def warmup():
+    """
+    Load every engine and lookup table now instead of on first use
 
+    For long-running processes (servers, pool workers, the GUI) so the first
+    real prediction does not pay for imports and table builds.
+    """
+    import monte_carlo  # noqa: F401
+    from card import parse_card
+    from evaluator import rank_tables
+    rank_tables()
+    try:
+        import vector_evaluator  # noqa: F401
+    except ImportError:
+        pass  # numpy not installed
+    pockets = [[parse_card("AS"), parse_card("AH")], [parse_card("KS"), parse_card("KH")]]
+    predict_hands_with_current([parse_card(c) for c in ("2C", "7D", "9H", "10S")], pockets)
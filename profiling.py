@@ -0,0 +1,145 @@
+# profiling.py - Opt-in profiling hooks for the prediction engines
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+# Set this to a directory to profile every prediction call, e.g.
+#   POKER_PROFILE_DIR=profiles python main.py
+PROFILE_ENV_VAR = "POKER_PROFILE_DIR"
+SAMPLE_INTERVAL_ENV_VAR = "POKER_PROFILE_INTERVAL"
+
+STAGE_NAMES = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}
+
+_profile_dir = os.environ.get(PROFILE_ENV_VAR) or None
+_sample_interval = float(os.environ.get(SAMPLE_INTERVAL_ENV_VAR, "0.001"))
+_call_counter = 0
+_counter_lock = threading.Lock()
+_active = threading.local()  # Stops nested predict_hands_* calls profiling twice
+
+
+def enable_profiling(output_dir, sample_interval=0.001):
+    """Turn profiling on for all following predict_hands_* calls"""
+    global _profile_dir, _sample_interval
+    os.makedirs(output_dir, exist_ok=True)
+    _profile_dir = output_dir
+    _sample_interval = sample_interval
+
+
+def disable_profiling():
+    """Turn profiling off again"""
+    global _profile_dir
+    _profile_dir = None
+
+
+def is_profiling_enabled():
+    return _profile_dir is not None
+
+
+def profiled(method=None):
+    """
+    Decorator for predict_hands_* engines: write one profile per call when enabled
+
+    Args:
+        method: Method tag for the output files. None means read it from the
+                wrapped call's `method` argument (predict_hands_with_method).
+
+    When profiling is off the wrapper only checks one module global before
+    calling straight through, so normal runs pay nothing measurable.
+    Arguments are passed on unchanged, positional or keyword.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profile_dir is None or getattr(_active, "running", False):
+                return func(*args, **kwargs)
+
+            # Imported here: only profiled calls need to look at the arguments by name
+            import inspect
+            call = inspect.signature(func).bind(*args, **kwargs)
+            call.apply_defaults()
+            tag = call.arguments.get("method", "exhaustive") if method is None else method
+            return _run_profiled(func, tag, call.arguments["community_cards"], call.arguments["pocket_hands"],
+                                 args, kwargs)
+        return wrapper
+    return decorator
+
+
+def _run_profiled(func, method, community_cards, pocket_hands, args, kwargs):
+    """Run one engine call under cProfile plus a stack sampler and save both outputs"""
+    os.makedirs(_profile_dir, exist_ok=True)
+    base_path = os.path.join(_profile_dir, _profile_name(method, community_cards, len(pocket_hands)))
+
+    sampler = _StackSampler(threading.get_ident(), func.__code__, _sample_interval)
+    import cProfile
+    profiler = cProfile.Profile()
+
+    _active.running = True
+    sampler.start()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        _active.running = False
+
+        profiler.dump_stats(base_path + ".prof")
+        sampler.write_collapsed(base_path + ".collapsed")
+
+
+def _profile_name(method, community_cards, num_players):
+    """Build a file name tagged with call number, stage, method, board and player count"""
+    global _call_counter
+    with _counter_lock:
+        _call_counter += 1
+        call_number = _call_counter
+
+    stage = STAGE_NAMES.get(len(community_cards), f"{len(community_cards)}cards")
+    board = "-".join(str(c) for c in community_cards) or "noboard"
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    return f"{timestamp}_{os.getpid()}-{call_number:04d}_{stage}_{method}_{board}_{num_players}p"
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval (collapsed-stack format)"""
+
+    def __init__(self, target_thread_id, entry_code, interval):
+        super().__init__(daemon=True)
+        self.target_thread_id = target_thread_id
+        self.entry_code = entry_code
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+        # Frames at or above this one belong to the caller, not the engine
+        self._root_frame = sys._getframe(1)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            code = None
+            while frame is not None and frame is not self._root_frame:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            # Skip samples taken before the engine started or after it returned
+            if code is self.entry_code:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write_collapsed(self, path):
+        """Write 'frame;frame;frame count' lines, as read by flamegraph.pl and speedscope"""
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,232 @@
+# range_equity.py - Equity between weighted hand ranges (optional, needs numpy)
+#
+#   python range_equity.py "QQ+, AKs" "AhKd" --board "QS 7D 2C"
+#   python range_equity.py "22+, ATs+" "KQ" "JJ:0.5, TT" --samples 200000 --seed 1
+#
+# Ranges come from ranges.parse_range. Combos holding a board card are
+# dropped, and combos of different ranges that share a card are never dealt
+# together (card removal); every remaining combination of one combo per range
+# counts in proportion to the product of the combo weights.
+#
+# Heads-up, every runout of the board is enumerated when that is cheap enough
+# (EXACT_WORK): each runout is evaluated once for every combo of both ranges
+# with vector_evaluator.evaluate_ids, then all combo pairs are compared in one
+# array operation. A pair is only counted on runouts that share no card with
+# it, and every pair has the same number of such runouts, so the weighted
+# average over pairs is the exact equity. Pre-flop and with three or more
+# ranges, combos and runouts are sampled instead (with a standard error).
+
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from card import parse_card
+from equity import SHARE_UNIT, SPLIT_SHARES, cards_to_ids
+from ranges import parse_range
+from vector_evaluator import evaluate_ids, runout_index
+
+SPLIT_TABLE = np.array(SPLIT_SHARES, dtype=np.int64)
+
+# Runouts x (combo pairs + combos) above which heads-up equity is sampled
+EXACT_WORK = 20_000_000
+# Runout x combo pair comparisons per array operation
+PAIR_CHUNK = 2_000_000
+# Sampled deals per array operation
+SAMPLE_CHUNK = 32768
+DEFAULT_SAMPLES = 100_000
+MAX_EMPTY_BATCHES = 100
+
+def range_equity(board_ids, ranges, num_samples=None, exact=None, seed=None):
+    """
+    Equity of each range against the others
+
+    Args:
+        board_ids: 0-5 known board card ids
+        ranges: {combo: weight} per player (ranges.parse_range)
+        num_samples: deals to sample when not exact (default DEFAULT_SAMPLES)
+        exact: True / False to force enumeration / sampling, None to choose
+        seed: random seed for sampling
+
+    Returns:
+        One dict per range: player, combos (left after board removal),
+        equity (pot share won, %), win_probability / tie_probability (%),
+        std_error (of equity, 0 when exact), simulations, method
+    """
+    board_ids = list(board_ids)
+    if len(ranges) < 2:
+        raise ValueError("Need at least 2 ranges.")
+    if len(board_ids) not in (0, 3, 4, 5) or len(set(board_ids)) != len(board_ids):
+        raise ValueError("Board must have 0, 3, 4 or 5 distinct cards.")
+    combos, weights = [], []
+    for i, range_combos in enumerate(ranges):
+        live = [(combo, w) for combo, w in range_combos.items() if not set(combo) & set(board_ids)]
+        if not live:
+            raise ValueError(f"Range {i+1} has no combos left once the board is removed.")
+        combos.append(np.array([combo for combo, _ in live], dtype=np.int64))
+        weights.append(np.array([w for _, w in live], dtype=np.float64))
+
+    num_runouts = math.comb(52 - len(board_ids), 5 - len(board_ids))
+    if exact is None:
+        n1, n2 = len(combos[0]), len(combos[-1])
+        exact = len(ranges) == 2 and num_runouts * (n1 * n2 + n1 + n2) <= EXACT_WORK
+    if exact:
+        if len(ranges) != 2:
+            raise ValueError("Exact range equity is heads-up only.")
+        return _exact_heads_up(board_ids, combos, weights)
+    rng = np.random.default_rng(seed)
+    return _sampled(board_ids, combos, weights, num_samples or DEFAULT_SAMPLES, rng)
+
+def _conflicts(a, b):
+    """(len(a), len(b)) bool: whether card id rows of a and b share a card"""
+    return (a[:, None, :, None] == b[None, :, None, :]).any(axis=(2, 3))
+
+def _rank_combos(combos, board, cards):
+    """Ranks (B, n) of n combos on B runouts, and whether each combo is live on each runout"""
+    num_boards, n = len(cards), len(combos)
+    hands = np.concatenate([
+        np.broadcast_to(combos[None, :, :], (num_boards, n, 2)),
+        np.broadcast_to(board[None, None, :], (num_boards, n, len(board))),
+        np.broadcast_to(cards[:, None, :], (num_boards, n, cards.shape[1])),
+    ], axis=2)
+    live = ~(combos[None, :, :, None] == cards[:, None, None, :]).any(axis=(2, 3))
+    ranks = np.zeros((num_boards, n), dtype=np.int64)
+    ranks[live] = evaluate_ids(hands[live])  # a combo holding a runout card is not a hand
+    return ranks, live
+
+def _exact_heads_up(board_ids, combos, weights):
+    (c1, c2), (w1, w2) = combos, weights
+    pair_weights = np.outer(w1, w2) * ~_conflicts(c1, c2)
+    total_weight = pair_weights.sum()
+    if total_weight == 0:
+        raise ValueError("The ranges have no pair of combos without a shared card.")
+
+    board = np.array(board_ids, dtype=np.int64)
+    deck = np.array([c for c in range(52) if c not in board_ids], dtype=np.int64)
+    cards_needed = 5 - len(board_ids)
+    runouts = deck[runout_index(len(deck), cards_needed)]
+    wins = np.zeros(pair_weights.shape, dtype=np.int64)
+    ties = np.zeros(pair_weights.shape, dtype=np.int64)
+    chunk = max(1, PAIR_CHUNK // pair_weights.size)
+    for start in range(0, len(runouts), chunk):
+        cards = runouts[start:start + chunk]
+        r1, live1 = _rank_combos(c1, board, cards)
+        r2, live2 = _rank_combos(c2, board, cards)
+        both = live1[:, :, None] & live2[:, None, :]
+        wins += ((r1[:, :, None] > r2[:, None, :]) & both).sum(axis=0)
+        ties += ((r1[:, :, None] == r2[:, None, :]) & both).sum(axis=0)
+
+    # Runouts avoiding the 4 pocket cards - the same for every pair
+    boards = math.comb(len(deck) - 4, cards_needed)
+    losses = boards - wins - ties
+    scale = 100 / (total_weight * boards)
+    win = [(pair_weights * wins).sum() * scale, (pair_weights * losses).sum() * scale]
+    tie = (pair_weights * ties).sum() * scale
+    return [{
+        'player': i + 1,
+        'combos': len(combos[i]),
+        'equity': float(win[i] + tie / 2),
+        'win_probability': float(win[i]),
+        'tie_probability': float(tie),
+        'std_error': 0.0,
+        'simulations': boards,
+        'method': "Exact",
+    } for i in range(2)]
+
+def _deal_combos(combos, probabilities, num_samples, rng):
+    """(num_samples, 2 * players) card ids: one weighted combo per range, no card dealt twice"""
+    dealt, count, empty = [], 0, 0
+    while count < num_samples:
+        batch = max(num_samples - count, 1024)
+        held = np.concatenate([c[rng.choice(len(c), batch, p=p)] for c, p in zip(combos, probabilities)], axis=1)
+        ordered = np.sort(held, axis=1)
+        keep = (ordered[:, 1:] != ordered[:, :-1]).all(axis=1)
+        if not keep.any():
+            empty += 1
+            if empty >= MAX_EMPTY_BATCHES:
+                raise ValueError("The ranges have (almost) no combination of combos without a shared card.")
+            continue
+        dealt.append(held[keep])
+        count += int(keep.sum())
+    return np.concatenate(dealt)[:num_samples]
+
+def _sampled(board_ids, combos, weights, num_samples, rng):
+    num_players = len(combos)
+    probabilities = [w / w.sum() for w in weights]
+    held = _deal_combos(combos, probabilities, num_samples, rng)
+    board = np.array(board_ids, dtype=np.int64)
+    cards_needed = 5 - len(board_ids)
+
+    won = np.zeros(num_players, dtype=np.int64)
+    tied = np.zeros(num_players, dtype=np.int64)
+    share_sum = np.zeros(num_players, dtype=np.float64)
+    share_squares = np.zeros(num_players, dtype=np.float64)
+    rows = np.arange(SAMPLE_CHUNK)[:, None]
+    for start in range(0, num_samples, SAMPLE_CHUNK):
+        pockets = held[start:start + SAMPLE_CHUNK]
+        n = len(pockets)
+        # Random board cards: the cards_needed smallest random keys among the undealt cards
+        keys = rng.random((n, 52))
+        keys[:, board] = 2
+        keys[rows[:n], pockets] = 2
+        cards = np.argpartition(keys, cards_needed, axis=1)[:, :cards_needed] if cards_needed else keys[:, :0]
+        known = np.concatenate([np.broadcast_to(board, (n, len(board))), cards.astype(np.int64)], axis=1)
+        hands = np.stack([np.concatenate([pockets[:, 2 * i:2 * i + 2], known], axis=1)
+                          for i in range(num_players)])
+        ranks = evaluate_ids(hands)                                           # (P, n)
+        winners = ranks == ranks.max(axis=0)
+        num_winners = winners.sum(axis=0)
+        shares = winners * SPLIT_TABLE[num_winners] / SHARE_UNIT             # (P, n) pot fraction
+        won += (winners & (num_winners == 1)).sum(axis=1)
+        tied += (winners & (num_winners > 1)).sum(axis=1)
+        share_sum += shares.sum(axis=1)
+        share_squares += (shares ** 2).sum(axis=1)
+
+    results = []
+    for i in range(num_players):
+        mean = share_sum[i] / num_samples
+        variance = max(share_squares[i] / num_samples - mean ** 2, 0.0)
+        results.append({
+            'player': i + 1,
+            'combos': len(combos[i]),
+            'equity': float(mean * 100),
+            'win_probability': float(won[i] / num_samples * 100),
+            'tie_probability': float(tied[i] / num_samples * 100),
+            'std_error': float(math.sqrt(variance / num_samples) * 100),
+            'simulations': num_samples,
+            'method': "Monte Carlo",
+        })
+    return results
+
+def print_results(results, range_texts):
+    print("=" * 80)
+    print(f"RANGE EQUITY ({results[0]['method']}, {results[0]['simulations']:,} "
+          f"{'runouts per pair' if results[0]['method'] == 'Exact' else 'deals'})")
+    print("=" * 80)
+    for result, text in zip(results, range_texts):
+        error = f" ± {result['std_error']:.2f}" if result['std_error'] else ""
+        print(f"Range {result['player']}: {result['equity']:6.2f}%{error}  "
+              f"(win {result['win_probability']:.2f}%, tie {result['tie_probability']:.2f}%, "
+              f"{result['combos']} combos)  {text}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Equity between weighted hand ranges")
+    parser.add_argument("ranges", nargs="+", help='range strings, e.g. "QQ+, AKs" "AhKd"')
+    parser.add_argument("--board", default="", help='known board cards, e.g. "AH 7D 2C"')
+    parser.add_argument("--samples", type=int, default=None, help="sample this many deals instead of enumerating")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        board_ids = cards_to_ids([parse_card(c) for c in args.board.split()])
+        ranges = [parse_range(text) for text in args.ranges]
+        results = range_equity(board_ids, ranges, args.samples, False if args.samples else None, args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print_results(results, args.ranges)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
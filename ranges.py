@@ -0,0 +1,99 @@
+# ranges.py - Hand range notation
+#
+#   parse_range("QQ+, AKs, KTo-K8o, 22-55:0.5, AhKd")
+#
+# Comma separated terms, each optionally weighted with ":weight" (default 1):
+#   QQ        a pocket pair (all 6 combos)          QQ+   QQ, KK, AA
+#   AKs AKo   suited / offsuit (4 / 12 combos)      AK    both (16 combos)
+#   ATs+      ATs, AJs, AQs, AKs (kicker up to one below the high card)
+#   22-55     pairs 22 through 55                   KTo-K8o   K8o, K9o, KTo
+#   AhKd      one specific combo (suits h, d, c, s; ten as T or 10)
+# A combo named twice keeps the weight of the last term, so "AA, AhAd:0.5"
+# is every AA combo with AhAd at half weight.
+
+from card import SUITS
+
+RANK_CHARS = "23456789TJQKA"
+
+def parse_range(text):
+    """
+    Combos of a range string, returns {(card id, card id): weight}
+
+    Card ids as card.card_id, the higher card first; combos in the order the
+    terms name them.
+    """
+    combos = {}
+    for term in text.split(","):
+        term = term.strip()
+        if not term:
+            continue
+        weight = 1.0
+        if ":" in term:
+            term, weight_text = term.split(":", 1)
+            try:
+                weight = float(weight_text)
+            except ValueError:
+                raise ValueError(f"Invalid weight '{weight_text}' in range term '{term}'.")
+            if not weight > 0:
+                raise ValueError(f"Weight of range term '{term}' must be positive.")
+        for combo in _term_combos(term.strip().upper().replace("10", "T")):
+            combos.pop(combo, None)
+            combos[combo] = weight
+    if not combos:
+        raise ValueError("Range is empty.")
+    return combos
+
+def _rank(char, term):
+    if char not in RANK_CHARS:
+        raise ValueError(f"Invalid rank '{char}' in range term '{term}'.")
+    return RANK_CHARS.index(char)
+
+def _term_combos(term):
+    """Combos of one unweighted term (upper case, ten as T)"""
+    if len(term) == 4 and term[1] in SUITS and term[3] in SUITS:
+        first = _rank(term[0], term) * 4 + SUITS.index(term[1])
+        second = _rank(term[2], term) * 4 + SUITS.index(term[3])
+        if first == second:
+            raise ValueError(f"Range term '{term}' uses the same card twice.")
+        return [(max(first, second), min(first, second))]
+    if "-" in term:
+        low_term, high_term = sorted(term.split("-", 1), key=lambda t: [_rank(c, term) for c in t[:2]])
+        low, high = _hand_class(low_term, term), _hand_class(high_term, term)
+        if low[0] == low[1] and high[0] == high[1]:
+            classes = [(r, r, None) for r in range(low[0], high[0] + 1)]
+        elif low[0] == high[0] and low[2] == high[2] and low[0] != low[1]:
+            classes = [(low[0], k, low[2]) for k in range(low[1], high[1] + 1)]
+        else:
+            raise ValueError(f"Range term '{term}' must span pairs or one high card with the same suitedness.")
+    else:
+        plus = term.endswith("+")
+        high, kicker, suited = _hand_class(term[:-1] if plus else term, term)
+        if not plus:
+            classes = [(high, kicker, suited)]
+        elif high == kicker:
+            classes = [(r, r, None) for r in range(high, 13)]
+        else:
+            classes = [(high, k, suited) for k in range(kicker, high)]
+    return [combo for hand_class in classes for combo in _class_combos(*hand_class)]
+
+def _hand_class(text, term):
+    """(high rank index, low rank index, True/False/None for suited/offsuit/either)"""
+    if len(text) not in (2, 3) or (len(text) == 3 and text[2] not in "SO"):
+        raise ValueError(f"Invalid range term '{term}'.")
+    high, low = sorted((_rank(text[0], term), _rank(text[1], term)), reverse=True)
+    suited = {"S": True, "O": False}.get(text[2]) if len(text) == 3 else None
+    if high == low and suited is not None:
+        raise ValueError(f"Pocket pair '{text}' cannot be suited or offsuit.")
+    return high, low, suited
+
+def _class_combos(high, low, suited):
+    """Card id combos of a hand class, higher card first"""
+    combos = []
+    for s1 in range(4):
+        for s2 in range(4):
+            if high == low and s2 <= s1:
+                continue
+            if suited is not None and (s1 == s2) != suited:
+                continue
+            combos.append((max(high * 4 + s1, low * 4 + s2), min(high * 4 + s1, low * 4 + s2)))
+    return combos
@@ -0,0 +1,203 @@
+# replay.py - Backtest prediction engines against a hand-history log
+#
+#   python replay.py hands.phh                                   # exhaustive on the turn
+#   python replay.py hands.phh --stage flop --engine monte_carlo --simulations 2000 --workers 4
+#   python replay.py hands.phh --engine logged                   # score the predictions made live
+#   python replay.py --synthesize 100000 hands.phh               # random hands for testing
+#
+# Every complete hand (all pockets known, full board) is replayed: the engine
+# predicts from the flop or turn board, and the prediction is scored against
+# the river result (the pot share each seat actually won, so ties count
+# fractionally). Reported metrics:
+#   Brier score  - sum over seats of (predicted - actual share)^2, 0 is perfect
+#   Log loss     - -sum(actual share * ln(predicted)), predictions clipped at 0.1%
+#   Calibration  - predicted vs. actual win rate per 10% probability bucket
+#   Throughput   - hands replayed per second
+
+import argparse
+import math
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from card import card_from_id
+from evaluator import rank_ids
+from hand_history import MAX_SEATS, NO_CARD, HandHistory, HandHistoryWriter, unpack_record
+from predictor import predict_hands
+from scenario import run_prediction
+
+ENGINES = ("exhaustive", "monte_carlo", "logged")
+STAGE_BOARD_SIZES = {'flop': 3, 'turn': 4}
+CALIBRATION_BUCKETS = 10
+MIN_PROBABILITY = 0.001
+CHUNK_SIZE = 64
+
+def river_shares(pockets, board):
+    """Pot share each seat won at showdown (1 for a sole winner, 1/k for a k-way tie), from card ids"""
+    ranks = [rank_ids(list(pocket) + list(board)) for pocket in pockets]
+    best = max(ranks)
+    winners = ranks.count(best)
+    return [1 / winners if rank == best else 0.0 for rank in ranks]
+
+class ReplayScore:
+    """Running totals for a replay; partial scores from workers are merged with add()"""
+
+    def __init__(self):
+        self.hands = 0
+        self.skipped = 0
+        self.brier_sum = 0.0
+        self.log_loss_sum = 0.0
+        self.bucket_predicted = [0.0] * CALIBRATION_BUCKETS
+        self.bucket_actual = [0.0] * CALIBRATION_BUCKETS
+        self.bucket_count = [0] * CALIBRATION_BUCKETS
+
+    def score(self, probabilities, shares):
+        """Score one hand: probabilities and shares per seat, as fractions"""
+        self.hands += 1
+        self.brier_sum += sum((p - s) ** 2 for p, s in zip(probabilities, shares))
+        self.log_loss_sum -= sum(s * math.log(max(p, MIN_PROBABILITY)) for p, s in zip(probabilities, shares) if s)
+        for p, s in zip(probabilities, shares):
+            bucket = min(int(p * CALIBRATION_BUCKETS), CALIBRATION_BUCKETS - 1)
+            self.bucket_predicted[bucket] += p
+            self.bucket_actual[bucket] += s
+            self.bucket_count[bucket] += 1
+
+    def add(self, other):
+        self.hands += other.hands
+        self.skipped += other.skipped
+        self.brier_sum += other.brier_sum
+        self.log_loss_sum += other.log_loss_sum
+        for i in range(CALIBRATION_BUCKETS):
+            self.bucket_predicted[i] += other.bucket_predicted[i]
+            self.bucket_actual[i] += other.bucket_actual[i]
+            self.bucket_count[i] += other.bucket_count[i]
+
+    @property
+    def brier(self):
+        return self.brier_sum / self.hands if self.hands else None
+
+    @property
+    def log_loss(self):
+        return self.log_loss_sum / self.hands if self.hands else None
+
+    def calibration(self):
+        """[(bucket low %, mean predicted %, actual win %, seats)] for non-empty buckets"""
+        return [(i * 100 // CALIBRATION_BUCKETS,
+                 self.bucket_predicted[i] / n * 100,
+                 self.bucket_actual[i] / n * 100,
+                 n)
+                for i, n in enumerate(self.bucket_count) if n]
+
+def predict_record(record, engine, stage, num_simulations=None):
+    """Win probabilities (fractions, seat order) for one hand, or None if it cannot be replayed"""
+    if NO_CARD in (c for pocket in record.pockets for c in pocket) or len(record.board) != 5:
+        return None
+
+    if engine == "logged":
+        equities = record.flop_equities if stage == "flop" else record.turn_equities
+        return [e / 100 for e in equities] if equities else None
+
+    pockets = [[card_from_id(c) for c in pocket] for pocket in record.pockets]
+    community = [card_from_id(c) for c in record.board[:STAGE_BOARD_SIZES[stage]]]
+    if engine == "exhaustive":
+        # Only win probabilities are scored: skips hand-type counts and prunes decided spots
+        results = predict_hands(community, pockets)
+    else:
+        results, _ = run_prediction(community, pockets, engine, num_simulations)
+    by_seat = sorted(results, key=lambda r: r['player'])
+    return [r['win_probability'] / 100 for r in by_seat]
+
+def score_fields(fields_list, engine, stage, num_simulations=None):
+    """Replay a list of raw record tuples, returns a ReplayScore"""
+    score = ReplayScore()
+    for fields in fields_list:
+        record = unpack_record(fields)
+        probabilities = predict_record(record, engine, stage, num_simulations)
+        if probabilities is None:
+            score.skipped += 1
+            continue
+        score.score(probabilities, river_shares(record.pockets, record.board))
+    return score
+
+def _score_chunk(args):
+    return score_fields(*args)
+
+def _chunks(history, engine, stage, num_simulations, limit):
+    batch = []
+    for fields in history.iter_fields(0, limit):
+        batch.append(fields)
+        if len(batch) == CHUNK_SIZE:
+            yield batch, engine, stage, num_simulations
+            batch = []
+    if batch:
+        yield batch, engine, stage, num_simulations
+
+def replay(path, engine="exhaustive", stage="turn", workers=1, limit=None, num_simulations=None):
+    """Replay a hand-history file through an engine, returns (ReplayScore, elapsed seconds)"""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Use one of: {', '.join(ENGINES)}.")
+    if stage not in STAGE_BOARD_SIZES:
+        raise ValueError("Stage must be 'flop' or 'turn'.")
+
+    total = ReplayScore()
+    start = time.perf_counter()
+    with HandHistory(path) as history:
+        chunks = _chunks(history, engine, stage, num_simulations, limit)
+        if workers > 1 and engine != "logged":
+            with Pool(workers) as pool:
+                for partial in pool.imap_unordered(_score_chunk, chunks):
+                    total.add(partial)
+        else:
+            for chunk in chunks:
+                total.add(_score_chunk(chunk))
+    return total, time.perf_counter() - start
+
+def synthesize_history(path, hands, num_players=6, seed=None):
+    """Append randomly dealt complete hands (no logged predictions) to a hand-history file"""
+    rng = random.Random(seed)
+    deck = list(range(52))
+    with HandHistoryWriter(path) as writer:
+        for _ in range(hands):
+            cards = rng.sample(deck, num_players * 2 + 5)
+            pockets = [cards[2 * i:2 * i + 2] for i in range(num_players)]
+            writer.append(pockets, cards[num_players * 2:])
+
+def print_report(score, elapsed, engine, stage):
+    print("=" * 60)
+    print(f"REPLAY: {engine} on the {stage}")
+    print("=" * 60)
+    print(f"Hands replayed: {score.hands:,}  (skipped {score.skipped:,} incomplete)")
+    if not score.hands:
+        return
+    print(f"Throughput:     {score.hands / elapsed:,.1f} hands/s ({elapsed:.2f}s)")
+    print(f"Brier score:    {score.brier:.4f}")
+    print(f"Log loss:       {score.log_loss:.4f}")
+    print("\nCalibration (predicted vs. actual win rate per seat):")
+    print(f"  {'Bucket':<10} {'Predicted':>10} {'Actual':>10} {'Seats':>10}")
+    for low, predicted, actual, count in score.calibration():
+        print(f"  {low:>3}-{low + 100 // CALIBRATION_BUCKETS:<3}%   {predicted:>9.1f}% {actual:>9.1f}% {count:>10,}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest engines on a hand-history log")
+    parser.add_argument("path", help="hand-history file")
+    parser.add_argument("--engine", choices=ENGINES, default="exhaustive")
+    parser.add_argument("--stage", choices=sorted(STAGE_BOARD_SIZES), default="turn")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N hands")
+    parser.add_argument("--simulations", type=int, default=None, help="Monte Carlo simulations per hand")
+    parser.add_argument("--synthesize", type=int, metavar="N", help="append N random hands to the file and exit")
+    parser.add_argument("--players", type=int, default=6, help=f"players per synthesized hand (2-{MAX_SEATS})")
+    args = parser.parse_args(argv)
+
+    if args.synthesize:
+        synthesize_history(args.path, args.synthesize, args.players)
+        print(f"Appended {args.synthesize:,} hands to {args.path}")
+        return 0
+
+    score, elapsed = replay(args.path, args.engine, args.stage, args.workers, args.limit, args.simulations)
+    print_report(score, elapsed, args.engine, args.stage)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# results.py - Compact per-player prediction results
+#
+# The engines return one PlayerResult per player: a slotted object holding a
+# few numbers, references to the player's pocket and the board, and the
+# hand-category counts as a tuple indexed by category id (evaluator.HAND_NAMES).
+# Everything derived - the current hand, the most likely hand, the top-3
+# breakdown and the {name: count} hand types - is only computed when read.
+#
+# Code written for the old dict results keeps working: result['win_probability'],
+# result.get('method'), `in` and dict(result) read the legacy keys, and
+# to_dicts() converts a whole result list. For output:
+#   to_json()                       the player's object in scenario JSON output
+#   pack_results / unpack_results   fixed-size little-endian binary records
+#
+# Binary layout: a header, then one record per player (77 bytes). Card ids
+# as card.card_id, 255 for none:
+#   header   num_players u8, method u8 (METHOD_LABELS), board 5 x u8
+#   record   player u8, pocket 2 x u8, win_probability f64, simulations u64,
+#            std_error f64 (NaN = none), counts 10 x u32 by category id,
+#            category ids in first-seen order 10 x u8 (255 padded)
+
+import math
+import struct
+from operator import attrgetter
+
+from card import card_from_id, card_id
+from evaluator import HAND_NAMES, get_hand_name
+
+LEGACY_KEYS = ('player', 'pocket', 'win_probability', 'simulations', 'current_hand', 'most_likely_hand',
+               'most_likely_percentage', 'hand_breakdown', 'all_hand_types')
+OPTIONAL_KEYS = ('method', 'std_error')  # only present when set
+METHOD_LABELS = (None, "Exhaustive", "Monte Carlo")
+NO_CARD = 255
+
+HEADER = struct.Struct("<BB5s")
+RECORD = struct.Struct(f"<B2sdQd{len(HAND_NAMES)}I{len(HAND_NAMES)}s")
+
+_COMPUTE = object()  # current_hand default: work it out on first read
+
+class PlayerResult:
+    """One player's prediction; read attributes, or legacy dict keys"""
+
+    __slots__ = ('player', 'pocket', 'board', 'win_probability', 'simulations', 'categories',
+                 'category_order', 'method', 'std_error', '_current_hand')
+
+    def __init__(self, player, pocket, board, win_probability, simulations, categories, category_order,
+                 method=None, std_error=None, current_hand=_COMPUTE):
+        self.player = player
+        self.pocket = pocket
+        self.board = board
+        self.win_probability = win_probability
+        self.simulations = simulations
+        self.categories = tuple(categories)
+        self.category_order = tuple(category_order)
+        self.method = method
+        self.std_error = std_error
+        if current_hand is not _COMPUTE:
+            self._current_hand = current_hand
+
+    @property
+    def current_hand(self):
+        """Best hand held right now (predictor.current_hand_rank), None before the flop"""
+        try:
+            return self._current_hand
+        except AttributeError:  # an unset slot: not computed yet
+            from predictor import current_hand_rank
+            self._current_hand = current_hand_rank(self.board, self.pocket)
+            return self._current_hand
+
+    @property
+    def all_hand_types(self):
+        """{hand name: runouts} in first-seen order"""
+        return {HAND_NAMES[c]: self.categories[c] for c in self.category_order}
+
+    def _top_categories(self, n):
+        # sorted() is stable, so equal counts keep their first-seen order
+        return sorted(self.category_order, key=self.categories.__getitem__, reverse=True)[:n]
+
+    @property
+    def most_likely_hand(self):
+        top = self._top_categories(1)
+        return HAND_NAMES[top[0]] if top else None
+
+    @property
+    def most_likely_percentage(self):
+        top = self._top_categories(1)
+        return self.categories[top[0]] / self.simulations * 100 if top else 0
+
+    @property
+    def hand_breakdown(self):
+        """Top 3 hand names with their percentage of runouts"""
+        return {HAND_NAMES[c]: self.categories[c] / self.simulations * 100 for c in self._top_categories(3)}
+
+    # --- legacy dict interface ---
+
+    def keys(self):
+        return list(LEGACY_KEYS) + [key for key in OPTIONAL_KEYS if getattr(self, key) is not None]
+
+    def __getitem__(self, key):
+        if key in LEGACY_KEYS or (key in OPTIONAL_KEYS and getattr(self, key) is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in LEGACY_KEYS or (key in OPTIONAL_KEYS and getattr(self, key) is not None)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def to_dict(self):
+        """The legacy result dict"""
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, (PlayerResult, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        pocket = " ".join(str(c) for c in self.pocket)
+        return f"PlayerResult(player={self.player}, pocket={pocket}, win_probability={self.win_probability:.2f})"
+
+    # --- output ---
+
+    def to_json(self):
+        """The player's object in scenario JSON output"""
+        current_hand = self.current_hand
+        data = {
+            'player': self.player,
+            'pocket': [str(c) for c in self.pocket],
+            'win_probability': self.win_probability,
+            'current_hand': get_hand_name(current_hand) if current_hand else None,
+            'most_likely_hand': self.most_likely_hand,
+            'hand_types': self.all_hand_types,
+        }
+        if self.std_error is not None:
+            data['std_error'] = self.std_error
+        return data
+
+def to_dicts(results):
+    """Legacy result dicts of a result list"""
+    return [result.to_dict() for result in results]
+
+def sort_by_win_probability(results):
+    return sorted(results, key=attrgetter('win_probability'), reverse=True)
+
+def _padded_ids(values, size):
+    return bytes(list(values) + [NO_CARD] * (size - len(values)))
+
+def pack_results(results):
+    """Encode one result list (one board, one method) as bytes"""
+    board = results[0].board if results else []
+    data = [HEADER.pack(len(results), METHOD_LABELS.index(results[0].method if results else None),
+                        _padded_ids([card_id(c) for c in board], 5))]
+    for r in results:
+        data.append(RECORD.pack(
+            r.player, bytes(card_id(c) for c in r.pocket), r.win_probability, r.simulations,
+            math.nan if r.std_error is None else r.std_error, *r.categories,
+            _padded_ids(r.category_order, len(HAND_NAMES))))
+    return b"".join(data)
+
+def unpack_results(data):
+    """Result list back from pack_results bytes"""
+    num_players, method, board = HEADER.unpack_from(data)
+    board = [card_from_id(c) for c in board if c != NO_CARD]
+    results = []
+    for offset in range(HEADER.size, HEADER.size + num_players * RECORD.size, RECORD.size):
+        fields = RECORD.unpack_from(data, offset)
+        player, pocket, win_probability, simulations, std_error = fields[:5]
+        categories, order = fields[5:-1], fields[-1]
+        results.append(PlayerResult(
+            player, [card_from_id(c) for c in pocket], board, win_probability, simulations, categories,
+            [c for c in order if c != NO_CARD], METHOD_LABELS[method],
+            None if math.isnan(std_error) else std_error))
+    return results
@@ -0,0 +1,139 @@
+# scaling_benchmark.py - Engine cost as the number of players grows (2 to MAX_PLAYERS)
+#
+#   python scaling_benchmark.py                     # every engine, 2-10 players on the flop
+#   python scaling_benchmark.py --engines monte_carlo --repeats 9
+#
+# One reproducible deal per run: the flop and the pockets come off the same
+# shuffled deck, and each larger table adds players to the smaller one, so
+# only the player count changes. For every engine and player count the
+# benchmark reports the median latency, boards evaluated, evaluations per
+# board (one 7-card rank per player) and the cost per board and per
+# evaluation. Cost per evaluation must stay flat as players are added - a
+# run fails when it grows by more than LINEAR_TOLERANCE from heads-up to the
+# largest table (a per-player loop that is quadratic would grow ~5x).
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from card import MAX_PLAYERS, create_deck
+from monte_carlo import predict_hands_monte_carlo
+from predictor import predict_hands_vectorized, predict_hands_with_current
+
+DEFAULT_REPEATS = 5
+MC_SIMULATIONS = 5000
+# Allowed growth of the cost per evaluation from 2 to MAX_PLAYERS players
+LINEAR_TOLERANCE = 1.5
+
+def run_exhaustive(community, pockets):
+    # Every runout: runout classes depend on the pockets, which would blur the per-player cost
+    return predict_hands_with_current(community, pockets, compress=False)
+
+def run_monte_carlo(community, pockets):
+    return predict_hands_monte_carlo(community, pockets, MC_SIMULATIONS)
+
+def run_vectorized(community, pockets):
+    return predict_hands_vectorized(community, pockets)
+
+ENGINES = {
+    "exhaustive": run_exhaustive,
+    "monte_carlo": run_monte_carlo,
+}
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    pass  # numpy not installed
+else:
+    ENGINES["vectorized"] = run_vectorized
+
+def deal_table(num_players, seed=0):
+    """(flop, pockets) for num_players; larger tables extend smaller ones with the same seed"""
+    deck = create_deck()
+    random.Random(seed).shuffle(deck)
+    pockets = [deck[3 + 2 * i:5 + 2 * i] for i in range(num_players)]
+    return deck[:3], pockets
+
+def measure(engine, num_players, repeats):
+    """Result dict for one engine at one table size"""
+    run = ENGINES[engine]
+    community, pockets = deal_table(num_players)
+    latencies = []
+    results = None
+    for repeat in range(repeats):
+        random.seed(repeat)
+        start = time.perf_counter()
+        results = run(community, pockets)
+        latencies.append(time.perf_counter() - start)
+    latency = statistics.median(latencies)
+    boards = results[0]['simulations']
+    return {
+        'engine': engine,
+        'players': num_players,
+        'boards': boards,
+        'evaluations_per_board': num_players,
+        'latency': latency,
+        'us_per_board': latency / boards * 1e6,
+        'us_per_evaluation': latency / (boards * num_players) * 1e6,
+    }
+
+def run_benchmark(engines, player_counts, repeats=DEFAULT_REPEATS):
+    for engine in engines:
+        ENGINES[engine](*deal_table(2))  # load tables and caches before timing
+    return [measure(engine, n, repeats) for engine in engines for n in player_counts]
+
+def check(results):
+    """List of failure messages: engines whose cost per evaluation grows with the player count"""
+    failures = []
+    by_engine = {}
+    for r in results:
+        by_engine.setdefault(r['engine'], []).append(r)
+    for engine, rows in by_engine.items():
+        smallest = min(rows, key=lambda r: r['players'])
+        largest = max(rows, key=lambda r: r['players'])
+        growth = largest['us_per_evaluation'] / smallest['us_per_evaluation']
+        if growth > LINEAR_TOLERANCE:
+            failures.append(f"{engine}: cost per evaluation grows {growth:.2f}x from {smallest['players']} "
+                            f"to {largest['players']} players (allowed {LINEAR_TOLERANCE}x)")
+    return failures
+
+def print_report(results):
+    print("=" * 84)
+    print("COST PER PLAYER (flop)")
+    print("=" * 84)
+    print(f"{'Engine':<12} {'Players':>7} {'Boards':>8} {'Evals/board':>12} {'Median':>11} "
+          f"{'us/board':>10} {'us/eval':>9}")
+    print("-" * 84)
+    for r in results:
+        print(f"{r['engine']:<12} {r['players']:>7} {r['boards']:>8,} {r['evaluations_per_board']:>12} "
+              f"{r['latency'] * 1000:>8.2f} ms {r['us_per_board']:>10.2f} {r['us_per_evaluation']:>9.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that engine cost grows linearly with the player count")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma separated engine names")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--min-players", type=int, default=2)
+    parser.add_argument("--max-players", type=int, default=MAX_PLAYERS)
+    args = parser.parse_args(argv)
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = [e for e in engines if e not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)} (choose from {', '.join(ENGINES)})")
+    if not 2 <= args.min_players <= args.max_players <= MAX_PLAYERS:
+        parser.error(f"player counts must satisfy 2 <= min <= max <= {MAX_PLAYERS}")
+
+    results = run_benchmark(engines, range(args.min_players, args.max_players + 1), args.repeats)
+    print_report(results)
+    failures = check(results)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print(f"\n✓ Cost per evaluation stays within {LINEAR_TOLERANCE}x from "
+              f"{args.min_players} to {args.max_players} players")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# scenario.py - JSON scenario parsing and result serialization
+#
+# A scenario is one game state as a JSON object:
+#   {"id": "game-1",
+#    "pockets": [["AS", "KC"], ["10H", "JD"], null, ...],  (or "AS KC" strings, null = hidden seat)
+#    "board": ["AH", "KH", "QH"],                      (or "AH KH QH", may be empty)
+#    "method": "auto",                                 (optional override)
+#    "num_simulations": 25000}                         (optional, Monte Carlo only)
+
+import contextlib
+import io
+import json
+
+from card import MAX_PLAYERS, parse_card
+
+METHODS = ("exhaustive", "monte_carlo", "auto", "vectorized")
+STAGE_NAMES = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}
+
+def parse_cards(value):
+    """Accept either a list of card strings or one space separated string"""
+    if isinstance(value, str):
+        value = value.split()
+    return [parse_card(c) for c in value]
+
+def parse_scenario(data):
+    """Validate a scenario dict, returns (community_cards, pocket_hands)"""
+    if not isinstance(data, dict):
+        raise ValueError("Scenario must be a JSON object.")
+
+    pockets = [None if p is None else parse_cards(p) for p in data.get('pockets', [])]
+    community = parse_cards(data.get('board', []))
+
+    if not 2 <= len(pockets) <= MAX_PLAYERS:
+        raise ValueError(f"Scenario needs 2 to {MAX_PLAYERS} pocket hands.")
+    if pockets.count(None) == len(pockets):
+        raise ValueError("At least one player's pocket cards must be known.")
+    for i, pocket in enumerate(pockets):
+        if pocket is not None and len(pocket) != 2:
+            raise ValueError(f"Player {i+1} must have exactly 2 pocket cards.")
+    if len(community) not in STAGE_NAMES:
+        raise ValueError("Board must have 0, 3, 4 or 5 cards.")
+
+    all_cards = community + [c for pocket in pockets if pocket is not None for c in pocket]
+    if len(set(all_cards)) != len(all_cards):
+        raise ValueError("The same card appears more than once.")
+
+    return community, pockets
+
+def run_prediction(community, pockets, method, num_simulations=None):
+    """Run one engine quietly, returns (results or None if skipped, method label)"""
+    from monte_carlo import predict_hands_monte_carlo, auto_choose_method
+    from predictor import predict_hands_hidden, predict_hands_vectorized, predict_hands_with_current
+
+    # Engines print progress notes - keep them out of machine-readable output
+    with contextlib.redirect_stdout(io.StringIO()):
+        if None in pockets:
+            # Hidden seats: exact when small enough, otherwise sampled with the board
+            results = predict_hands_hidden(community, pockets, num_simulations or 25000,
+                                           exact=False if method == "monte_carlo" else None)
+            return results, results[0]['method']
+        if method == "monte_carlo":
+            if num_simulations:
+                return predict_hands_monte_carlo(community, pockets, num_simulations), "Monte Carlo"
+            return predict_hands_monte_carlo(community, pockets), "Monte Carlo"
+        if method == "auto":
+            return auto_choose_method(community, pockets, "balanced")
+        if method == "vectorized":
+            return predict_hands_vectorized(community, pockets), "Exhaustive"
+        return predict_hands_with_current(community, pockets), "Exhaustive"
+
+def results_to_json(results, community, method_label):
+    """Convert engine results (results.PlayerResult) into a JSON-friendly dict with players in seat order"""
+    if results is None:
+        return {'stage': STAGE_NAMES[len(community)], 'method': method_label, 'skipped': True}
+
+    return {
+        'stage': STAGE_NAMES[len(community)],
+        'method': method_label,
+        'simulations': results[0].simulations,
+        'players': [result.to_json() for result in sorted(results, key=lambda r: r.player)],
+    }
+
+def predict_scenario(data, default_method="auto"):
+    """Parse, predict and serialize one scenario dict; errors become an 'error' field"""
+    scenario_id = data.get('id') if isinstance(data, dict) else None
+    try:
+        community, pockets = parse_scenario(data)
+        method = data.get('method', default_method)
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'. Use one of: {', '.join(METHODS)}.")
+        results, method_label = run_prediction(community, pockets, method, data.get('num_simulations'))
+        return {'id': scenario_id, **results_to_json(results, community, method_label)}
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        return {'id': scenario_id, 'error': str(e)}
+
+def predict_scenario_line(line, default_method="auto"):
+    """One JSON text in, one result dict out"""
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {'id': None, 'error': f"Invalid JSON: {e}"}
+    return predict_scenario(data, default_method)
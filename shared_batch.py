@@ -0,0 +1,140 @@
+# shared_batch.py - Fan exhaustive scenarios out to worker processes through shared memory
+#
+#   counts = count_shared(scenarios, workers=4)      # one equity.EquityCounts per scenario
+#   results = predict_shared(scenarios, workers=4)   # result lists, as predict_hands_with_current
+#
+# Sending scenarios to a process pool the usual way pickles Card lists into
+# every task and result objects back out of it. Here the parent packs every
+# scenario once into a multiprocessing.shared_memory block of card ids and
+# allocates a second block of int64 counters. Workers attach to both blocks
+# when they start, so a task is only a (start, stop) slice of scenario
+# indices: the worker reads its scenarios' card ids in place, counts every
+# runout, and writes the tallies straight into its rows of the counter block.
+# Nothing but two ints goes to a worker and None comes back.
+#
+# Scenario rows (uint8, SCENARIO_BYTES each), card ids as card.card_id:
+#   num_players, board size, board 5 x id (NO_CARD padded), 2 x id per seat
+# Counter rows (int64, COUNTER_SLOTS each):
+#   boards, then per seat: shares, wins, ties, runouts per category id,
+#   category ids + 1 in first-seen order (0 padded)
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from card import MAX_PLAYERS
+from equity import EquityCounts, cards_to_ids, count_exhaustive_pruned
+from evaluator import HAND_NAMES
+
+NO_CARD = 255
+SCENARIO_BYTES = 2 + 5 + 2 * MAX_PLAYERS
+SEAT_SLOTS = 3 + 2 * len(HAND_NAMES)
+COUNTER_SLOTS = 1 + MAX_PLAYERS * SEAT_SLOTS
+# Scenarios per task, per worker: small enough to balance load, large enough to amortise the task round trip
+TASKS_PER_WORKER = 8
+
+# Blocks this worker process is attached to (set by _attach)
+_scenario_block = None
+_counter_block = None
+
+def pack_scenarios(scenarios, buf):
+    """Write (community_cards, pocket_hands) scenarios into buf as scenario rows"""
+    for n, (community_cards, pocket_hands) in enumerate(scenarios):
+        if not 2 <= len(pocket_hands) <= MAX_PLAYERS or None in pocket_hands:
+            raise ValueError(f"Scenario {n + 1}: shared batches need 2 to {MAX_PLAYERS} known pockets.")
+        board = cards_to_ids(community_cards)
+        seats = [c for pocket in pocket_hands for c in cards_to_ids(pocket)]
+        row = [len(pocket_hands), len(board)] + board + [NO_CARD] * (5 - len(board)) + seats
+        start = n * SCENARIO_BYTES
+        buf[start:start + len(row)] = bytes(row)
+
+def count_rows(scenarios, counters, start, stop):
+    """Count scenario rows start..stop-1 of the scenarios buffer into the int64 counters view"""
+    for n in range(start, stop):
+        row = bytes(scenarios[n * SCENARIO_BYTES:(n + 1) * SCENARIO_BYTES])
+        num_players, board_size = row[0], row[1]
+        board = list(row[2:2 + board_size])
+        pockets = [list(row[7 + 2 * i:9 + 2 * i]) for i in range(num_players)]
+        used = set(board).union(*pockets)
+        counts = count_exhaustive_pruned(pockets, board, [c for c in range(52) if c not in used])
+        write_counts(counters, n, counts)
+
+def write_counts(counters, n, counts):
+    """Store one scenario's EquityCounts in counter row n"""
+    row = [0] * COUNTER_SLOTS
+    row[0] = counts.boards
+    for i in range(len(counts.shares)):
+        seat = 1 + i * SEAT_SLOTS
+        row[seat:seat + 3] = counts.shares[i], counts.wins[i], counts.ties[i]
+        row[seat + 3:seat + 3 + len(HAND_NAMES)] = counts.categories[i]
+        order = seat + 3 + len(HAND_NAMES)
+        row[order:order + len(counts.category_order[i])] = [c + 1 for c in counts.category_order[i]]
+    counters[n * COUNTER_SLOTS:(n + 1) * COUNTER_SLOTS] = array('q', row)
+
+def read_counts(counters, n, num_players):
+    """EquityCounts back from counter row n"""
+    row = counters[n * COUNTER_SLOTS:(n + 1) * COUNTER_SLOTS].tolist()
+    counts = EquityCounts(num_players)
+    counts.boards = row[0]
+    for i in range(num_players):
+        seat = 1 + i * SEAT_SLOTS
+        counts.shares[i], counts.wins[i], counts.ties[i] = row[seat:seat + 3]
+        order = seat + 3 + len(HAND_NAMES)
+        counts.categories[i] = row[seat + 3:order]
+        counts.category_order[i] = [c - 1 for c in row[order:order + len(HAND_NAMES)] if c]
+    return counts
+
+def _attach(scenario_name, counter_name):
+    """Pool initializer: attach this worker to the parent's blocks once"""
+    global _scenario_block, _counter_block
+    _scenario_block = shared_memory.SharedMemory(name=scenario_name)
+    _counter_block = shared_memory.SharedMemory(name=counter_name)
+
+def _count_slice(start, stop):
+    """Worker task: count scenarios start..stop-1 in place"""
+    count_rows(_scenario_block.buf, _counter_block.buf.cast('q'), start, stop)
+
+def _slices(num_scenarios, workers):
+    size = max(1, -(-num_scenarios // (workers * TASKS_PER_WORKER)))
+    return [(start, min(start + size, num_scenarios)) for start in range(0, num_scenarios, size)]
+
+def count_shared(scenarios, workers=None):
+    """
+    Exhaustive showdown tallies for each scenario, counted by a worker pool
+
+    Args:
+        scenarios: list of (community_cards, pocket_hands), every pocket known
+        workers: worker processes (default: all cores); 1 counts in this process
+
+    Returns:
+        One equity.EquityCounts per scenario, in order - the same counts as
+        predictor.exhaustive_counts
+    """
+    workers = workers or os.cpu_count() or 1
+    scenario_block = shared_memory.SharedMemory(create=True, size=max(1, len(scenarios) * SCENARIO_BYTES))
+    counter_block = shared_memory.SharedMemory(create=True, size=max(8, len(scenarios) * COUNTER_SLOTS * 8))
+    counters = counter_block.buf.cast('q')
+    try:
+        pack_scenarios(scenarios, scenario_block.buf)
+        if workers <= 1:
+            count_rows(scenario_block.buf, counters, 0, len(scenarios))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(scenario_block.name, counter_block.name)) as pool:
+                for future in [pool.submit(_count_slice, *s) for s in _slices(len(scenarios), workers)]:
+                    future.result()
+        return [read_counts(counters, n, len(pockets)) for n, (_, pockets) in enumerate(scenarios)]
+    finally:
+        counters.release()
+        scenario_block.close()
+        scenario_block.unlink()
+        counter_block.close()
+        counter_block.unlink()
+
+def predict_shared(scenarios, workers=None):
+    """Result lists (as predictor.predict_hands_with_current) for each scenario, via count_shared"""
+    from predictor import results_from_counts
+
+    return [results_from_counts(community, pockets, counts)
+            for (community, pockets), counts in zip(scenarios, count_shared(scenarios, workers))]
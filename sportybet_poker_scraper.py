@@ -1,136 +1,118 @@
 # sportybet_poker_scraper.py - Scraper for SportyBet Poker
 
-from playwright.sync_api import sync_playwright
+import json
 import subprocess
 import time
+from pathlib import Path
+
+from card import MAX_PLAYERS
+
+# One data-qa id per seat, consecutive from "button-screen-odd-446" (446-451 at a 6-seat table)
+FIRST_SEAT_ID = 446
+DEFAULT_SEATS = 6
+
+def seat_ids(num_seats=DEFAULT_SEATS):
+    """data-qa seat ids of a table with num_seats seats (2 to MAX_PLAYERS)"""
+    if not 2 <= num_seats <= MAX_PLAYERS:
+        raise ValueError(f"Tables have 2 to {MAX_PLAYERS} seats, got {num_seats}.")
+    return list(range(FIRST_SEAT_ID, FIRST_SEAT_ID + num_seats))
+
+# Reads the whole table inside the page (see sportybet_table.js)
+TABLE_STATE_JS = Path(__file__).with_name("sportybet_table.js").read_text()
+
+def known_pockets(game_data):
+    """Pockets for the engines: None for every seat whose cards are not visible"""
+    return [list(pocket) if pocket[0] and pocket[1] else None for pocket in game_data['pockets']]
+
+def game_data_from_state(state):
+    """Turn the in-page table state into the scraper's game_data dict"""
+    community = list(state['community'])
+    return {
+        'pockets': [list(pocket) for pocket in state['pockets']],
+        'flop': community[:3] if len(community) >= 3 else [],
+        'turn': community[3] if len(community) >= 4 else None,
+        'community_cards': community,
+    }
 
 class SportyBetPokerScraper:
-    def __init__(self):
+    def __init__(self, predictor_client=None, history=None, num_seats=DEFAULT_SEATS):
         self.process = None
-    
-    def identify_suit_from_svg(self, card_element):
-        """Identify suit from SVG path"""
-        svg = card_element.query_selector('svg')
-        if not svg:
-            return None
-        
-        path = svg.query_selector('path')
-        if not path:
-            return None
-        
-        path_d = path.get_attribute('d')
-        fill_rule = path.get_attribute('fill-rule') or ''
-        
-        # Spade: "M21.9595 11.8046" - appears in your HTML
-        if '21.9595 11.8046' in path_d:
-            return 'S'
-        
-        # Club: "M17.9999 9.94949" with 3-circle pattern
-        if '17.9999 9.94949' in path_d and '17.9999 6.27562' in path_d:
-            return 'C'
-        
-        # Heart: "fill-rule='evenodd'" with specific heart path
-        if fill_rule == 'evenodd' and '17.9952 1' in path_d:
-            return 'H'
-        
-        # Diamond: "fill-rule='evenodd'" with diamond path
-        if fill_rule == 'evenodd' and '8.36742 6.82911' in path_d:
-            return 'D'
-        
-        return None
-    
-    def extract_card(self, card_element):
-        """Extract card rank and suit from element"""
-        try:
-            # Get rank from span
-            rank_element = card_element.query_selector('span.p9p7USKXMQo2_eEm')
-            if not rank_element:
-                return None
-            
-            rank = rank_element.inner_text().strip().upper()
-            
-            # Convert rank if needed
-            rank_map = {
-                '1': 'A',
-                'A': 'A',
-                '11': 'J',
-                'J': 'J',
-                '12': 'Q',
-                'Q': 'Q',
-                '13': 'K',
-                'K': 'K'
-            }
-            rank = rank_map.get(rank, rank)
-            
-            # Get suit from SVG
-            suit = self.identify_suit_from_svg(card_element)
-            if not suit:
-                return None
-            
-            return f"{rank}{suit}"
-            
-        except Exception as e:
-            print(f"Error extracting card: {e}")
-            return None
+        self.seat_ids = seat_ids(num_seats)
+        # Optional prediction_client.PredictionClient - avoids spawning main.py per scraper
+        self.predictor_client = predictor_client
+        # Optional hand_history.HandHistoryWriter - finished hands are appended to it
+        self.history = history
+        self.last_result = None
     
     def scrape_game_state(self, page):
-        """Scrape all 6 players and community cards"""
-        game_data = {
-            'pockets': [],
-            'flop': [],
-            'turn': None,
-            'community_cards': []
-        }
-        
+        """Scrape every seat and the community cards in a single page.evaluate round trip"""
         try:
-            # Scrape 6 players' cards
-            # Each player is in a div with data-qa="button-screen-odd-446" through "button-screen-odd-451"
-            for i in range(446, 452):  # Player 1-6
-                player_cards = []
-                player_selector = f'[data-qa="button-screen-odd-{i}"]'
-                player_element = page.query_selector(player_selector)
-                
-                if player_element:
-                    # Get both cards for this player
-                    card_elements = player_element.query_selector_all('[data-qa^="area-card-"]')
-                    
-                    for card_elem in card_elements[:2]:  # Take first 2 cards
-                        card = self.extract_card(card_elem)
-                        if card:
-                            player_cards.append(card)
-                
-                # Add to pockets (empty if not found)
-                if len(player_cards) == 2:
-                    game_data['pockets'].append(player_cards)
-                else:
-                    game_data['pockets'].append(['', ''])
-            
-            # Scrape community cards from data-qa="area-table-cards"
-            table_cards_container = page.query_selector('[data-qa="area-table-cards"]')
-            
-            if table_cards_container:
-                community_card_elements = table_cards_container.query_selector_all('[data-qa^="area-card-"]')
-                
-                for card_elem in community_card_elements:
-                    card = self.extract_card(card_elem)
-                    if card:
-                        game_data['community_cards'].append(card)
-                
-                # Split into flop and turn
-                if len(game_data['community_cards']) >= 3:
-                    game_data['flop'] = game_data['community_cards'][:3]
-                if len(game_data['community_cards']) >= 4:
-                    game_data['turn'] = game_data['community_cards'][3]
-            
-            return game_data
-            
+            return game_data_from_state(self.read_table(page)['state'])
         except Exception as e:
             print(f"Error scraping game state: {e}")
-            return game_data
-    
+            return game_data_from_state({'pockets': [['', '']] * len(self.seat_ids), 'community': []})
+
+    def read_table(self, page, binding=None):
+        """Run the in-page reader; installs the change observer on first use"""
+        return page.evaluate(TABLE_STATE_JS, {'seatIds': self.seat_ids, 'binding': binding})
+
+    def watch_table(self, page):
+        """
+        Install the MutationObserver on this page (and on every page it navigates to)
+
+        Returns the current table {'version', 'changedAt', 'state'}.
+        """
+        args = json.dumps({'seatIds': self.seat_ids, 'binding': None})
+        page.add_init_script(script=f"({TABLE_STATE_JS})({args})")
+        return self.read_table(page)
+
+    def wait_for_change(self, page, version, timeout=60000):
+        """
+        Block until the observer has seen a newer table than `version`
+
+        The check is a counter comparison inside the page, so no DOM is scanned
+        and nothing crosses to Python until the cards actually change.
+        """
+        handle = page.wait_for_function(
+            "v => window.__pokerTable && window.__pokerTable.version > v && window.__pokerTable",
+            arg=version, polling="raf", timeout=timeout)
+        return handle.json_value()
+
+    def send_to_server(self, game_data):
+        """Send scraped data to the prediction server (one round trip, no sleeps)"""
+        from prediction_client import PredictionServerError
+
+        pockets = known_pockets(game_data)
+        if pockets.count(None) == len(pockets):
+            print(f"\n⚠️  Warning: No player has visible cards")
+            return False
+        if len(game_data['flop']) != 3 or not game_data['turn']:
+            print(f"\n⚠️  Need the flop and turn before predicting")
+            return False
+
+        try:
+            result = self.predictor_client.predict(pockets, game_data['community_cards'])
+        except PredictionServerError as e:
+            print(f"\n❌ Prediction server error: {e}")
+            return False
+        self.last_result = result
+
+        print("\n" + "="*70)
+        print(f"PREDICTOR OUTPUT ({result['stage'].upper()}, {result['method']})")
+        print("="*70)
+        for player in sorted(result['players'], key=lambda p: p['win_probability'], reverse=True):
+            pocket_str = ' '.join(player['pocket'])
+            print(f"Player {player['player']:<2} {pocket_str:<8} {player['current_hand'] or '':<18} "
+                  f"{player['win_probability']:6.2f}%")
+        return True
+
     def send_to_predictor(self, game_data):
         """Send scraped data to CLI predictor"""
-        if not self.process:
+        if self.predictor_client:
+            return self.send_to_server(game_data)
+
+        starting = not self.process
+        if starting:
             self.process = subprocess.Popen(
                 ['python', 'main.py'],
                 stdin=subprocess.PIPE,
@@ -144,22 +126,26 @@ class SportyBetPokerScraper:
             self.process.stdin.write(text + '\n')
             self.process.stdin.flush()
             time.sleep(0.3)
-        
+
+        if starting:
+            # Answer the game's menu: auto method, basic display, this table's seat count
+            for answer in ("3", "1", str(len(self.seat_ids))):
+                send_input(answer)
+
         # Send pocket cards
         print("\n=== Sending pocket cards to predictor ===")
-        valid_pockets = 0
-        for i, pocket in enumerate(game_data['pockets']):
-            if pocket[0] and pocket[1]:
+        pockets = known_pockets(game_data)
+        if pockets.count(None) == len(pockets):
+            print(f"\n⚠️  Warning: No player has visible cards")
+            return False
+        for i, pocket in enumerate(pockets):
+            if pocket:
                 pocket_str = f"{pocket[0]} {pocket[1]}"
                 send_input(pocket_str)
                 print(f"Player {i+1}: {pocket_str}")
-                valid_pockets += 1
             else:
-                print(f"Player {i+1}: Cards not visible - skipping")
-        
-        if valid_pockets < 6:
-            print(f"\n⚠️  Warning: Only {valid_pockets}/6 players have visible cards")
-            return False
+                send_input("?")
+                print(f"Player {i+1}: Cards not visible - dealt at random")
         
         time.sleep(1)
         
@@ -194,8 +180,35 @@ class SportyBetPokerScraper:
             print(f"\n⚠️  Turn card not visible yet")
             return False
     
-    def monitor_game(self, url):
-        """Monitor SportyBet poker game"""
+    def print_game_data(self, game_data):
+        print("\nScraped Data:")
+        print("-" * 70)
+        for i, pocket in enumerate(game_data['pockets']):
+            if pocket[0] and pocket[1]:
+                print(f"Player {i+1}: {pocket[0]} {pocket[1]}")
+            else:
+                print(f"Player {i+1}: Not visible")
+
+        print(f"\nCommunity Cards: {game_data['community_cards']}")
+        print(f"Flop: {game_data['flop']}")
+        print(f"Turn: {game_data['turn']}")
+        print("-" * 70)
+
+    def log_hand(self, game_data, started_at, turn_result=None, turn_at=0.0):
+        """Append a finished hand (full board) and the turn prediction made for it to the history"""
+        turn_equities = None
+        # Equities are stored per seat, so a prediction that left out hidden seats is not logged
+        if turn_result and len(turn_result['players']) == len(game_data['pockets']):
+            turn_equities = [p['win_probability'] for p in sorted(turn_result['players'], key=lambda p: p['player'])]
+        self.history.append(game_data['pockets'], game_data['community_cards'], timestamp=started_at,
+                            method=turn_result['method'] if turn_result else "",
+                            turn_equities=turn_equities, turn_at=turn_at)
+        print(f"\n📝 Hand logged to {self.history.path}")
+
+    def monitor_game(self, url, wait_for_login=True):
+        """Monitor SportyBet poker game, reacting as soon as the cards on the page change"""
+        from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=False)
             context = browser.new_context(
@@ -210,78 +223,104 @@ class SportyBetPokerScraper:
             print(f"\nNavigating to {url}...")
             page.goto(url)
             
-            print("\n*** LOGIN INSTRUCTIONS ***")
-            print("1. Please login to SportyBet")
-            print("2. Navigate to the poker game")
-            print("3. Make sure you can see the poker table")
-            print("4. Press Enter when ready...")
-            input()
+            if wait_for_login:
+                print("\n*** LOGIN INSTRUCTIONS ***")
+                print("1. Please login to SportyBet")
+                print("2. Navigate to the poker game")
+                print("3. Make sure you can see the poker table")
+                print("4. Press Enter when ready...")
+                input()
             
             print("\n✓ Starting game monitor...")
             print("Waiting for cards to be dealt...\n")
             
             game_count = 0
+            last_pockets = None
+            last_sent = None
+            table = self.watch_table(page)
             
             while True:
                 try:
-                    # Wait for player cards to appear
-                    page.wait_for_selector('[data-qa="button-screen-odd-446"]', timeout=60000)
-                    time.sleep(3)  # Let all cards load
-                    
-                    # Scrape game state
-                    game_data = self.scrape_game_state(page)
-                    
-                    game_count += 1
-                    print("\n" + "="*70)
-                    print(f"GAME #{game_count}")
-                    print("="*70)
-                    
-                    print("\nScraped Data:")
-                    print("-" * 70)
-                    for i, pocket in enumerate(game_data['pockets']):
-                        if pocket[0] and pocket[1]:
-                            print(f"Player {i+1}: {pocket[0]} {pocket[1]}")
-                        else:
-                            print(f"Player {i+1}: Not visible")
-                    
-                    print(f"\nCommunity Cards: {game_data['community_cards']}")
-                    print(f"Flop: {game_data['flop']}")
-                    print(f"Turn: {game_data['turn']}")
-                    print("-" * 70)
-                    
+                    game_data = game_data_from_state(table['state'])
+                    latency_ms = time.time() * 1000 - table['changedAt']
+
+                    # New pocket cards means a new game
+                    if game_data['pockets'] != last_pockets:
+                        last_pockets = game_data['pockets']
+                        game_count += 1
+                        game_started = time.time()
+                        turn_result, turn_at, logged = None, 0.0, False
+                        print("\n" + "="*70)
+                        print(f"GAME #{game_count}")
+                        print("="*70)
+
+                    self.print_game_data(game_data)
+                    if table['version']:
+                        print(f"Change detected in {latency_ms:.0f} ms")
+
                     # Check if we have complete data
-                    if len(game_data['flop']) == 3 and game_data['turn']:
+                    state_key = (str(game_data['pockets']), str(game_data['community_cards']))
+                    if len(game_data['flop']) == 3 and game_data['turn'] and state_key != last_sent:
                         valid_pockets = sum(1 for p in game_data['pockets'] if p[0] and p[1])
                         
-                        if valid_pockets == 6:
-                            print("\n✓ Complete game state detected!")
-                            success = self.send_to_predictor(game_data)
-                            
-                            if success:
-                                print("\n" + "="*70)
-                                print("Waiting 20 seconds for next game...")
-                                print("="*70)
-                                time.sleep(20)
+                        if valid_pockets:
+                            if valid_pockets == len(self.seat_ids):
+                                print("\n✓ Complete game state detected!")
+                            else:
+                                print(f"\n✓ {valid_pockets}/{len(self.seat_ids)} players visible - hidden seats dealt at random")
+                            if self.send_to_predictor(game_data):
+                                last_sent = state_key
+                                if self.last_result and len(game_data['community_cards']) == 4:
+                                    turn_result, turn_at = self.last_result, time.time() - game_started
                             else:
-                                print("\n⚠️  Failed to send to predictor, retrying...")
-                                time.sleep(5)
+                                print("\n⚠️  Failed to send to predictor, will retry on the next change...")
                         else:
-                            print(f"\n⚠️  Only {valid_pockets}/6 players visible, waiting...")
-                            time.sleep(3)
-                    else:
+                            print(f"\n⚠️  No players visible, waiting...")
+                    elif state_key != last_sent:
                         print("\n⏳ Waiting for more cards to be dealt...")
-                        time.sleep(3)
+
+                    if self.history and len(game_data['community_cards']) == 5 and not logged:
+                        self.log_hand(game_data, game_started, turn_result, turn_at)
+                        logged = True
+
+                    # Sleep inside the browser until the observer sees different cards
+                    while True:
+                        try:
+                            table = self.wait_for_change(page, table['version'])
+                            break
+                        except PlaywrightTimeoutError:
+                            continue
                     
                 except Exception as e:
                     print(f"\n❌ Error: {e}")
                     print("Retrying in 5 seconds...")
                     time.sleep(5)
+                    table = self.read_table(page)
 
 # Main execution
 if __name__ == "__main__":
-    scraper = SportyBetPokerScraper()
-    
-    # SportyBet poker URL
-    poker_url = "https://www.sportybet.com/gh/sportygames/live-games/Bet-On-Poker"
+    import sys
+    from prediction_client import PredictionClient
+
+    # Pass --server to use a running 'python main.py serve' instead of spawning main.py
+    client = PredictionClient() if "--server" in sys.argv else None
+
+    # Pass --seats N for a table with N seats (2-10, default 6)
+    num_seats = DEFAULT_SEATS
+    if "--seats" in sys.argv:
+        num_seats = int(sys.argv.pop(sys.argv.index("--seats") + 1))
+
+    # Pass --history FILE to append every finished hand to a hand-history log (see replay.py)
+    history = None
+    if "--history" in sys.argv:
+        from hand_history import HandHistoryWriter
+        history = HandHistoryWriter(sys.argv.pop(sys.argv.index("--history") + 1))
+    scraper = SportyBetPokerScraper(predictor_client=client, history=history, num_seats=num_seats)
     
-    scraper.monitor_game(poker_url)
+    # SportyBet poker URL, or a saved page: python sportybet_poker_scraper.py tests/fixtures/sportybet_flop.html
+    urls = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if urls:
+        target = urls[0] if "://" in urls[0] else Path(urls[0]).resolve().as_uri()
+        scraper.monitor_game(target, wait_for_login=False)
+    else:
+        scraper.monitor_game("https://www.sportybet.com/gh/sportygames/live-games/Bet-On-Poker")
@@ -0,0 +1,78 @@
+// sportybet_table.js - In-page table reader for sportybet_poker_scraper.py
+//
+// Evaluated with page.evaluate(source, {seatIds, binding}). It reads every
+// seat and the board in one pass and returns them as JSON. On its first run
+// it also installs a MutationObserver. The observer keeps window.__pokerTable
+// ({version, changedAt, state}) up to date whenever the visible cards change.
+// If a binding name is given, it also calls window[binding](table) so Python
+// is notified the moment cards change.
+({ seatIds, binding }) => {
+  const RANKS = { '1': 'A', '11': 'J', '12': 'Q', '13': 'K' };
+
+  // Same SVG signatures as the original per-element Python scraper
+  const suitOf = (card) => {
+    const path = card.querySelector('svg path');
+    if (!path) return null;
+    const d = path.getAttribute('d') || '';
+    const fillRule = path.getAttribute('fill-rule') || '';
+    if (d.includes('21.9595 11.8046')) return 'S';
+    if (d.includes('17.9999 9.94949') && d.includes('17.9999 6.27562')) return 'C';
+    if (fillRule === 'evenodd' && d.includes('17.9952 1')) return 'H';
+    if (fillRule === 'evenodd' && d.includes('8.36742 6.82911')) return 'D';
+    return null;
+  };
+
+  const readCard = (card) => {
+    const rankElement = card.querySelector('span.p9p7USKXMQo2_eEm');
+    const suit = suitOf(card);
+    if (!rankElement || !suit) return null;
+    const rank = rankElement.textContent.trim().toUpperCase();
+    return (RANKS[rank] || rank) + suit;
+  };
+
+  const readCards = (container) =>
+    container ? [...container.querySelectorAll('[data-qa^="area-card-"]')].map(readCard) : [];
+
+  const readTable = () => ({
+    pockets: seatIds.map((id) => {
+      const cards = readCards(document.querySelector(`[data-qa="button-screen-odd-${id}"]`)).slice(0, 2);
+      return cards.length === 2 && cards.every(Boolean) ? cards : ['', ''];
+    }),
+    community: readCards(document.querySelector('[data-qa="area-table-cards"]')).filter(Boolean),
+  });
+
+  if (!window.__pokerTable) {
+    const table = { version: 0, changedAt: Date.now(), state: readTable() };
+    let lastKey = JSON.stringify(table.state);
+    let scheduled = false;
+
+    // Coalesce all mutations of one task into a single re-read
+    const check = () => {
+      scheduled = false;
+      const state = readTable();
+      const key = JSON.stringify(state);
+      if (key === lastKey) return;
+      lastKey = key;
+      table.version += 1;
+      table.changedAt = Date.now();
+      table.state = state;
+      if (binding && window[binding]) window[binding](table);
+    };
+
+    new MutationObserver(() => {
+      if (!scheduled) {
+        scheduled = true;
+        queueMicrotask(check);
+      }
+    }).observe(document, {
+      childList: true,
+      subtree: true,
+      characterData: true,
+      attributes: true,
+      attributeFilter: ['d', 'fill-rule', 'data-qa'],
+    });
+    window.__pokerTable = table;
+  }
+
+  return window.__pokerTable;
+}
@@ -0,0 +1,117 @@
+# startup_benchmark.py - Cold-start import time budget for every entry point
+#
+#   python startup_benchmark.py               # check all entry points against their budgets
+#   python startup_benchmark.py --repeats 9   # more runs for a steadier median
+#
+# Each entry point is imported in a fresh interpreter under `python -X importtime`.
+# The benchmark reports the median cumulative import time of the entry module
+# (interpreter startup itself is not counted) and the slowest imports it pulls
+# in. A run fails when an entry point goes over its budget, or when it eagerly
+# imports a module that should only load on first use.
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Entry point -> (module, budget in ms, modules that must stay unloaded at import)
+ENTRY_POINTS = {
+    "cli": ("game", 40, ("monte_carlo", "numpy", "asyncio")),
+    "scenario": ("scenario", 40, ("monte_carlo", "predictor", "numpy")),
+    "batch": ("batch", 80, ("monte_carlo", "predictor", "concurrent.futures.process")),
+    "client": ("prediction_client", 100, ("asyncio", "predictor")),
+    "server": ("prediction_server", 200, ("monte_carlo", "predictor")),
+    "gui": ("poker_gui", 150, ("monte_carlo", "predictor")),
+}
+DEFAULT_REPEATS = 5
+TOP_IMPORTS = 3
+
+def import_profile(module):
+    """One cold import, returns ({module: (self us, cumulative us)}, error message or None)"""
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             capture_output=True, text=True)
+    timings = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    error = None
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "import failed"
+    return timings, error
+
+def measure(module, repeats):
+    """Median import time of module in ms, its slowest imports, loaded modules, or an error"""
+    totals = []
+    timings = {}
+    for _ in range(repeats):
+        timings, error = import_profile(module)
+        if error:
+            return None, [], set(), error
+        totals.append(timings[module][1] / 1000)
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:TOP_IMPORTS]
+    return statistics.median(totals), [(name, t[0] / 1000) for name, t in slowest], set(timings), None
+
+def run_benchmark(repeats=DEFAULT_REPEATS, entries=None):
+    """Measure entry points, returns list of result dicts"""
+    results = []
+    for entry, (module, budget_ms, lazy_modules) in ENTRY_POINTS.items():
+        if entries and entry not in entries:
+            continue
+        median_ms, slowest, loaded, error = measure(module, repeats)
+        results.append({
+            'entry': entry,
+            'module': module,
+            'budget_ms': budget_ms,
+            'median_ms': median_ms,
+            'slowest': slowest,
+            'eager': sorted(m for m in lazy_modules if m in loaded),
+            'error': error,
+        })
+    return results
+
+def check(results):
+    """List of failure messages (empty when everything is within budget)"""
+    failures = []
+    for r in results:
+        if r['error']:
+            continue  # e.g. tkinter missing - not a startup regression
+        if r['median_ms'] > r['budget_ms']:
+            failures.append(f"{r['entry']}: {r['median_ms']:.1f} ms is over the {r['budget_ms']} ms budget")
+        if r['eager']:
+            failures.append(f"{r['entry']}: imports {', '.join(r['eager'])} at startup (should load on first use)")
+    return failures
+
+def print_report(results):
+    print("=" * 90)
+    print("STARTUP IMPORT TIME")
+    print("=" * 90)
+    print(f"{'Entry':<10} {'Module':<20} {'Median':>9} {'Budget':>8}  Slowest imports (self time)")
+    print("-" * 90)
+    for r in results:
+        if r['error']:
+            print(f"{r['entry']:<10} {r['module']:<20} {'skipped':>9} {r['budget_ms']:>6} ms  {r['error']}")
+            continue
+        slowest = ", ".join(f"{name} {ms:.1f}" for name, ms in r['slowest'])
+        status = "✓" if r['median_ms'] <= r['budget_ms'] and not r['eager'] else "✗"
+        print(f"{r['entry']:<10} {r['module']:<20} {r['median_ms']:>6.1f} ms {r['budget_ms']:>5} ms  "
+              f"{status} {slowest}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cold-start import time against budgets")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--entry", action="append", choices=list(ENTRY_POINTS), help="only these entry points")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.repeats, args.entry)
+    print_report(results)
+    failures = check(results)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("\n✓ All entry points start within budget")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# table_monitor.py - Watch many SportyBet tables from one process
+#
+#   python table_monitor.py URL [URL ...]                 # live tables, log in first
+#   python table_monitor.py tests/fixtures/sportybet_flop.html tests/fixtures/sportybet_turn.html --headless
+#
+# Each table gets its own page in one async Playwright browser. The in-page
+# observer (sportybet_table.js) pushes every card change to Python through an
+# exposed binding. All tables share one pool of prediction worker processes.
+# The scheduler runs the most urgent state first: a turn needs an answer
+# sooner than a flop. It keeps only the newest state per table, so a state
+# that is replaced while still queued is dropped without being computed.
+# Press Ctrl+C for per-table latency metrics.
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from prediction_server import _warm_worker
+from scenario import predict_scenario
+from sportybet_poker_scraper import DEFAULT_SEATS, TABLE_STATE_JS, game_data_from_state, known_pockets, seat_ids
+
+BINDING_NAME = "pokerTableChanged"
+
+# Seconds from detection until a prediction is still useful, by board size
+STAGE_DEADLINES = {3: 10.0, 4: 2.0, 5: 2.0}
+
+class TableMetrics:
+    """Latency and drop counters for one table"""
+
+    def __init__(self):
+        self.changes = 0
+        self.predictions = 0
+        self.superseded = 0
+        self.missed_deadlines = 0
+        self.errors = 0         # predictions that raised
+        self.detect_ms = []     # DOM change -> state in Python
+        self.queue_ms = []      # state in Python -> prediction started
+        self.total_ms = []      # DOM change -> prediction ready
+
+    def summary(self):
+        def p50(values):
+            return round(statistics.median(values), 1) if values else None
+        return {
+            'changes': self.changes,
+            'predictions': self.predictions,
+            'superseded': self.superseded,
+            'missed_deadlines': self.missed_deadlines,
+            'errors': self.errors,
+            'detect_ms_p50': p50(self.detect_ms),
+            'queue_ms_p50': p50(self.queue_ms),
+            'total_ms_p50': p50(self.total_ms),
+            'total_ms_max': round(max(self.total_ms), 1) if self.total_ms else None,
+        }
+
+class PredictionJob:
+    __slots__ = ('table_id', 'version', 'scenario', 'changed_at', 'queued_at', 'deadline')
+
+    def __init__(self, table_id, version, scenario, changed_at):
+        self.table_id = table_id
+        self.version = version
+        self.scenario = scenario
+        self.changed_at = changed_at      # Wall clock seconds of the DOM change
+        self.queued_at = time.time()
+        board = scenario['board']
+        board_size = len(board.split() if isinstance(board, str) else board)
+        self.deadline = self.queued_at + STAGE_DEADLINES.get(board_size, STAGE_DEADLINES[3])
+
+class PredictionScheduler:
+    """
+    Earliest-deadline-first queue that only keeps the newest state of each table
+
+    predict is an async callable taking a scenario dict and returning a result dict.
+    on_result(job, result) is called for every prediction that is still current.
+    A predict that raises is logged and counted in the table's errors; the
+    worker carries on with the next job.
+    """
+
+    def __init__(self, predict, workers, on_result=None):
+        self.predict = predict
+        self.workers = workers
+        self.on_result = on_result
+        self.metrics = {}
+        self.heap = []                # (deadline, seq, job)
+        self.queued = {}              # table_id -> job waiting in the heap
+        self.latest_version = {}      # table_id -> newest version submitted
+        self.counter = itertools.count()
+        self.ready = asyncio.Event()
+        self.busy = 0
+        self.tasks = []
+
+    def table_metrics(self, table_id):
+        if table_id not in self.metrics:
+            self.metrics[table_id] = TableMetrics()
+        return self.metrics[table_id]
+
+    def submit(self, job):
+        """Queue a state; a queued older state of the same table is dropped"""
+        metrics = self.table_metrics(job.table_id)
+        metrics.detect_ms.append(max(0.0, (job.queued_at - job.changed_at) * 1000))
+        if job.table_id in self.queued:
+            metrics.superseded += 1
+        self.queued[job.table_id] = job
+        self.latest_version[job.table_id] = job.version
+        heapq.heappush(self.heap, (job.deadline, next(self.counter), job))
+        self.ready.set()
+
+    def start(self):
+        self.tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def join(self):
+        """Wait until nothing is queued or running"""
+        while self.heap or self.busy:
+            await asyncio.sleep(0.005)
+
+    async def _next_job(self):
+        while True:
+            while self.heap:
+                _, _, job = heapq.heappop(self.heap)
+                if self.queued.get(job.table_id) is job:
+                    del self.queued[job.table_id]
+                    return job
+            self.ready.clear()
+            await self.ready.wait()
+
+    async def _worker(self):
+        while True:
+            job = await self._next_job()
+            self.busy += 1
+            try:
+                metrics = self.table_metrics(job.table_id)
+                started = time.time()
+                metrics.queue_ms.append((started - job.queued_at) * 1000)
+                try:
+                    result = await self.predict(job.scenario)
+                except Exception as e:
+                    metrics.errors += 1
+                    print(f"[{job.table_id}] ❌ prediction failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                finished = time.time()
+
+                # A newer state arrived while this one was computing
+                if self.latest_version[job.table_id] != job.version:
+                    metrics.superseded += 1
+                    continue
+                metrics.predictions += 1
+                metrics.total_ms.append((finished - job.changed_at) * 1000)
+                if finished > job.deadline:
+                    metrics.missed_deadlines += 1
+                if self.on_result:
+                    self.on_result(job, result)
+            finally:
+                self.busy -= 1
+
+def scenario_from_game_data(game_data):
+    """Prediction scenario for a scraped state (hidden seats None), or None while it is not predictable yet"""
+    pockets = known_pockets(game_data)
+    if pockets.count(None) == len(pockets) or len(game_data['community_cards']) < 3:
+        return None
+    return {'pockets': pockets, 'board': game_data['community_cards'], 'method': "auto"}
+
+def print_result(job, result):
+    if 'error' in result:
+        print(f"[{job.table_id}] ❌ {result['error']}")
+        return
+    leader = max(result['players'], key=lambda p: p['win_probability'])
+    print(f"[{job.table_id}] {result['stage'].upper():<5} {result['method']:<11} "
+          f"leader: Player {leader['player']} {' '.join(leader['pocket'])} "
+          f"{leader['win_probability']:.1f}%")
+
+class TableMonitor:
+    """One browser, one page per table, one shared prediction pool"""
+
+    def __init__(self, urls, workers=None, headless=False, on_result=print_result, num_seats=DEFAULT_SEATS):
+        self.urls = urls
+        self.seat_ids = seat_ids(num_seats)
+        self.workers = workers or 2
+        self.headless = headless
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        self.scheduler = PredictionScheduler(self._predict, self.workers, on_result)
+        self.table_ids = {}       # Page -> table id
+
+    async def _predict(self, scenario):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, predict_scenario, scenario)
+
+    def handle_table(self, table_id, table):
+        """Called for the initial state and for every change pushed by the page"""
+        self.scheduler.table_metrics(table_id).changes += 1
+        scenario = scenario_from_game_data(game_data_from_state(table['state']))
+        if scenario is not None:
+            self.scheduler.submit(PredictionJob(table_id, table['version'], scenario, table['changedAt'] / 1000))
+
+    def _on_binding(self, source, table):
+        table_id = self.table_ids.get(source['page'])
+        if table_id is not None:
+            self.handle_table(table_id, table)
+
+    async def open_table(self, context, table_id, url):
+        page = await context.new_page()
+        self.table_ids[page] = table_id
+        args = {'seatIds': self.seat_ids, 'binding': BINDING_NAME}
+        await page.add_init_script(script=f"({TABLE_STATE_JS})({json.dumps(args)})")
+        await page.goto(url)
+        self.handle_table(table_id, await page.evaluate(TABLE_STATE_JS, args))
+        return page
+
+    async def run(self, wait_for_login=True):
+        from playwright.async_api import async_playwright
+
+        self.scheduler.start()
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=self.headless)
+                context = await browser.new_context(viewport={'width': 1920, 'height': 1080})
+                await context.expose_binding(BINDING_NAME, self._on_binding)
+
+                if wait_for_login:
+                    page = await context.new_page()
+                    await page.goto(self.urls[0])
+                    print("Log in to SportyBet in the browser window, then press Enter...")
+                    await asyncio.get_running_loop().run_in_executor(None, input)
+                    await page.close()
+
+                for i, url in enumerate(self.urls, 1):
+                    await self.open_table(context, f"table-{i}", url)
+                print(f"✓ Monitoring {len(self.urls)} tables with {self.workers} prediction workers")
+                await asyncio.Event().wait()
+        finally:
+            await self.scheduler.stop()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def report(self):
+        print("\n" + "=" * 107)
+        print(f"{'Table':<10} {'Changes':>8} {'Predicted':>10} {'Superseded':>11} {'Late':>6} {'Errors':>6} "
+              f"{'Detect p50':>11} {'Queue p50':>10} {'Total p50':>10} {'Total max':>10}")
+        print("-" * 107)
+        for table_id, metrics in sorted(self.scheduler.metrics.items()):
+            s = metrics.summary()
+            print(f"{table_id:<10} {s['changes']:>8} {s['predictions']:>10} {s['superseded']:>11} "
+                  f"{s['missed_deadlines']:>6} {s['errors']:>6} {fmt_ms(s['detect_ms_p50']):>11} {fmt_ms(s['queue_ms_p50']):>10} "
+                  f"{fmt_ms(s['total_ms_p50']):>10} {fmt_ms(s['total_ms_max']):>10}")
+
+def fmt_ms(value):
+    return "-" if value is None else f"{value:.0f} ms"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor several SportyBet poker tables at once")
+    parser.add_argument("tables", nargs="+", help="table URLs or saved HTML files")
+    parser.add_argument("--workers", type=int, default=None, help="prediction worker processes (default: 2)")
+    parser.add_argument("--headless", action="store_true", help="run the browser without a window")
+    parser.add_argument("--seats", type=int, default=DEFAULT_SEATS, help="seats per table (2-10, default 6)")
+    args = parser.parse_args(argv)
+
+    urls = [t if "://" in t else Path(t).resolve().as_uri() for t in args.tables]
+    local_only = all(u.startswith("file://") for u in urls)
+    monitor = TableMonitor(urls, args.workers, args.headless, num_seats=args.seats)
+    try:
+        asyncio.run(monitor.run(wait_for_login=not local_only))
+    except KeyboardInterrupt:
+        pass
+    monitor.report()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# test_batch.py - Test the non-interactive JSONL batch mode
+
+import io
+import json
+import os
+import tempfile
+
+from batch import run_batch, run_batch_checkpointed
+from card import parse_card
+from predictor import predict_hands_with_current
+from shared_batch import predict_shared
+
+SCENARIOS = [
+    {"id": "turn", "pockets": ["AS AH", "KS KH", "7D 2C"], "board": "AC 5H 9D KD", "method": "exhaustive"},
+    {"id": "bad-card", "pockets": ["AS AH", "ZZ KH"], "board": "AC 5H 9D"},
+    {"id": "river", "pockets": [["QS", "QH"], ["JS", "JH"]], "board": ["2C", "3C", "4D", "8H", "9S"]},
+    {"id": "preflop-auto", "pockets": ["QS QH", "JS JH"], "board": ""},
+]
+
+def run(workers):
+    lines = "\n".join(json.dumps(s) for s in SCENARIOS) + "\n\n"
+    output = io.StringIO()
+    count, errors, _ = run_batch(io.StringIO(lines), output, method="auto", workers=workers)
+    return count, errors, [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_batch_streams_results_in_order():
+    for workers in (1, 2):
+        count, errors, results = run(workers)
+        assert count == 4 and errors == 1
+        assert [r['id'] for r in results] == ["turn", "bad-card", "river", "preflop-auto"]
+
+        turn = results[0]
+        assert turn['stage'] == "turn" and turn['method'] == "Exhaustive"
+        assert [p['player'] for p in turn['players']] == [1, 2, 3]
+        assert abs(sum(p['win_probability'] for p in turn['players']) - 100) < 1e-9
+
+        assert "Invalid suit" in results[1]['error']
+        assert results[2]['players'][0]['win_probability'] == 100.0
+        assert results[3]['skipped'] is True
+
+    print("✓ PASS | Batch mode streams ordered results for 1 and 2 workers")
+
+def test_engine_failure_is_one_error_line():
+    import scenario
+
+    def failing_on_three_players(community, pockets, method, num_simulations=None):
+        if len(pockets) == 3:
+            raise RuntimeError("engine blew up")
+        return run_prediction(community, pockets, method, num_simulations)
+
+    run_prediction = scenario.run_prediction
+    scenario.run_prediction = failing_on_three_players
+    try:
+        count, errors, results = run(workers=1)
+    finally:
+        scenario.run_prediction = run_prediction
+    assert count == 4 and errors == 2
+    assert results[0] == {'id': "turn", 'error': "RuntimeError: engine blew up"}
+    assert [r['id'] for r in results] == ["turn", "bad-card", "river", "preflop-auto"]
+    assert results[2]['players'][0]['win_probability'] == 100.0
+    print("✓ PASS | An engine exception becomes one error line and the stream goes on")
+
+def test_shared_memory_batch_matches_single_predictions():
+    def cards(text):
+        return [parse_card(c) for c in text.split()]
+
+    scenarios = [
+        (cards("AC 5H 9D"), [cards("AS AH"), cards("KS KH"), cards("7D 2C")]),
+        (cards("AC 5H 9D KD"), [cards("QS QH"), cards("JS JH")]),
+        (cards("2C 3C 4D 8H 9S"), [cards(p) for p in ("AS 5S", "AD 5D", "KH KD", "6C 7C", "10H JH")]),
+    ]
+    expected = [predict_hands_with_current(*s) for s in scenarios]
+    for workers in (1, 2):
+        assert predict_shared(scenarios, workers) == expected
+    try:
+        predict_shared([(cards("AC 5H 9D"), [cards("AS AH"), None])])
+        assert False, "hidden seats should be rejected"
+    except ValueError:
+        pass
+    print("✓ PASS | Shared-memory batches match single predictions for 1 and 2 workers")
+
+def test_checkpointed_batch_resumes_to_the_same_output():
+    scenarios = [{"id": n, "pockets": ["AS AH", "KS KH"], "board": board, "method": "exhaustive"}
+                 for n, board in enumerate(["AC 5H 9D", "2C 3C 4D 8H", "QD 7S 2H JC", "AC 5H 9D KD 2S", "ZZ"])]
+    with tempfile.TemporaryDirectory() as tmp:
+        def path(name):
+            return os.path.join(tmp, name)
+
+        with open(path("in.jsonl"), "w") as f:
+            f.write("\n".join(json.dumps(s) for s in scenarios) + "\n")
+
+        run_batch_checkpointed(path("in.jsonl"), path("whole.jsonl"), path("whole.ckpt"), workers=1, progress=None)
+        assert run_batch_checkpointed(path("in.jsonl"), path("out.jsonl"), path("out.ckpt"), workers=1, limit=2,
+                                      progress=None)[0] == 2
+        with open(path("out.jsonl"), "a") as f:
+            f.write('{"id": 2, "half written')  # killed after writing, before the next save
+        done, errors, _ = run_batch_checkpointed(path("in.jsonl"), path("out.jsonl"), path("out.ckpt"), workers=1,
+                                                 progress=None)
+        assert (done, errors) == (5, 1)
+        with open(path("whole.jsonl")) as whole, open(path("out.jsonl")) as resumed:
+            assert resumed.read() == whole.read()
+    print("✓ PASS | A stopped checkpointed batch resumes to the uninterrupted output")
+
+if __name__ == "__main__":
+    test_batch_streams_results_in_order()
+    test_engine_failure_is_one_error_line()
+    test_shared_memory_batch_matches_single_predictions()
+    test_checkpointed_batch_resumes_to_the_same_output()
@@ -0,0 +1,94 @@
+# test_distributed.py - Test the distributed coordinator/worker work queue on localhost
+
+import asyncio
+import json
+import os
+import tempfile
+
+from card import parse_card
+from distributed import DEFAULT_HOST, Coordinator, count_chunk, run_local, run_worker
+from equity import cards_to_ids, count_exhaustive, remaining_ids
+from predictor import predict_hands_with_current, results_from_counts
+
+def _cards(text):
+    return [parse_card(c) for c in text.split()]
+
+SCENARIOS = [
+    (_cards("AC 5H 9D"), [_cards("AS AH"), _cards("KS KH"), _cards("7D 2C")]),
+    (_cards("AC 5H 9D KD"), [_cards("QS QH"), _cards("JS JH")]),
+    (_cards("2C 3C 4D 8H 9S"), [_cards("AS 5S"), _cards("KH KD")]),
+]
+
+def _single_process_counts(community, pockets):
+    return count_exhaustive([cards_to_ids(p) for p in pockets], cards_to_ids(community),
+                            remaining_ids(community, pockets))
+
+def test_local_workers_merge_exact_counts():
+    counts = run_local(SCENARIOS, workers=3, chunk_runouts=40)
+    for (community, pockets), merged in zip(SCENARIOS, counts):
+        assert vars(merged) == vars(_single_process_counts(community, pockets))
+        expected = predict_hands_with_current(community, pockets)
+        assert [r.win_probability for r in results_from_counts(community, pockets, merged)] == \
+               [r.win_probability for r in expected]
+    print("✓ PASS | Three local worker processes give exactly the single-process counts")
+
+async def _lease_one(port):
+    reader, writer = await asyncio.open_connection(DEFAULT_HOST, port)
+    writer.write(b'{"op": "lease"}\n')
+    await writer.drain()
+    return json.loads(await reader.readline())['chunk'], writer
+
+def test_lost_and_silent_workers_are_retried():
+    coordinator = Coordinator(SCENARIOS[:1], chunk_runouts=40, lease_timeout=0.3)
+
+    async def run():
+        port = await coordinator.start(DEFAULT_HOST, 0)
+        _, lost = await _lease_one(port)
+        lost.close()                             # disconnects holding a chunk
+        silent_chunk, silent = await _lease_one(port)  # holds a chunk and never answers
+        await asyncio.sleep(0.4)
+        loop = asyncio.get_running_loop()
+        counted = await loop.run_in_executor(None, run_worker, DEFAULT_HOST, port)
+        counts = await coordinator.wait(linger=0)
+        silent.close()
+        return counted, counts
+
+    counted, counts = asyncio.run(run())
+    assert counted == len(coordinator.chunks)
+    assert vars(counts[0]) == vars(_single_process_counts(*SCENARIOS[0]))
+    assert coordinator.stats['requeued'] == 2 and coordinator.stats['completed'] == len(coordinator.chunks)
+    print(f"✓ PASS | Chunks of lost and silent workers are handed out again ({len(coordinator.chunks)} chunks)")
+
+def test_checkpointed_job_resumes_with_identical_counts():
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "job.ckpt")
+        first = Coordinator(SCENARIOS, chunk_runouts=40, checkpoint=checkpoint, checkpoint_sec=0)
+
+        async def interrupted():
+            # Results arrive out of order, then the coordinator dies without a clean stop
+            await first.start(DEFAULT_HOST, 0)
+            leased = [first.lease(1)['chunk'] for _ in range(5)]
+            for chunk in reversed(leased[1:]):
+                first.complete({'job_id': first.job_id, 'chunk': chunk,
+                                'counts': count_chunk(first.spec, first.chunks[chunk]).to_json()})
+            first.server.close()
+
+        asyncio.run(interrupted())
+        second = Coordinator(SCENARIOS, chunk_runouts=40, checkpoint=checkpoint)
+        assert len(second.ledger) == 4 and second.ledger.merged == 0 and len(second.pending) == len(second.chunks) - 4
+
+        async def resume():
+            port = await second.start(DEFAULT_HOST, 0)
+            counted = await asyncio.get_running_loop().run_in_executor(None, run_worker, DEFAULT_HOST, port)
+            return counted, await second.wait(linger=0)
+
+        counted, counts = asyncio.run(resume())
+        assert counted == len(second.chunks) - 4
+        for scenario, merged in zip(SCENARIOS, counts):
+            assert vars(merged) == vars(_single_process_counts(*scenario))
+    print("✓ PASS | A resumed job counts only the missing chunks and merges identical counts")
+
+if __name__ == "__main__":
+    test_local_workers_merge_exact_counts()
+    test_lost_and_silent_workers_are_retried()
+    test_checkpointed_job_resumes_with_identical_counts()
@@ -0,0 +1,223 @@
+# test_equity.py - Test the shared runout counting used by the engines
+
+import random
+import tracemalloc
+
+import pytest
+
+from card import card_from_id, parse_card
+from evaluator import begin, evaluate_hand, pack_rank
+from equity import (SHARE_UNIT, cards_to_ids, count_exhaustive, count_exhaustive_compressed,
+                    count_exhaustive_pruned, count_runouts, random_runouts, remaining_ids, runout_classes)
+from predictor import exhaustive_counts, predict_hands_with_current, predict_many, results_from_counts
+
+def _cards(*names):
+    return [parse_card(n) for n in names]
+
+POCKETS = [_cards("AS", "AH"), _cards("KS", "KH"), _cards("7D", "2C"), _cards("9C", "8C")]
+FLOP = _cards("AC", "5H", "9D")
+
+def _peak_bytes(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _sampled(num_samples):
+    deck = remaining_ids(FLOP, POCKETS)
+    runouts = random_runouts(deck, 2, num_samples)
+    return count_runouts([cards_to_ids(p) for p in POCKETS], cards_to_ids(FLOP), runouts)
+
+def test_allocations_flat_per_board():
+    _sampled(10)  # lookup tables and imports
+    small = _peak_bytes(lambda: _sampled(100))
+    large = _peak_bytes(lambda: _sampled(10000))
+    assert large - small < 1024, (small, large)
+    print(f"✓ PASS | Monte Carlo: peak {small:,} B at 100 boards, {large:,} B at 10,000 boards")
+
+    # Without runout compression, whose class table grows with the runouts by design
+    turn = _peak_bytes(lambda: exhaustive_counts(FLOP + _cards("KD"), POCKETS, compress=False))
+    flop = _peak_bytes(lambda: exhaustive_counts(FLOP, POCKETS, compress=False))
+    assert flop - turn < 1024, (turn, flop)
+    print(f"✓ PASS | Exhaustive: peak {turn:,} B on the turn (40 boards), {flop:,} B on the flop (820 boards)")
+
+def test_split_pots_are_exact():
+    # Board plays for everyone: every runout is a three-way split
+    board = _cards("AS", "KS", "QS", "JS", "10S")
+    pockets = [_cards("2H", "3D"), _cards("4H", "5D"), _cards("6H", "7D")]
+    counts = exhaustive_counts(board, pockets)
+    assert counts.boards == 1
+    assert counts.shares == [SHARE_UNIT // 3] * 3
+    assert counts.ties == [1, 1, 1] and counts.wins == [0, 0, 0]
+    assert counts.hand_type_counts(0) == {"Royal Flush": 1}
+    assert sum(counts.shares) == SHARE_UNIT
+    print("✓ PASS | Three-way split counted as exact integer shares")
+
+def test_hand_state_is_incremental():
+    rng = random.Random(3)
+    for _ in range(2000):
+        ids = rng.sample(range(52), 7)
+        state = begin(ids[:5])
+        before = (state.seen, state.pairs, state.trips, state.quads, state.suited, state.suit_counts)
+        state.add(ids[5])
+        assert state.rank() == pack_rank(evaluate_hand(tuple(card_from_id(c) for c in ids[:6])))
+        assert state.rank_with(ids[6]) == pack_rank(evaluate_hand(tuple(card_from_id(c) for c in ids)))
+        state.remove(ids[5])
+        assert (state.seen, state.pairs, state.trips, state.quads, state.suited, state.suit_counts) == before
+    print("✓ PASS | HandState add/rank_with/remove match full evaluation")
+
+def test_runout_classes_match_full_enumeration():
+    rainbow = _cards("AH", "7D", "2C")
+    pockets = [_cards("KS", "QS"), _cards("JD", "10C")]
+    pocket_ids, board_ids = [cards_to_ids(p) for p in pockets], cards_to_ids(rainbow)
+    deck = remaining_ids(rainbow, pockets)
+    runouts, weights = runout_classes(pocket_ids, board_ids, deck)
+    assert sum(weights) == 990 and len(runouts) < 100  # no flush possible: ranks alone matter
+
+    rng = random.Random(8)
+    for _ in range(100):
+        num_players = rng.randint(2, 6)
+        ids = rng.sample(range(52), num_players * 2 + rng.choice([3, 4]))
+        pocket_ids = [ids[2 * i:2 * i + 2] for i in range(num_players)]
+        board_ids = ids[2 * num_players:]
+        deck = [c for c in range(52) if c not in ids]
+        full = count_exhaustive(pocket_ids, board_ids, deck)
+        assert vars(count_exhaustive_compressed(pocket_ids, board_ids, deck)) == vars(full)
+    print(f"✓ PASS | Rainbow flop: 990 runouts in {len(runouts)} classes; weighted counts match full enumeration")
+
+def test_pruning_keeps_counts_exact():
+    # Royal flush on the turn: nobody else can win, so nothing is enumerated
+    board = _cards("AH", "KH", "QH", "JH")
+    pockets = [_cards("10H", "2C"), _cards("AS", "AD"), _cards("KS", "KD")]
+    counts = exhaustive_counts(board, pockets, hand_types=False)
+    assert counts.wins == [counts.boards, 0, 0] and counts.boards == 42
+
+    rng = random.Random(9)
+    pruned_spots = 0
+    for _ in range(150):
+        num_players = rng.randint(2, 6)
+        ids = rng.sample(range(52), num_players * 2 + rng.choice([3, 4]))
+        pocket_ids = [ids[2 * i:2 * i + 2] for i in range(num_players)]
+        board_ids = ids[2 * num_players:]
+        deck = [c for c in range(52) if c not in ids]
+        full = count_exhaustive_compressed(pocket_ids, board_ids, deck)
+        assert vars(count_exhaustive_pruned(pocket_ids, board_ids, deck)) == vars(full)
+        wins_only = count_exhaustive_pruned(pocket_ids, board_ids, deck, hand_types=False)
+        assert (wins_only.boards, wins_only.shares, wins_only.wins, wins_only.ties) == \
+            (full.boards, full.shares, full.wins, full.ties)
+        pruned_spots += 0 in full.shares
+    print(f"✓ PASS | Pruned enumeration matches full counts ({pruned_spots} spots with a player drawing dead)")
+
+def test_pruned_predictions_are_unchanged():
+    # Every exhaustive engine prunes now: results on drawing-dead spots must match the plain enumeration
+    rng = random.Random(11)
+    dead_spots = 0
+    while dead_spots < 25:
+        num_players = rng.randint(2, 6)
+        ids = rng.sample(range(52), num_players * 2 + rng.choice([3, 4]))
+        pockets = [[card_from_id(c) for c in ids[2 * i:2 * i + 2]] for i in range(num_players)]
+        board = [card_from_id(c) for c in ids[2 * num_players:]]
+        pocket_ids, board_ids = [cards_to_ids(p) for p in pockets], cards_to_ids(board)
+        full = count_exhaustive_compressed(pocket_ids, board_ids, remaining_ids(board, pockets))
+        if 0 not in full.shares:
+            continue
+        dead_spots += 1
+        assert predict_hands_with_current(board, pockets) == results_from_counts(board, pockets, full)
+    print(f"✓ PASS | predict_hands_with_current unchanged on {dead_spots} spots with a player drawing dead")
+
+def test_hidden_seat_is_dealt_from_unseen_cards():
+    from predictor import predict_hands_hidden
+
+    board = _cards("AH", "7D", "2C", "9S")
+    known = [_cards("JS", "10S"), _cards("AD", "KC")]
+    exact = {r['player']: r for r in predict_hands_hidden(board, [known[0], None, known[1]])}
+    assert sorted(exact) == [1, 3] and exact[1]['method'] == "Exhaustive" and exact[1]['std_error'] == 0
+
+    # Every hidden pocket is equally likely: average the known-pocket engine over all of them
+    deck = remaining_ids(board, known)
+    totals = [0.0, 0.0]
+    num_pockets = 0
+    for a in range(len(deck)):
+        for b in range(a + 1, len(deck)):
+            hidden = [card_from_id(deck[a]), card_from_id(deck[b])]
+            counts = exhaustive_counts(board, [known[0], hidden, known[1]], hand_types=False)
+            totals[0] += counts.win_probability(0)
+            totals[1] += counts.win_probability(2)
+            num_pockets += 1
+    assert abs(exact[1]['win_probability'] - totals[0] / num_pockets) < 1e-9
+    assert abs(exact[3]['win_probability'] - totals[1] / num_pockets) < 1e-9
+
+    sampled = {r['player']: r for r in predict_hands_hidden(board, [known[0], None, known[1]], 20000, exact=False)}
+    for player in (1, 3):
+        assert abs(sampled[player]['win_probability'] - exact[player]['win_probability']) < \
+            4 * sampled[player]['std_error']
+    print(f"✓ PASS | Hidden seat: exact {exact[3]['win_probability']:.2f}% matches averaging every hidden pocket; "
+          f"sampled {sampled[3]['win_probability']:.2f}% ± {sampled[3]['std_error']:.2f}")
+
+def test_ten_player_table():
+    from scenario import parse_scenario
+    from scaling_benchmark import deal_table
+
+    community, pockets = deal_table(10)
+    pocket_ids, board_ids = [cards_to_ids(p) for p in pockets], cards_to_ids(community)
+    deck = remaining_ids(community, pockets)
+    full = count_exhaustive(pocket_ids, board_ids, deck)
+    assert full.boards == 406 and sum(full.shares) == SHARE_UNIT * full.boards
+    assert vars(count_exhaustive_compressed(pocket_ids, board_ids, deck)) == vars(full)
+
+    scenario = {'pockets': [" ".join(str(c) for c in p) for p in pockets], 'board': [str(c) for c in community]}
+    assert len(parse_scenario(scenario)[1]) == 10
+    try:
+        parse_scenario({**scenario, 'pockets': scenario['pockets'] + ["2C 3C"]})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("11 players should be rejected")
+    print("✓ PASS | 10-player flop: 406 runouts, exact split shares; 11 players rejected")
+
+def test_vectorized_engine_matches_exhaustive():
+    try:
+        from predictor import predict_hands_vectorized
+        import numpy  # noqa: F401
+    except ImportError:
+        pytest.skip("numpy not installed")
+    from predictor import predict_hands_with_current
+    boards = [FLOP, FLOP + _cards("KD"), FLOP + _cards("KD", "2S"), _cards("AS", "KS", "QS", "JS", "10S")]
+    for board in boards:
+        pockets = [p for p in POCKETS if not set(p) & set(board)]
+        assert predict_hands_vectorized(board, pockets) == predict_hands_with_current(board, pockets)
+    print("✓ PASS | NumPy exhaustive engine matches the exhaustive engine on flop, turn and river")
+
+def test_predict_many_matches_single_predictions():
+    turn = FLOP + _cards("KD")
+    variants = [(FLOP, POCKETS), (FLOP, POCKETS[:2] + POCKETS[3:]), (turn, POCKETS[1:])]
+    for alternative in (_cards("QS", "JS"), _cards("5C", "5D"), _cards("AD", "9S")):
+        variants += [(FLOP, POCKETS[:3] + [alternative]), (turn, [alternative] + POCKETS[1:])]
+    river = _cards("AS", "KS", "QS", "JS", "10S")
+    variants.append((river, [_cards("2H", "3D"), _cards("9S", "8C")]))
+    variants.append((turn, [_cards("QC", "JD"), None]))  # hidden seat: predicted on its own
+
+    many = predict_many(variants)
+    assert many == [predict_hands_with_current(board, pockets) for board, pockets in variants]
+
+    # A shown, folded hand is dead: it cannot come on the board
+    dead = _cards("5C", "5D")
+    pocket_ids, board_ids = [cards_to_ids(p) for p in POCKETS], cards_to_ids(FLOP)
+    deck = [c for c in remaining_ids(FLOP, POCKETS) if c not in cards_to_ids(dead)]
+    expected = results_from_counts(FLOP, POCKETS, count_exhaustive(pocket_ids, board_ids, deck))
+    assert predict_many([(FLOP, POCKETS, dead)]) == [expected] and expected[0]['simulations'] == 741
+    print(f"✓ PASS | predict_many matches single predictions on {len(variants)} what-if variants and dead cards")
+
+if __name__ == "__main__":
+    test_allocations_flat_per_board()
+    test_split_pots_are_exact()
+    test_hand_state_is_incremental()
+    test_runout_classes_match_full_enumeration()
+    test_pruning_keeps_counts_exact()
+    test_pruned_predictions_are_unchanged()
+    test_hidden_seat_is_dealt_from_unseen_cards()
+    test_ten_player_table()
+    test_vectorized_engine_matches_exhaustive()
+    test_predict_many_matches_single_predictions()
@@ -0,0 +1,73 @@
+# test_hand_store.py - Test the columnar hand store (skipped without numpy)
+
+import os
+import tempfile
+
+import pytest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from hand_history import HandHistory, HandHistoryWriter
+from replay import river_shares, synthesize_history
+
+def build(tmp, extra_hands=0):
+    from hand_store import HandStore, build_store
+    history_path = os.path.join(tmp, "hands.phh")
+    with HandHistoryWriter(history_path) as writer:
+        # Monotone flop, flop leader (seat 1, 80%) loses to a made flush
+        writer.append([["AS", "AH"], ["2C", "3C"]], ["AC", "KC", "7C", "9D", "4H"],
+                      flop_equities=[80.0, 20.0], turn_equities=[55.0, 45.0])
+        # Rainbow paired flop, leader wins with quads
+        writer.append([["QS", "QH"], ["JS", "10S"]], ["QD", "QC", "5H", "2S", "8D"],
+                      flop_equities=[97.5, 2.5])
+        # Hidden seat: not complete, no final hands
+        writer.append([["KS", "KH"], ["", ""]], ["2C", "3C", "4H", "5H", "9S"])
+    if extra_hands:
+        synthesize_history(history_path, extra_hands, seed=7)
+    store_dir = os.path.join(tmp, "hands.store")
+    build_store(history_path, store_dir, chunk_size=64)
+    return history_path, HandStore(store_dir)
+
+def test_store_queries():
+    if np is None:
+        pytest.skip("numpy not installed")
+    with tempfile.TemporaryDirectory() as tmp:
+        _, store = build(tmp)
+        assert len(store) == 3
+        assert list(store.complete()) == [True, True, False]
+
+        assert list(store.rows(store.texture('flop', 'monotone'))) == [0]
+        assert list(store.rows(store.texture('flop', 'rainbow') & store.texture('flop', 'paired'))) == [1]
+        assert list(store.rows(store.leader_lost('flop'))) == [0]
+        assert list(store.rows(store.leader_equity('flop', 90, 100))) == [1]
+        assert list(store.rows(store.leader_equity('turn', 0, 100))) == [0]
+        assert list(store.rows(store.winning_category("Four of a Kind"))) == [1]
+
+        hand = store.hand(0)
+        assert hand['final_hands'] == ["Three of a Kind", "Flush"] and hand['winners'] == [2]
+        assert store.hand(2)['final_hands'] == ["Pair", None]
+
+    print("✓ PASS | Store answers texture, leader and category queries")
+
+def test_store_matches_python_evaluator():
+    if np is None:
+        pytest.skip("numpy not installed")
+    with tempfile.TemporaryDirectory() as tmp:
+        history_path, store = build(tmp, extra_hands=500)
+        winners = store.column('winners')
+        with HandHistory(history_path) as history:
+            for row, record in enumerate(history):
+                if row < 3:
+                    continue
+                shares = river_shares(record.pockets, record.board)
+                expected = sum(1 << seat for seat, share in enumerate(shares) if share)
+                assert winners[row] == expected, row
+
+    print("✓ PASS | Store winners match the Python evaluator on 500 random hands")
+
+if __name__ == "__main__":
+    test_store_queries()
+    test_store_matches_python_evaluator()
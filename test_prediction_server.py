@@ -0,0 +1,137 @@
+# test_prediction_server.py - Test the local prediction server and its client
+
+import asyncio
+
+import live_games
+from prediction_client import PredictionClient, PredictionServerError
+from prediction_server import PredictionServer
+
+POCKETS = ["AS AH", "KS KH", "QS QH", "JS JH", "10S 10H", "7D 2C"]
+
+def client_calls(port):
+    """Runs in a thread: exercise the API through the real client"""
+    with PredictionClient(port=port) as client:
+        first = client.predict(POCKETS, "AC 5H 9D AD", method="exhaustive", scenario_id="first")
+        second = client.predict(POCKETS, "AC 5H 9D AD", method="exhaustive", scenario_id="second")
+        try:
+            client.predict(["AS AH", "AS KH"], "")
+            error = None
+        except PredictionServerError as e:
+            error = str(e)
+        return first, second, error, client.health()
+
+async def run_server_and_client():
+    server = PredictionServer(workers=1)
+    tcp_server = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = tcp_server.sockets[0].getsockname()[1]
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, client_calls, port)
+    finally:
+        tcp_server.close()
+        await tcp_server.wait_closed()
+        server.shutdown()
+
+def test_server_predicts_and_caches():
+    first, second, error, health = asyncio.run(run_server_and_client())
+
+    assert first['id'] == "first" and second['id'] == "second"
+    assert first['stage'] == "turn" and first['method'] == "Exhaustive"
+    assert first['players'] == second['players']
+    assert abs(sum(p['win_probability'] for p in first['players']) - 100) < 1e-9
+
+    assert "more than once" in error
+    assert health['computed'] == 1 and health['cache_hits'] == 1 and health['errors'] == 1
+
+    print("✓ PASS | Prediction server answers, caches and reports errors")
+
+async def run_live_game():
+    """Two subscribers on one game: each state is computed once and pushed to both"""
+    server = PredictionServer(workers=1)
+    channel = server.live.channel("table-1")
+    first, second = channel.subscribe(), channel.subscribe()
+    try:
+        server.live.update("table-1", {'pockets': POCKETS, 'board': "AC 5H 9D AD"})
+        unchanged = server.live.update("table-1", {'pockets': POCKETS, 'board': "AC 5H 9D AD"})
+        event_a = await asyncio.wait_for(first.get(), 30)
+        event_b = await asyncio.wait_for(second.get(), 30)
+        return unchanged, event_a, event_b, server.live.computations
+    finally:
+        server.shutdown()
+
+def test_live_game_fans_out_one_computation():
+    unchanged, event_a, event_b, computations = asyncio.run(run_live_game())
+
+    assert unchanged['changed'] is False and unchanged['version'] == 1
+    assert computations == 1
+    assert event_a is event_b
+    assert event_a['final'] is True and event_a['method'] == "Exhaustive"
+    assert event_a['game'] == "table-1" and event_a['version'] == 1
+
+    print("✓ PASS | Live game state is computed once and pushed to every subscriber")
+
+async def run_live_flop():
+    """A flop state: interim Monte Carlo events, merged chunk by chunk, then the exact result"""
+    server = PredictionServer(workers=1)
+    queue = server.live.channel("table-2").subscribe()
+    events = []
+    try:
+        server.live.update("table-2", {'pockets': POCKETS[:3], 'board': "AC 5H 9D"})
+        while not events or not events[-1]['final']:
+            events.append(await asyncio.wait_for(queue.get(), 60))
+        return events
+    finally:
+        server.shutdown()
+
+def test_live_flop_streams_monte_carlo_then_exact():
+    target = live_games.LIVE_MC_TARGET
+    live_games.LIVE_MC_TARGET = 3 * live_games.LIVE_MC_CHUNK
+    try:
+        events = asyncio.run(run_live_flop())
+    finally:
+        live_games.LIVE_MC_TARGET = target
+
+    interim, final = events[:-1], events[-1]
+    assert len(interim) == 3
+    assert all(e['final'] is False and e['method'] == "Monte Carlo" for e in interim)
+    # Each event merges every chunk so far into one estimate
+    assert [e['simulations'] for e in interim] == [live_games.LIVE_MC_CHUNK * n for n in (1, 2, 3)]
+    for event in interim:
+        assert all('std_error' in p for p in event['players'])
+        assert abs(sum(p['win_probability'] for p in event['players']) - 100) < 1e-6
+
+    assert final['final'] is True and final['method'] == "Exhaustive" and final['stage'] == "flop"
+    assert all('std_error' not in p for p in final['players'])
+    assert abs(sum(p['win_probability'] for p in final['players']) - 100) < 1e-9
+
+    print("✓ PASS | Live flop streams merged Monte Carlo estimates, then the exact result")
+
+async def run_idle_channels():
+    server = PredictionServer(workers=1)
+    live = server.live
+    try:
+        watched = live.channel("watched").subscribe()
+        live.update("abandoned", {'pockets': POCKETS, 'board': "AC 5H 9D AD"})
+        await live.channels["abandoned"].task
+        live.channel_ttl = 0
+        live.channel("new")
+        kept = sorted(live.channels)
+        live.channels["watched"].unsubscribe(watched)
+        live.channel("newer")
+        return kept, sorted(live.channels), live.evicted
+    finally:
+        server.shutdown()
+
+def test_idle_live_channels_are_evicted():
+    kept, after_unsubscribe, evicted = asyncio.run(run_idle_channels())
+
+    assert kept == ["new", "watched"]
+    assert after_unsubscribe == ["newer"]
+    assert evicted == 3
+
+    print("✓ PASS | Live channels without subscribers or updates are evicted")
+
+if __name__ == "__main__":
+    test_server_predicts_and_caches()
+    test_live_game_fans_out_one_computation()
+    test_live_flop_streams_monte_carlo_then_exact()
+    test_idle_live_channels_are_evicted()
@@ -0,0 +1,70 @@
+# test_profiling.py - Test the opt-in profiling hooks
+
+import os
+import pstats
+import tempfile
+
+from card import parse_card
+from predictor import predict_hands_with_current, predict_hands_with_method
+from profiling import enable_profiling, disable_profiling
+
+def test_profiling_writes_one_profile_per_call():
+    pockets = [
+        [parse_card("AS"), parse_card("AH")],
+        [parse_card("KS"), parse_card("KH")],
+        [parse_card("7D"), parse_card("2C")]
+    ]
+    community = [parse_card("AC"), parse_card("5H"), parse_card("9D"), parse_card("KD")]
+
+    with tempfile.TemporaryDirectory() as profile_dir:
+        enable_profiling(profile_dir, sample_interval=0.0005)
+        try:
+            predict_hands_with_method(community, pockets, "exhaustive")
+        finally:
+            disable_profiling()
+
+        # Only the outer call is profiled, the nested engine call is not
+        files = sorted(os.listdir(profile_dir))
+        assert len(files) == 2, files
+        assert all("_turn_exhaustive_AC-5H-9D-KD_3p" in name for name in files)
+
+        prof_file = next(f for f in files if f.endswith(".prof"))
+        stats = pstats.Stats(os.path.join(profile_dir, prof_file))
+        assert stats.total_calls > 0
+
+        collapsed_file = next(f for f in files if f.endswith(".collapsed"))
+        with open(os.path.join(profile_dir, collapsed_file)) as f:
+            for line in f:
+                stack, count = line.rsplit(" ", 1)
+                assert stack.startswith("predict_hands_with_method")
+                assert int(count) > 0
+
+        # Profiling off again: no new files
+        predict_hands_with_method(community, pockets, "exhaustive")
+        assert len(os.listdir(profile_dir)) == 2
+
+    print("✓ PASS | Profiling writes .prof and .collapsed files per call")
+
+def test_profiled_engines_accept_keyword_arguments():
+    pockets = [[parse_card("AS"), parse_card("AH")], [parse_card("KS"), parse_card("KH")]]
+    community = [parse_card("AC"), parse_card("5H"), parse_card("9D")]
+    expected = predict_hands_with_current(community, pockets)
+
+    with tempfile.TemporaryDirectory() as profile_dir:
+        for enabled in (False, True):
+            if enabled:
+                enable_profiling(profile_dir, sample_interval=0.0005)
+            try:
+                assert predict_hands_with_current(community_cards=community, pocket_hands=pockets) == expected
+                assert predict_hands_with_method(pocket_hands=pockets, community_cards=community,
+                                                 method="exhaustive") == expected
+            finally:
+                disable_profiling()
+        files = sorted(os.listdir(profile_dir))
+        assert len(files) == 4 and all(name.endswith(("_flop_exhaustive_AC-5H-9D_2p.prof",
+                                                       "_flop_exhaustive_AC-5H-9D_2p.collapsed")) for name in files)
+    print("✓ PASS | Profiled engines take keyword arguments, profiling on or off")
+
+if __name__ == "__main__":
+    test_profiling_writes_one_profile_per_call()
+    test_profiled_engines_accept_keyword_arguments()
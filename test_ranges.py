@@ -0,0 +1,60 @@
+# test_ranges.py - Test range parsing and range-vs-range equity
+
+import pytest
+
+from card import card_from_id, parse_card
+from equity import cards_to_ids
+from predictor import exhaustive_counts
+from ranges import parse_range
+
+def test_parse_range():
+    assert len(parse_range("QQ+")) == 18
+    assert len(parse_range("AKs")) == 4 and len(parse_range("AKo")) == 12 and len(parse_range("AK")) == 16
+    assert len(parse_range("ATs+")) == 16 and len(parse_range("KTo-K8o")) == 36
+    assert parse_range("22-55") == parse_range("55-22") and len(parse_range("22-55")) == 24
+    assert parse_range("AhKd") == parse_range("KDAH") == {(48, 45): 1.0}
+    assert parse_range("T9s") == parse_range("109s")
+
+    weighted = parse_range("AA, AhAd:0.5")
+    assert len(weighted) == 6 and weighted[(49, 48)] == 0.5  # the later term wins
+
+    for bad in ["AAs", "XK", "KTo-Q8o", "AhAh", "AK:0", " , "]:
+        try:
+            parse_range(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"'{bad}' should not parse")
+    print("✓ PASS | Range notation: pairs, suited/offsuit, +, dashes, specific combos and weights")
+
+def test_exact_range_equity_matches_pairwise_enumeration():
+    try:
+        from range_equity import range_equity
+    except ImportError:
+        pytest.skip("numpy not installed")
+
+    board = [parse_card(c) for c in ("AH", "7D", "2C", "9S")]
+    ranges = [parse_range("AA, 99:0.5, AKs, KhQh"), parse_range("77, JTs, AdKc:2")]
+    exact = range_equity(cards_to_ids(board), ranges)
+    assert exact[0]['method'] == "Exact"
+
+    # Weighted average of the exhaustive engine over every pair without a shared card
+    total = equity = 0.0
+    for c1, w1 in ranges[0].items():
+        for c2, w2 in ranges[1].items():
+            if set(c1) & set(c2) or set(c1 + c2) & set(cards_to_ids(board)):
+                continue
+            pockets = [[card_from_id(c) for c in c1], [card_from_id(c) for c in c2]]
+            counts = exhaustive_counts(board, pockets, hand_types=False)
+            total += w1 * w2
+            equity += w1 * w2 * counts.win_probability(0)
+    assert abs(exact[0]['equity'] - equity / total) < 1e-9
+    assert abs(exact[0]['equity'] + exact[1]['equity'] - 100) < 1e-9
+
+    sampled = range_equity(cards_to_ids(board), ranges, num_samples=50_000, exact=False, seed=3)
+    assert abs(sampled[0]['equity'] - exact[0]['equity']) < 4 * sampled[0]['std_error']
+    print(f"✓ PASS | Exact range equity {exact[0]['equity']:.2f}% matches pairwise enumeration; "
+          f"sampled {sampled[0]['equity']:.2f}% ± {sampled[0]['std_error']:.2f}")
+
+if __name__ == "__main__":
+    test_parse_range()
+    test_exact_range_equity_matches_pairwise_enumeration()
@@ -0,0 +1,51 @@
+# test_results.py - Test the compact result objects and their serialisation
+
+import json
+import pickle
+
+from card import parse_card
+from monte_carlo import predict_hands_monte_carlo
+from predictor import predict_hands_hidden, predict_hands_with_current
+from results import RECORD, pack_results, to_dicts, unpack_results
+
+def _cards(text):
+    return [parse_card(c) for c in text.split()]
+
+FLOP = _cards("AC 5H 9D")
+POCKETS = [_cards("AS AH"), _cards("KS KH"), _cards("7D 2C")]
+
+def test_legacy_dict_form():
+    results = predict_hands_with_current(FLOP, POCKETS)
+    leader = results[0]
+    legacy = leader.to_dict()
+    assert list(legacy) == ['player', 'pocket', 'win_probability', 'simulations', 'current_hand',
+                            'most_likely_hand', 'most_likely_percentage', 'hand_breakdown', 'all_hand_types']
+    assert leader['player'] == leader.player == 1 and leader['pocket'] is POCKETS[0]
+    assert leader['current_hand'] == (3, [14], [9, 5])  # trip aces
+    assert leader['most_likely_hand'] == "Three of a Kind"
+    assert sum(leader['all_hand_types'].values()) == leader['simulations']
+    assert len(leader['hand_breakdown']) == 3
+    assert 'method' not in leader and leader.get('method', "Exhaustive") == "Exhaustive"
+    assert dict(leader) == legacy and to_dicts(results)[0] == legacy == leader
+
+    hidden = predict_hands_hidden(FLOP + _cards("KD"), [POCKETS[0], None], exact=True)
+    assert hidden[0]['method'] == "Exhaustive" and hidden[0]['std_error'] == 0.0
+    print("✓ PASS | Results read like the legacy dicts and convert to them on demand")
+
+def test_serialisation_round_trips():
+    for results in (predict_hands_with_current(FLOP, POCKETS),
+                    predict_hands_monte_carlo(FLOP + _cards("KD"), POCKETS, 500),
+                    predict_hands_hidden(FLOP, [POCKETS[0], None, POCKETS[2]], 500, exact=False)):
+        data = pack_results(results)
+        assert len(data) == 7 + RECORD.size * len(results)
+        assert unpack_results(data) == results
+        assert pickle.loads(pickle.dumps(results)) == results
+
+    players = [r.to_json() for r in results]
+    assert json.loads(json.dumps(players)) == players
+    assert players[0]['pocket'] == ["AS", "AH"] and 'std_error' in players[0]
+    print(f"✓ PASS | Binary ({RECORD.size} B per player), pickle and JSON forms round-trip")
+
+if __name__ == "__main__":
+    test_legacy_dict_form()
+    test_serialisation_round_trips()
@@ -0,0 +1,75 @@
+# test_scraper.py - Test the scraper's single-pass table reader against saved HTML fixtures
+#
+# The browser part needs Playwright with Chromium installed; it is skipped otherwise.
+
+import time
+from pathlib import Path
+
+import pytest
+
+from sportybet_poker_scraper import SportyBetPokerScraper, game_data_from_state
+
+FIXTURE = Path(__file__).parent / "tests" / "fixtures" / "sportybet_flop.html"
+
+FLOP_POCKETS = [["AS", "AH"], ["KS", "KH"], ["7D", "2C"], ["10H", "JD"], ["QC", "QD"], ["9S", "8S"]]
+
+# Deals the turn card from the fixture's <template>, like the live site does
+DEAL_TURN_JS = """() => {
+    const card = document.getElementById('turn-card').content.firstElementChild.cloneNode(true);
+    document.querySelector('[data-qa="area-table-cards"]').appendChild(card);
+}"""
+
+def test_game_data_from_state():
+    game_data = game_data_from_state({'pockets': FLOP_POCKETS, 'community': ["AC", "5H", "9D", "KD"]})
+
+    assert game_data['pockets'] == FLOP_POCKETS
+    assert game_data['flop'] == ["AC", "5H", "9D"]
+    assert game_data['turn'] == "KD"
+    assert game_data['community_cards'] == ["AC", "5H", "9D", "KD"]
+
+    early = game_data_from_state({'pockets': [['', '']] * 6, 'community': []})
+    assert early['flop'] == [] and early['turn'] is None
+
+    print("✓ PASS | Table state converts to game data")
+
+def open_fixture_page():
+    """Returns (playwright, browser, page); skips the test when no browser is available"""
+    sync_playwright = pytest.importorskip("playwright.sync_api").sync_playwright
+    playwright = sync_playwright().start()
+    try:
+        browser = playwright.chromium.launch()
+    except Exception as e:
+        playwright.stop()
+        pytest.skip(f"Chromium does not launch: {e}")
+    page = browser.new_page()
+    page.goto(FIXTURE.as_uri())
+    return playwright, browser, page
+
+def test_fixture_scrape_and_change_detection():
+    playwright, browser, page = open_fixture_page()
+    scraper = SportyBetPokerScraper()
+    try:
+        game_data = scraper.scrape_game_state(page)
+        assert game_data['pockets'] == FLOP_POCKETS
+        assert game_data['flop'] == ["AC", "5H", "9D"] and game_data['turn'] is None
+
+        table = scraper.watch_table(page)
+        assert table['version'] == 0
+
+        start = time.perf_counter()
+        page.evaluate(DEAL_TURN_JS)
+        table = scraper.wait_for_change(page, table['version'], timeout=5000)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert table['version'] == 1
+        assert game_data_from_state(table['state'])['turn'] == "KD"
+        assert elapsed_ms < 1000
+    finally:
+        browser.close()
+        playwright.stop()
+
+    print(f"✓ PASS | Fixture scraped in one call, turn detected in {elapsed_ms:.0f} ms")
+
+if __name__ == "__main__":
+    test_game_data_from_state()
+    test_fixture_scrape_and_change_detection()
@@ -0,0 +1,33 @@
+# test_startup.py - Test that entry points defer their heavy imports
+
+import subprocess
+import sys
+
+from startup_benchmark import ENTRY_POINTS
+
+def _loaded_after_import(module, names):
+    code = f"import sys, {module}; print(','.join(n for n in {names!r} if n in sys.modules))"
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if process.returncode != 0:
+        return None
+    return [n for n in process.stdout.strip().split(",") if n]
+
+def test_entry_points_import_lazily():
+    for entry, (module, _, lazy_modules) in ENTRY_POINTS.items():
+        loaded = _loaded_after_import(module, lazy_modules)
+        if loaded is None:
+            print(f"- SKIP | {module} cannot be imported here")
+            continue
+        assert loaded == [], f"{module} imports {loaded} at startup"
+    print("✓ PASS | Entry points leave engines and pools unloaded until first use")
+
+def test_warmup_loads_engines():
+    code = "import sys, predictor; predictor.warmup(); print('monte_carlo' in sys.modules)"
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == "True"
+    print("✓ PASS | warmup() loads the engines ahead of the first prediction")
+
+if __name__ == "__main__":
+    test_entry_points_import_lazily()
+    test_warmup_loads_engines()
@@ -0,0 +1,98 @@
+# test_table_monitor.py - Test the multi-table prediction scheduler
+
+import asyncio
+import time
+
+from scenario import predict_scenario
+from sportybet_poker_scraper import game_data_from_state
+from table_monitor import PredictionJob, PredictionScheduler, scenario_from_game_data
+
+POCKETS = ["AS AH", "KS KH", "7D 2C"]
+
+def job(table_id, version, board):
+    return PredictionJob(table_id, version, {'pockets': POCKETS, 'board': board, 'method': "exhaustive"}, time.time())
+
+async def run_scheduler():
+    order = []
+    results = []
+
+    async def predict(scenario):
+        order.append(scenario['board'])
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, predict_scenario, scenario)
+
+    scheduler = PredictionScheduler(predict, workers=1, on_result=lambda j, r: results.append((j.table_id, r)))
+    scheduler.submit(job("a", 1, "AC 5H 9D 2S 3S"))
+    scheduler.submit(job("b", 1, "QC 5H 9D"))
+    scheduler.submit(job("c", 1, "AC 5H 9D KD"))
+    scheduler.submit(job("a", 2, "AC 5H 9D 2S"))   # Replaces table a's queued river
+    scheduler.start()
+    await scheduler.join()
+    await scheduler.stop()
+    return order, results, scheduler.metrics
+
+def test_turn_first_and_superseded_dropped():
+    order, results, metrics = asyncio.run(run_scheduler())
+
+    # Both turns go ahead of the flop; table a's first state is never computed
+    assert order == ["AC 5H 9D KD", "AC 5H 9D 2S", "QC 5H 9D"]
+    assert [table_id for table_id, _ in results] == ["c", "a", "b"]
+    assert all('error' not in r for _, r in results)
+    assert metrics["a"].superseded == 1 and metrics["a"].predictions == 1
+    assert len(metrics["b"].total_ms) == 1
+
+    print("✓ PASS | Scheduler runs turns first and drops superseded states")
+
+async def run_failing_predictions():
+    async def predict(scenario):
+        if scenario['board'] == "QC 5H 9D":
+            raise RuntimeError("engine crashed")
+        return {'board': scenario['board']}
+
+    results = []
+    scheduler = PredictionScheduler(predict, workers=2, on_result=lambda j, r: results.append(j.table_id))
+    scheduler.start()
+    for n, table_id in enumerate("abcd"):
+        scheduler.submit(job(table_id, 1, "QC 5H 9D" if n % 2 == 0 else "AC 5H 9D KD"))
+    await asyncio.wait_for(scheduler.join(), 30)
+    # Both workers are still there and take the next states
+    live = sum(not task.done() for task in scheduler.tasks)
+    scheduler.submit(job("a", 2, "AC 5H 9D 2S"))
+    scheduler.submit(job("c", 2, "AC 5H 9D 3S"))
+    await asyncio.wait_for(scheduler.join(), 30)
+    await scheduler.stop()
+    return live, results, scheduler.metrics
+
+def test_failing_prediction_keeps_workers():
+    live, results, metrics = asyncio.run(run_failing_predictions())
+
+    assert live == 2
+    assert sorted(results) == ["a", "b", "c", "d"]
+    assert metrics["a"].errors == 1 and metrics["a"].predictions == 1
+    assert metrics["c"].errors == 1 and metrics["b"].errors == 0
+
+    print("✓ PASS | A failing prediction is counted and the workers keep running")
+
+def test_partly_visible_table_is_predicted():
+    # The flop fixture's table with seats 2 and 5 still face down
+    hidden = ['', '']
+    state = {'pockets': [["AS", "AH"], hidden, ["7D", "2C"], ["10H", "JD"], hidden, ["9S", "8S"]],
+             'community': ["AC", "5H", "9D"]}
+    scenario = scenario_from_game_data(game_data_from_state(state))
+    assert scenario['pockets'] == [["AS", "AH"], None, ["7D", "2C"], ["10H", "JD"], None, ["9S", "8S"]]
+
+    result = predict_scenario(scenario)
+    assert 'error' not in result and result['stage'] == "flop"
+    assert sorted(p['player'] for p in result['players']) == [1, 3, 4, 6]
+
+    # Nothing to predict until a seat is visible and the flop is out
+    face_down = {'pockets': [hidden] * 6, 'community': state['community']}
+    assert scenario_from_game_data(game_data_from_state(face_down)) is None
+    assert scenario_from_game_data(game_data_from_state({**state, 'community': []})) is None
+
+    print("✓ PASS | Tables with hidden seats are predicted for the visible players")
+
+if __name__ == "__main__":
+    test_turn_first_and_superseded_dropped()
+    test_failing_prediction_keeps_workers()
+    test_partly_visible_table_is_predicted()
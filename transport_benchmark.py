@@ -0,0 +1,137 @@
+# transport_benchmark.py - Worker scaling of the shared-memory batch transport vs pickling
+#
+#   python transport_benchmark.py                   # 1 to all cores, turn and river
+#   python transport_benchmark.py --max-workers 8 --scenarios 4000
+#
+# The same batch of random game states is counted by a process pool twice:
+# once the usual way (Card lists pickled into every task, EquityCounts
+# pickled back) and once with shared_batch.count_shared (scenarios packed
+# into shared memory, tasks are index slices, counters written in place).
+# Turn and river states are used because their per-scenario work is small,
+# which is where moving data in and out of workers costs the most.
+#
+# For every worker count the benchmark reports throughput and scaling
+# efficiency (throughput / (workers x single-worker throughput)). Efficiency
+# is bounded by the cores available - on a one-core machine two workers can
+# at best reach 50%. Both transports must give identical counts, and a run
+# fails when shared memory is slower than pickling by more than TOLERANCE
+# at any pooled worker count (one worker counts in-process either way).
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from card import create_deck
+from predictor import exhaustive_counts, warmup
+from shared_batch import count_shared
+
+DEFAULT_SCENARIOS = 2000
+DEFAULT_REPEATS = 3
+MAX_PLAYERS_DEALT = 6
+# Shared memory may be at most this much slower than pickling (timing noise)
+TOLERANCE = 0.9
+
+def deal_scenarios(num_scenarios, seed=0):
+    """Random turn and river (community, pockets) states with 2-6 players"""
+    rng = random.Random(seed)
+    scenarios = []
+    for _ in range(num_scenarios):
+        deck = create_deck()
+        rng.shuffle(deck)
+        board_size = rng.choice((4, 5))
+        num_players = rng.randint(2, MAX_PLAYERS_DEALT)
+        pockets = [deck[board_size + 2 * i:board_size + 2 * i + 2] for i in range(num_players)]
+        scenarios.append((deck[:board_size], pockets))
+    return scenarios
+
+def _count_pickled(scenario):
+    return exhaustive_counts(*scenario)
+
+def count_pickled(scenarios, workers):
+    """The baseline: every scenario pickled to a worker, its EquityCounts pickled back"""
+    if workers <= 1:
+        return [_count_pickled(s) for s in scenarios]
+    chunksize = max(1, len(scenarios) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_count_pickled, scenarios, chunksize=chunksize))
+
+TRANSPORTS = {
+    "pickled": count_pickled,
+    "shared": count_shared,
+}
+
+def best_time(run, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def same_counts(a, b):
+    return all(x.boards == y.boards and x.shares == y.shares and x.wins == y.wins and x.categories == y.categories
+               and x.category_order == y.category_order for x, y in zip(a, b))
+
+def run_benchmark(num_scenarios, worker_counts, repeats=DEFAULT_REPEATS):
+    scenarios = deal_scenarios(num_scenarios)
+    if not same_counts(count_shared(scenarios, max(worker_counts)), count_pickled(scenarios, 1)):
+        raise AssertionError("shared memory counts differ from the pickled ones")
+    results = []
+    for transport, run in TRANSPORTS.items():
+        single = None
+        for workers in worker_counts:
+            per_second = len(scenarios) / best_time(lambda: run(scenarios, workers), repeats)
+            single = single or per_second
+            results.append({
+                'transport': transport,
+                'workers': workers,
+                'per_second': per_second,
+                'efficiency': per_second / (workers * single),
+            })
+    return results
+
+def check(results):
+    """List of failure messages: pooled worker counts where shared memory loses to pickling"""
+    pickled = {r['workers']: r['per_second'] for r in results if r['transport'] == "pickled"}
+    failures = []
+    for r in results:
+        pooled = r['transport'] == "shared" and r['workers'] > 1
+        if pooled and r['per_second'] < pickled[r['workers']] * TOLERANCE:
+            failures.append(f"{r['workers']} workers: shared memory {r['per_second']:,.0f}/s vs "
+                            f"pickled {pickled[r['workers']]:,.0f}/s")
+    return failures
+
+def print_report(results, cores):
+    print("=" * 56)
+    print(f"BATCH TRANSPORT SCALING ({cores} cores)")
+    print("=" * 56)
+    print(f"{'Transport':<10} {'Workers':>7} {'Scenarios/s':>14} {'Efficiency':>11}")
+    print("-" * 56)
+    for r in results:
+        print(f"{r['transport']:<10} {r['workers']:>7} {r['per_second']:>14,.0f} {r['efficiency']:>10.0%}")
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Compare shared-memory and pickled process pool batches")
+    parser.add_argument("--scenarios", type=int, default=DEFAULT_SCENARIOS)
+    parser.add_argument("--max-workers", type=int, default=max(2, cores))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    args = parser.parse_args(argv)
+    if args.scenarios < 1 or args.max_workers < 1:
+        parser.error("--scenarios and --max-workers must be at least 1")
+
+    warmup()
+    results = run_benchmark(args.scenarios, range(1, args.max_workers + 1), args.repeats)
+    print_report(results, cores)
+    failures = check(results)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("\n✓ Shared memory keeps up with pickling at every pooled worker count")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# vector_evaluator.py - NumPy hand evaluator for many hands at once (optional, needs numpy)
+#
+#   ranks = evaluate_ids(card_ids)      # (..., 5-7) card ids -> (...) packed ranks
+#   categories = ranks >> 20            # 0 = High Card ... 9 = Royal Flush
+#
+# Returns the same packed ranks as evaluator.pack_rank(evaluate_hand(...)), so
+# results can be compared and unpacked with evaluator.unpack_rank. Every step
+# is a whole-array operation: rank and suit counts by bincount, rank bitmasks
+# by matrix products, and best-five selection through the evaluator's 13-bit
+# TOP5 / STRAIGHT_HIGH lookup tables.
+#
+#   counts = count_exhaustive_vectorized(pocket_ids, board_ids, deck)
+#
+# runs the exhaustive engine on arrays: every runout of the deck is
+# evaluated for every player in one call per chunk, with winners, split
+# pots and hand-type histograms counted by whole-array reductions. It fills
+# the same equity.EquityCounts as equity.count_exhaustive.
+
+import itertools
+
+import numpy as np
+
+from equity import SPLIT_SHARES, EquityCounts
+from evaluator import HAND_NAMES, STRAIGHT_HIGH, TOP5
+
+TOP5_TABLE = np.array(TOP5, dtype=np.int64)
+STRAIGHT_TABLE = np.array(STRAIGHT_HIGH, dtype=np.int64)
+RANK_BITS = 1 << np.arange(13, dtype=np.int64)
+SPLIT_TABLE = np.array(SPLIT_SHARES, dtype=np.int64)
+
+# Runouts per evaluate_ids call (bounds memory on the pre-flop's 1.7M runouts)
+RUNOUT_CHUNK = 32768
+
+def _bit(value):
+    """Rank mask bit for card values (2-14); 0 for value 0"""
+    return np.where(value > 0, 1 << np.maximum(value - 2, 0), 0)
+
+def _high(mask):
+    return TOP5_TABLE[mask] >> 16
+
+def evaluate_ids(cards):
+    """
+    Packed ranks for an array of hands given as card ids (card.card_id)
+
+    Args:
+        cards: int array of shape (..., k) with 5 <= k <= 7 distinct card ids per hand
+
+    Returns:
+        int64 array of shape (...)
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    shape, k = cards.shape[:-1], cards.shape[-1]
+    if not 5 <= k <= 7:
+        raise ValueError(f"Hands need 5-7 cards, got {k}.")
+    cards = cards.reshape(-1, k)
+    n = len(cards)
+    if n == 0:
+        return np.zeros(shape, dtype=np.int64)
+
+    ranks = cards >> 2
+    suits = cards & 3
+    rows = np.arange(n, dtype=np.int64)[:, None]
+
+    rank_counts = np.bincount((rows * 13 + ranks).ravel(), minlength=n * 13).reshape(n, 13)
+    suit_counts = np.bincount((rows * 4 + suits).ravel(), minlength=n * 4).reshape(n, 4)
+
+    present = (rank_counts > 0) @ RANK_BITS
+    pairs = (rank_counts == 2) @ RANK_BITS
+    trips = (rank_counts == 3) @ RANK_BITS
+    quads = (rank_counts == 4) @ RANK_BITS
+
+    flush_suit = suit_counts.argmax(axis=1)
+    has_flush = suit_counts[rows[:, 0], flush_suit] >= 5
+    flush_mask = np.where(suits == flush_suit[:, None], 1 << ranks, 0).sum(axis=1)
+    flush_mask = np.where(has_flush, flush_mask, 0)
+
+    straight_flush = STRAIGHT_TABLE[flush_mask]
+    straight = STRAIGHT_TABLE[present]
+
+    quad = _high(quads)
+    trip = _high(trips)
+    second_trip_or_pair = _high((trips & ~_bit(trip)) | pairs)
+    pair = _high(pairs)
+    second_pair = _high(pairs & ~_bit(pair))
+
+    conditions = [
+        straight_flush == 14,
+        straight_flush > 0,
+        quads > 0,
+        (trips > 0) & (second_trip_or_pair > 0),
+        has_flush,
+        straight > 0,
+        trips > 0,
+        second_pair > 0,
+        pairs > 0,
+    ]
+    choices = [
+        (9 << 20) | (14 << 16),
+        (8 << 20) | (straight_flush << 16),
+        (7 << 20) | (quad << 16) | (_high(present & ~_bit(quad)) << 12),
+        (6 << 20) | (trip << 16) | (second_trip_or_pair << 12),
+        (5 << 20) | TOP5_TABLE[flush_mask],
+        (4 << 20) | (straight << 16),
+        (3 << 20) | (trip << 16) | ((TOP5_TABLE[present & ~_bit(trip)] >> 12) << 8),
+        (2 << 20) | (pair << 16) | (second_pair << 12) | (_high(present & ~_bit(pair) & ~_bit(second_pair)) << 8),
+        (1 << 20) | (pair << 16) | ((TOP5_TABLE[present & ~_bit(pair)] >> 8) << 4),
+    ]
+    return np.select(conditions, choices, default=TOP5_TABLE[present]).reshape(shape)
+
+def runout_index(num_cards, cards_needed):
+    """(R, cards_needed) array of deck positions, one row per runout in itertools.combinations order"""
+    if cards_needed == 0:
+        return np.zeros((1, 0), dtype=np.int8)  # complete board: one empty runout
+    combos = itertools.combinations(range(num_cards), cards_needed)
+    flat = np.fromiter(itertools.chain.from_iterable(combos), dtype=np.int8)
+    return flat.reshape(-1, cards_needed)
+
+def count_exhaustive_vectorized(pocket_ids, board_ids, deck, counts=None):
+    """
+    Showdown every player on every runout from deck, returns EquityCounts
+
+    Same counts as equity.count_exhaustive, including the first-seen order
+    of each player's hand categories.
+    """
+    num_players = len(pocket_ids)
+    if counts is None:
+        counts = EquityCounts(num_players)
+    known = np.array([list(pocket) + list(board_ids) for pocket in pocket_ids], dtype=np.int64)
+    deck = np.asarray(deck, dtype=np.int64)
+    runouts = runout_index(len(deck), 5 - len(board_ids))
+    players = np.arange(num_players)
+    num_categories = len(HAND_NAMES)
+
+    for start in range(0, len(runouts), RUNOUT_CHUNK):
+        cards = deck[runouts[start:start + RUNOUT_CHUNK]]                  # (r, k)
+        hands = np.concatenate([
+            np.broadcast_to(known[:, None, :], (num_players, len(cards), known.shape[1])),
+            np.broadcast_to(cards[None, :, :], (num_players,) + cards.shape),
+        ], axis=2)                                                          # (P, r, 7)
+        ranks = evaluate_ids(hands)                                         # (P, r)
+
+        winners = ranks == ranks.max(axis=0)
+        num_winners = winners.sum(axis=0)
+        shares = (winners * SPLIT_TABLE[num_winners]).sum(axis=1)
+        wins = (winners & (num_winners == 1)).sum(axis=1)
+        categories = ranks >> 20
+        histogram = np.bincount((categories + players[:, None] * num_categories).ravel(),
+                                minlength=num_players * num_categories).reshape(num_players, num_categories)
+
+        for i in range(num_players):
+            counts.shares[i] += int(shares[i])
+            counts.wins[i] += int(wins[i])
+            counts.ties[i] += int(winners[i].sum() - wins[i])
+            present, first = np.unique(categories[i], return_index=True)
+            for category in present[np.argsort(first)]:
+                if not counts.categories[i][category]:
+                    counts.category_order[i].append(int(category))
+                counts.categories[i][category] += int(histogram[i, category])
+        counts.boards += len(cards)
+    return counts
@@ -0,0 +1,105 @@
+# what_if_benchmark.py - Batch throughput of predict_many on what-if variants of one hand
+#
+#   python what_if_benchmark.py                     # flop, turn and river
+#   python what_if_benchmark.py --alternatives 20 --repeats 5
+#
+# Each stage deals one 6-player table and builds the variants a post-game
+# review asks about: every seat with each of several other hands, and every
+# table with one or two seats folded. The variants are predicted once with
+# predict_many and once by calling predict_hands_with_method in a loop; both
+# must give identical results. A run fails when predict_many is less than
+# MIN_SPEEDUP times faster on any stage.
+
+import argparse
+import itertools
+import random
+import sys
+import time
+
+from card import create_deck
+from predictor import predict_hands_with_method, predict_many, warmup
+
+STAGES = {"flop": 3, "turn": 4, "river": 5}
+NUM_PLAYERS = 6
+DEFAULT_ALTERNATIVES = 8
+DEFAULT_REPEATS = 3
+MIN_SPEEDUP = 1.5
+
+def what_if_variants(board_size, num_alternatives, seed=0):
+    """(community, pockets) variants of one dealt table"""
+    deck = create_deck()
+    random.Random(seed).shuffle(deck)
+    board = deck[:board_size]
+    pockets = [deck[board_size + 2 * i:board_size + 2 * i + 2] for i in range(NUM_PLAYERS)]
+    spare = deck[board_size + 2 * NUM_PLAYERS:]
+    alternatives = [spare[2 * k:2 * k + 2] for k in range(num_alternatives)]
+
+    variants = [(board, pockets)]
+    for seat, alternative in itertools.product(range(NUM_PLAYERS), alternatives):
+        variants.append((board, pockets[:seat] + [alternative] + pockets[seat + 1:]))
+    for folded in itertools.chain(itertools.combinations(range(NUM_PLAYERS), 1),
+                                  itertools.combinations(range(NUM_PLAYERS), 2)):
+        variants.append((board, [p for i, p in enumerate(pockets) if i not in folded]))
+    return variants
+
+def predict_each(variants):
+    return [predict_hands_with_method(board, pockets) for board, pockets in variants]
+
+def best_time(run, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def measure(stage, num_alternatives, repeats):
+    variants = what_if_variants(STAGES[stage], num_alternatives)
+    # Untimed first runs: both sides then find the same lookup caches warm
+    if predict_many(variants) != predict_each(variants):
+        raise AssertionError(f"{stage}: predict_many differs from single predictions")
+    many = best_time(lambda: predict_many(variants), repeats)
+    each = best_time(lambda: predict_each(variants), repeats)
+    return {
+        'stage': stage,
+        'scenarios': len(variants),
+        'many_per_second': len(variants) / many,
+        'each_per_second': len(variants) / each,
+        'speedup': each / many,
+    }
+
+def print_report(results):
+    print("=" * 64)
+    print("WHAT-IF BATCH THROUGHPUT (6 players)")
+    print("=" * 64)
+    print(f"{'Stage':<7} {'Scenarios':>9} {'predict_many':>14} {'one by one':>14} {'Speedup':>9}")
+    print("-" * 64)
+    for r in results:
+        print(f"{r['stage']:<7} {r['scenarios']:>9} {r['many_per_second']:>12,.0f}/s "
+              f"{r['each_per_second']:>12,.0f}/s {r['speedup']:>8.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare predict_many with one prediction per scenario")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma separated: flop, turn, river")
+    parser.add_argument("--alternatives", type=int, default=DEFAULT_ALTERNATIVES,
+                        help="other hands tried at every seat")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    warmup()
+    results = [measure(stage, args.alternatives, args.repeats) for stage in stages]
+    print_report(results)
+    failures = [r for r in results if r['speedup'] < MIN_SPEEDUP]
+    for r in failures:
+        print(f"❌ {r['stage']}: predict_many only {r['speedup']:.2f}x faster (need {MIN_SPEEDUP}x)")
+    if not failures:
+        print(f"\n✓ predict_many is at least {MIN_SPEEDUP}x faster on every stage")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())